@@ -0,0 +1,263 @@
+"""
+Calibration of the rules of the `auto` solver from benchmark reports.
+
+Reads reports written by `benchmarks.runner`, computes the features
+(`src.solvers.auto_solver.puzzle_features`) of every benchmarked puzzle and
+fits a small decision tree minimizing the total wall time of the chosen
+solvers. A run which did not finish costs `penalty` times the time limit.
+Every leaf of the tree becomes a rule of `src/solvers/auto_rules.json`,
+the solver with the smallest total time over all the puzzles is the default.
+
+Usage:
+------
+    python -m benchmarks.runner -o bench.json
+    python -m benchmarks.runner -o generated.json --puzzles 'generated/*.txt'
+    python -m benchmarks.calibrate bench.json generated.json -o src/solvers/auto_rules.json
+"""
+
+import argparse
+import json
+import math
+import sys
+from dataclasses import astuple, fields
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+from src.solvers.auto_solver import PuzzleFeatures, puzzle_features
+
+FEATURES = [field.name for field in fields(PuzzleFeatures)]
+INTEGER_FEATURES = {
+    field.name for field in fields(PuzzleFeatures) if field.type in ("int", int)
+}
+FINISHED = ("SOLVED", "INFEASIBLE")
+
+# (warunki reguły: cecha -> [dolna, górna granica), indeks solvera)
+Leaf = tuple[dict[str, list[float | None]], int]
+
+
+def load_costs(
+    reports: list[dict[str, Any]], solvers: list[str] | None, penalty: float
+) -> tuple[list[str], list[str], npt.NDArray[np.float64]]:
+    """
+    Collects the wall times of the runs of all the reports.
+
+    Parameters:
+    -----------
+    reports: list[dict[str, Any]]
+        reports written by `benchmarks.runner`
+    solvers: list[str] | None
+        solvers to choose from, `None` for all the benchmarked ones but `auto`
+    penalty: float
+        cost of an unfinished run, relative to the time limit of its report
+
+    Returns:
+    --------
+    data: tuple[list[str], list[str], npt.NDArray[np.float64]]
+        paths of the puzzles, names of the solvers and a (puzzles, solvers)
+        array of costs; runs missing from the reports cost as unfinished ones
+    """
+    runs: dict[tuple[str, str], float] = {}
+    for report in reports:
+        unfinished = penalty * report["time_limit"]
+        for record in report["results"]:
+            finished = record["status"] in FINISHED and record["wall_time"] is not None
+            runs[record["puzzle"], record["solver"]] = (
+                record["wall_time"] if finished else unfinished
+            )
+    paths = sorted({path for path, _ in runs})
+    if solvers is None:
+        solvers = sorted({solver for _, solver in runs} - {"auto"})
+    missing = penalty * max(report["time_limit"] for report in reports)
+    costs = np.array(
+        [[runs.get((path, solver), missing) for solver in solvers] for path in paths]
+    )
+    return paths, solvers, costs
+
+
+def fit(
+    x: npt.NDArray[np.float64],
+    costs: npt.NDArray[np.float64],
+    depth: int,
+    min_leaf: int,
+    min_gain: float,
+    when: dict[str, list[float | None]] | None = None,
+) -> list[Leaf]:
+    """
+    Fits a decision tree choosing the solver with the smallest total cost.
+
+    A node is split on the feature and the threshold which reduce the total
+    cost the most, if the reduction exceeds `min_gain` seconds and both
+    parts keep at least `min_leaf` puzzles.
+
+    Parameters:
+    -----------
+    x: npt.NDArray[np.float64]
+        (puzzles, features) features of the puzzles, in the order of `FEATURES`
+    costs: npt.NDArray[np.float64]
+        (puzzles, solvers) costs of the runs
+    depth: int
+        maximal depth of the tree
+    min_leaf: int
+        minimal number of puzzles of a leaf
+    min_gain: float
+        minimal reduction of the total cost (in seconds) of a split
+    when: dict[str, list[float | None]] | None
+        conditions of the node, `None` for the root
+
+    Returns:
+    --------
+    leaves: list[Leaf]
+        conditions and the chosen solver of every leaf
+    """
+    when = {} if when is None else when
+    totals = costs.sum(axis=0)
+    leaf = [(when, int(totals.argmin()))]
+    if depth == 0 or len(x) < 2 * min_leaf:
+        return leaf
+
+    best_cost, best_split = totals.min() - min_gain, None
+    for feature in range(x.shape[1]):
+        order = np.argsort(x[:, feature], kind="stable")
+        values = x[order, feature]
+        left = np.cumsum(costs[order], axis=0)
+        # podział przed pozycją i: lewa część to i pierwszych łamigłówek
+        for i in range(min_leaf, len(x) - min_leaf + 1):
+            if values[i - 1] == values[i]:
+                continue
+            cost = left[i - 1].min() + (totals - left[i - 1]).min()
+            if cost < best_cost:
+                best_cost, best_split = cost, (feature, (values[i - 1] + values[i]) / 2)
+    if best_split is None:
+        return leaf
+
+    feature, threshold = best_split
+    name = FEATURES[feature]
+    threshold = (
+        math.ceil(threshold) if name in INTEGER_FEATURES else round(float(threshold), 4)
+    )
+    low, high = when.get(name, [None, None])
+    below = x[:, feature] < threshold
+    return fit(
+        x[below],
+        costs[below],
+        depth - 1,
+        min_leaf,
+        min_gain,
+        when | {name: [low, threshold]},
+    ) + fit(
+        x[~below],
+        costs[~below],
+        depth - 1,
+        min_leaf,
+        min_gain,
+        when | {name: [threshold, high]},
+    )
+
+
+def calibrate(
+    reports: list[dict[str, Any]],
+    solvers: list[str] | None = None,
+    depth: int = 3,
+    min_leaf: int = 3,
+    min_gain: float = 0.1,
+    penalty: float = 2.0,
+) -> dict[str, Any]:
+    """
+    Fits the rules of the `auto` solver to the benchmark reports, see `fit`.
+
+    Returns:
+    --------
+    rules: dict[str, Any]
+        JSON-serializable rules (see `src.solvers.auto_solver`) with
+        a `calibration` summary: total costs of the rules, of the best single
+        solver and of the best solver of every puzzle
+    """
+    paths, solvers, costs = load_costs(reports, solvers, penalty)
+    x = np.array(
+        [astuple(puzzle_features(SudokuGrid.from_file(path))) for path in paths],
+        dtype=np.float64,
+    )
+    leaves = fit(x, costs, depth, min_leaf, min_gain)
+    default = int(costs.sum(axis=0).argmin())
+
+    chosen = np.full(len(paths), default)
+    for when, solver in leaves:
+        matches = np.ones(len(paths), dtype=bool)
+        for name, (low, high) in when.items():
+            column = x[:, FEATURES.index(name)]
+            matches &= (low is None or column >= low) & (high is None or column < high)
+        chosen[matches] = solver
+    return {
+        "calibration": {
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "puzzles": len(paths),
+            "time_limit": max(report["time_limit"] for report in reports),
+            "penalty": penalty,
+            "total_time": round(float(costs[np.arange(len(paths)), chosen].sum()), 3),
+            "best_single": {solvers[default]: round(float(costs[:, default].sum()), 3)},
+            "oracle_time": round(float(costs.min(axis=1).sum()), 3),
+        },
+        "default": solvers[default],
+        "rules": [
+            {"solver": solvers[solver], "when": when} for when, solver in leaves if when
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.calibrate")
+    parser.add_argument("reports", nargs="+", help="JSON reports of benchmarks.runner")
+    parser.add_argument(
+        "-s",
+        "--solvers",
+        nargs="+",
+        help="Solvers to choose from (default: all benchmarked)",
+    )
+    parser.add_argument(
+        "-d", "--depth", type=int, default=3, help="Maximal depth of the decision tree"
+    )
+    parser.add_argument(
+        "--min-leaf", type=int, default=3, help="Minimal number of puzzles of a rule"
+    )
+    parser.add_argument(
+        "--min-gain",
+        type=float,
+        default=0.1,
+        help="Minimal time (in seconds) saved by a split",
+    )
+    parser.add_argument(
+        "--penalty",
+        type=float,
+        default=2.0,
+        help="Cost of an unfinished run, in time limits",
+    )
+    parser.add_argument(
+        "-o", "--output", help="Path of the rules file (default: stdout)"
+    )
+    args = parser.parse_args()
+
+    reports = [json.loads(Path(path).read_text()) for path in args.reports]
+    rules = calibrate(
+        reports, args.solvers, args.depth, args.min_leaf, args.min_gain, args.penalty
+    )
+    text = json.dumps(rules, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    summary = rules["calibration"]
+    ((single, single_time),) = summary["best_single"].items()
+    print(
+        f"{len(rules['rules'])} rules over {summary['puzzles']} puzzles: {summary['total_time']:.2f} s"
+        f" (best single solver {single}: {single_time:.2f} s, best per puzzle: {summary['oracle_time']:.2f} s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compares the node throughput of the `NaiveSudokuSolver` before and after
+switching `_is_excluded` from row/column/block scans to bitmasks.
+
+Usage:
+------
+    python -m benchmarks.naive_bitmask [-t TIME_LIMIT] [puzzle ...]
+
+For every puzzle both solvers run with the same time limit;
+the number of visited nodes (`NaiveSudokuSolver.stats.nodes`) and nodes/sec are printed.
+"""
+
+import argparse
+from pathlib import Path
+from timeit import default_timer as timer
+
+from src.model.grid import SudokuGrid
+from src.solvers.naive_solver import NaiveSudokuSolver
+
+DEFAULT_PUZZLES = [f"puzzles/sudokuN{n}num0.txt" for n in range(2, 17)]
+
+
+class ScanningSolver(NaiveSudokuSolver):
+    """
+    The previous solver: every exclusion check scans the row,
+    the column and the block of the cell (the search itself is shared).
+    """
+
+    def _is_excluded(self, row: int, col: int, val: int) -> bool:
+        size = self.solution.size
+        if any(self.solution[row, j] == val for j in range(size)):
+            return True
+        if any(self.solution[i, col] == val for i in range(size)):
+            return True
+        idx = self.solution.block_index(row, col)
+        block_vals = self.solution.block(idx)
+        return any(x == val for row_vals in block_vals for x in row_vals)
+
+    def _candidates(self, row: int, col: int, block: int) -> int:
+        candidates = 0
+        for val in range(1, self.solution.size + 1):
+            if not self._is_excluded(row, col, val):
+                candidates |= 1 << val
+        return candidates
+
+
+def measure(
+    solver: NaiveSudokuSolver, puzzle: SudokuGrid, time_limit: float
+) -> tuple[str, int, float]:
+    """
+    Runs the solver and returns its outcome, number of nodes and elapsed time.
+    """
+    start = timer()
+    try:
+        status = (
+            "SOLVED" if solver.solve(puzzle, time_limit) is not None else "INFEASIBLE"
+        )
+    except TimeoutError:
+        status = "TIMEOUT"
+    return status, solver.stats.nodes, timer() - start
+
+
+def run(paths: list[str], time_limit: float) -> None:
+    print(
+        f"{'puzzle':<28}{'solver':<10}{'status':<12}{'nodes':>10}{'time [s]':>10}{'nodes/s':>12}"
+    )
+    for path in paths:
+        puzzle = SudokuGrid.from_text(Path(path).read_text().strip().splitlines())
+        for name, cls in (("scan", ScanningSolver), ("bitmask", NaiveSudokuSolver)):
+            status, nodes, elapsed = measure(cls(), puzzle, time_limit)
+            rate = nodes / elapsed if elapsed > 0 else float("inf")
+            print(
+                f"{path:<28}{name:<10}{status:<12}{nodes:>10}{elapsed:>10.3f}{rate:>12.0f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.naive_bitmask")
+    parser.add_argument("puzzles", nargs="*", default=DEFAULT_PUZZLES)
+    parser.add_argument("-t", "--time-limit", type=float, default=5.0)
+    args = parser.parse_args()
+    run(args.puzzles, args.time_limit)
+
+
+if __name__ == "__main__":
+    main()
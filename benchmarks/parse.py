@@ -0,0 +1,52 @@
+"""
+Compares parse times of the puzzle files: the line-by-line parser
+(`SudokuGrid._from_lines`, as `main.py` used it) versus the bulk numpy
+decoder of `SudokuGrid.from_file`.
+
+Usage:
+------
+    python -m benchmarks.parse [-r REPEAT] [puzzle ...]
+"""
+
+import argparse
+import glob
+from pathlib import Path
+from timeit import timeit
+
+from src.model.grid import SudokuGrid
+
+DEFAULT_PUZZLES = sorted(glob.glob("puzzles/*.txt"), key=lambda p: (len(p), p))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.parse")
+    parser.add_argument("puzzles", nargs="*", default=DEFAULT_PUZZLES)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'puzzle':<28}{'lines [ms]':>12}{'bulk [ms]':>12}{'speedup':>10}")
+    total_lines = total_bulk = 0.0
+    for path in args.puzzles:
+        lines = (
+            timeit(
+                lambda path=path: SudokuGrid._from_lines(
+                    Path(path).read_text().strip().splitlines()
+                ),
+                number=args.repeat,
+            )
+            / args.repeat
+        )
+        bulk = (
+            timeit(lambda path=path: SudokuGrid.from_file(path), number=args.repeat)
+            / args.repeat
+        )
+        total_lines += lines
+        total_bulk += bulk
+        print(f"{path:<28}{lines * 1e3:>12.3f}{bulk * 1e3:>12.3f}{lines / bulk:>10.1f}")
+    print(
+        f"{'total':<28}{total_lines * 1e3:>12.3f}{total_bulk * 1e3:>12.3f}{total_lines / total_bulk:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
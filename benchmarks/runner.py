@@ -0,0 +1,262 @@
+"""
+Benchmark suite over the `puzzles/` corpus.
+
+Runs every solver of `src.solvers.registry.SOLVERS` on
+`puzzles/sudokuN{2..16}num{0..2}.txt`, each run in a fresh process, and
+records wall time, nodes expanded, peak RSS and the outcome. Other puzzles
+(e.g. made by `python main.py generate`) can be selected with `--puzzles`.
+Results are written as JSON and can be compared against a saved baseline.
+
+Usage:
+------
+    python -m benchmarks.runner -o bench.json
+    python -m benchmarks.runner -o generated.json --puzzles 'generated/*.txt'
+    python -m benchmarks.runner -o new.json --baseline bench.json --threshold 0.2
+
+The exit code is 1 when the comparison finds a regression.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import resource
+import sys
+from collections import defaultdict
+from datetime import UTC, datetime
+from pathlib import Path
+from timeit import default_timer as timer
+from typing import Any
+
+from src.model.grid import SudokuGrid
+from src.runtime.batch import expand_paths
+from src.solvers.registry import SOLVERS, create_solver
+
+PUZZLE_PATTERN = "puzzles/sudokuN{block_size}num{num}.txt"
+STATUSES = ("SOLVED", "INFEASIBLE", "TIMEOUT", "ERROR")
+# czas na zakończenie procesu po upływie limitu, zanim zostanie zabity
+KILL_GRACE = 5.0
+
+
+def _measure(solver_name: str, path: str, time_limit: float, conn: Any) -> None:
+    """
+    Solves a single puzzle and sends the measurements through the pipe.
+    Runs in a separate process, so the peak RSS covers only this run.
+    """
+    record: dict[str, Any] = {"status": "ERROR", "wall_time": None, "nodes": None}
+    try:
+        puzzle = SudokuGrid.from_file(path)
+        solver = create_solver(solver_name)
+        start = timer()
+        try:
+            solution = solver.solve(puzzle, time_limit)
+            record["status"] = "SOLVED" if solution is not None else "INFEASIBLE"
+        except TimeoutError:
+            record["status"] = "TIMEOUT"
+        record["wall_time"] = timer() - start
+        stats = getattr(solver, "stats", None)
+        if stats is not None:
+            record["nodes"] = stats.nodes
+            record["backtracks"] = stats.backtracks
+            record["max_depth"] = stats.max_depth
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    # ru_maxrss jest w KiB na Linuksie i w bajtach na macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    record["peak_rss_kb"] = peak // 1024 if sys.platform == "darwin" else peak
+    conn.send(record)
+    conn.close()
+
+
+def run_one(solver_name: str, path: str, time_limit: float) -> dict[str, Any]:
+    """
+    Runs a single benchmark in a fresh process, killing it
+    if it does not stop on its own shortly after the time limit.
+
+    Returns:
+    --------
+    record: dict[str, Any]
+        `status`, `wall_time`, `nodes` and `peak_rss_kb` of the run
+    """
+    receiver, sender = mp.Pipe(duplex=False)
+    process = mp.Process(target=_measure, args=(solver_name, path, time_limit, sender))
+    process.start()
+    sender.close()
+    if receiver.poll(time_limit + KILL_GRACE):
+        record = receiver.recv()
+    else:
+        record = {
+            "status": "TIMEOUT",
+            "wall_time": None,
+            "nodes": None,
+            "peak_rss_kb": None,
+        }
+        record["error"] = "killed after missing the time limit"
+    process.kill()
+    process.join()
+    return record
+
+
+def bundled_paths(block_sizes: list[int], nums: list[int]) -> list[str]:
+    """
+    Returns the paths of the existing bundled puzzles of the given block sizes and numbers.
+    """
+    paths = [
+        PUZZLE_PATTERN.format(block_size=block_size, num=num)
+        for block_size in block_sizes
+        for num in nums
+    ]
+    return [path for path in paths if Path(path).exists()]
+
+
+def run_suite(
+    solvers: list[str], paths: list[str], time_limit: float
+) -> dict[str, Any]:
+    """
+    Runs all the solvers on all the given puzzles.
+
+    Returns:
+    --------
+    report: dict[str, Any]
+        JSON-serializable report with metadata, per-run results
+        and a summary per solver and block size
+    """
+    results = []
+    for path in paths:
+        block_size = SudokuGrid.from_file(path).block_size
+        for solver_name in solvers:
+            record = {"puzzle": path, "block_size": block_size, "solver": solver_name}
+            record.update(run_one(solver_name, path, time_limit))
+            results.append(record)
+            wall = record["wall_time"]
+            print(
+                f"{path:<28}{solver_name:<12}{record['status']:<12}"
+                f"{'-' if wall is None else f'{wall:.3f}':>10}",
+                file=sys.stderr,
+                flush=True,
+            )
+    return {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "time_limit": time_limit,
+        "results": results,
+        "summary": summarize(results),
+    }
+
+
+def summarize(results: list[dict[str, Any]]) -> dict[str, dict[str, dict[str, Any]]]:
+    """
+    Aggregates outcomes and total wall time per solver and block size.
+    """
+    summary: dict[str, dict[str, dict[str, Any]]] = defaultdict(dict)
+    for record in results:
+        entry = summary[record["solver"]].setdefault(
+            str(record["block_size"]),
+            {status: 0 for status in STATUSES} | {"wall_time": 0.0},
+        )
+        entry[record["status"]] += 1
+        entry["wall_time"] += record["wall_time"] or 0.0
+    return dict(summary)
+
+
+def compare(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    threshold: float,
+    min_delta: float,
+) -> list[str]:
+    """
+    Finds regressions of the current report against the baseline.
+
+    A run regresses when it no longer ends with the baseline outcome
+    after the baseline solved it (or proved it infeasible),
+    or when its wall time grows by more than `threshold` (relative)
+    and more than `min_delta` seconds (absolute, to ignore noise).
+
+    Returns:
+    --------
+    regressions: list[str]
+        human-readable descriptions of the regressions
+    """
+    previous = {(r["solver"], r["puzzle"]): r for r in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        old = previous.get((record["solver"], record["puzzle"]))
+        if old is None:
+            continue
+        name = f"{record['solver']} on {record['puzzle']}"
+        if (
+            old["status"] in ("SOLVED", "INFEASIBLE")
+            and record["status"] != old["status"]
+        ):
+            regressions.append(f"{name}: {old['status']} -> {record['status']}")
+        elif record["status"] == old["status"] == "SOLVED":
+            before, after = old["wall_time"], record["wall_time"]
+            if after - before > min_delta and after > before * (1 + threshold):
+                regressions.append(
+                    f"{name}: {before:.3f}s -> {after:.3f}s (+{(after / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.runner")
+    parser.add_argument(
+        "-s", "--solvers", nargs="+", choices=sorted(SOLVERS), default=list(SOLVERS)
+    )
+    parser.add_argument(
+        "-b", "--block-sizes", nargs="+", type=int, default=list(range(2, 17))
+    )
+    parser.add_argument("-n", "--nums", nargs="+", type=int, default=[0, 1, 2])
+    parser.add_argument(
+        "-p",
+        "--puzzles",
+        nargs="+",
+        help="Puzzle files, directories or glob patterns instead of the bundled ones",
+    )
+    parser.add_argument("-t", "--time-limit", type=float, default=10.0)
+    parser.add_argument(
+        "-o", "--output", help="Path of the JSON report (default: stdout)"
+    )
+    parser.add_argument(
+        "--baseline", help="Path of a previous JSON report to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown flagged as a regression",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.05,
+        help="Slowdowns below this many seconds are ignored",
+    )
+    args = parser.parse_args()
+
+    paths = (
+        list(expand_paths(args.puzzles))
+        if args.puzzles
+        else bundled_paths(args.block_sizes, args.nums)
+    )
+    report = run_suite(args.solvers, paths, args.time_limit)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(baseline, report, args.threshold, args.min_delta)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
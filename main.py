@@ -1,54 +1,756 @@
 import argparse
+import asyncio
+import concurrent.futures
+import glob
+import json
+import os
 import sys
+import time
+
+import numpy as np
+
+from src.cache.solution_cache import SolutionCache
+from src.generator.generator import (
+    MAX_BLOCK_SIZE,
+    MIN_BLOCK_SIZE,
+    default_check_limit,
+    generate,
+)
+from src.generator.generator import (
+    OUTPUT_FORMATS as GENERATOR_FORMATS,
+)
 from src.model.grid import SudokuGrid
-import concurrent.futures
-from src.solvers.naive_solver import NaiveSudokuSolver
+from src.runtime.batch import ERROR, INFEASIBLE, TIMEOUT, expand_paths, run_batch
+from src.runtime.jobs import EXPIRED, PENDING, RUNNING, JobQueue, run_workers
+from src.runtime.server import SolverServer, serve
+from src.sat.cnf import encode
+from src.solvers.caching_solver import CachingSudokuSolver
+from src.solvers.cancellation import CancellationToken
+from src.solvers.checkpoint import Checkpoint
+from src.solvers.counting import EXHAUSTED, LIMIT, count_solutions
+from src.solvers.propagation import presolve
+from src.solvers.registry import SOLVERS, create_solver
+from src.solvers.stats import instrument
+
+OUTPUT_FORMATS = ("pretty", "csv", "npy")
+# opcje trybu jednego pliku (flaga -> atrybut), odrzucane w trybie wsadowym
+SINGLE_FLAGS = {
+    "--count": "count",
+    "--dimacs": "dimacs",
+    "--stats": "stats",
+    "--progress": "progress",
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python main.py",
+        description="Sudolver - yet another sudoku solver. "
+        "Run `python main.py serve --help` for the server mode, "
+        "`python main.py generate --help` for the puzzle generator "
+        "and `python main.py enqueue|worker|status --help` for the job queue.",
+    )
+    parser.add_argument(
+        "puzzle_paths",
+        nargs="*",
+        metavar="puzzle_path",
+        help="Path to the file containing a sudoku puzzle. "
+        "Several files, directories (their .txt and .npy files) or glob patterns "
+        "switch to the batch mode, "
+        "which prints a JSON line per puzzle. Optional with --resume",
+    )
+    parser.add_argument(
+        "-t",
+        "--time-limit",
+        type=float,
+        default=None,
+        help="Time limit for the solver (in seconds, default: no limit)",
+    )
+    parser.add_argument(
+        "-s",
+        "--solver",
+        choices=sorted(SOLVERS),
+        default=None,
+        help="Solving strategy to use, auto chooses one from the features of the puzzle "
+        "(default: naive, mrv with --checkpoint or --resume)",
+    )
+    parser.add_argument(
+        "--presolve",
+        action="store_true",
+        help="Fill the cells forced by constraint propagation before solving",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="pretty",
+        help="Format of the printed solution in the single-file mode: "
+        "pretty (default), csv (same as the puzzle files) or npy (binary .npy)",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        default=None,
+        help="Directory of the persistent solution cache; "
+        "puzzles equal up to relabeling digits or permuting rows/columns "
+        "within bands/stacks are answered from it",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="Number of solutions kept in memory by the cache (default: 1024)",
+    )
+    parser.add_argument(
+        "--count",
+        action="store_true",
+        help="Count the solutions instead of solving; prints the count and a witness solution",
+    )
+    parser.add_argument(
+        "--count-limit",
+        type=int,
+        default=2,
+        metavar="N",
+        help="Stop counting after N solutions (default: 2, i.e. the uniqueness check)",
+    )
+    parser.add_argument(
+        "--dimacs",
+        metavar="FILE",
+        default=None,
+        help="Write the CNF encoding of the puzzle in the DIMACS format to FILE "
+        "instead of solving it (`-` for stdout)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print the solver statistics (nodes, backtracks, timings) to stderr "
+        "in the single-file mode",
+    )
+    parser.add_argument(
+        "--progress",
+        type=int,
+        metavar="N",
+        default=None,
+        help="Print live solver statistics to stderr every N search nodes "
+        "in the single-file mode",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the randomized search of the restart solver, "
+        "the same seed reproduces the same run (default: 0)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        default=None,
+        help="Periodically save the search state of the mrv solver to FILE "
+        "in the single-file mode, and save it on timeout, so that the search "
+        "can be continued with --resume",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="Time between two saved checkpoints (in seconds, default: 60)",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="FILE",
+        default=None,
+        help="Continue the search saved in the checkpoint FILE; "
+        "new checkpoints go to the same file unless --checkpoint is given",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes in the batch mode "
+        "or of the parallel solver (default: number of CPUs)",
+    )
+    args = parser.parse_args(argv)
+    checkpointing = args.checkpoint is not None or args.resume is not None
+    if args.solver is None:
+        args.solver = "mrv" if checkpointing else "naive"
+    if not args.puzzle_paths and args.resume is None:
+        parser.error("the following arguments are required: puzzle_path")
+    if checkpointing and args.solver != "mrv":
+        parser.error("--checkpoint and --resume require the mrv solver")
+    if checkpointing and is_batch(args.puzzle_paths):
+        parser.error("--checkpoint and --resume work with a single puzzle")
+    if is_batch(args.puzzle_paths):
+        single = [
+            flag
+            for flag, used in SINGLE_FLAGS.items()
+            if getattr(args, used) not in (None, False)
+        ]
+        if single:
+            parser.error(
+                f"{', '.join(single)} work{'s' if len(single) == 1 else ''} with a single puzzle"
+            )
+    if args.count_limit < 1:
+        parser.error("--count-limit must be positive")
+    return args
+
+
+def is_batch(paths):
+    """
+    Checks whether the puzzle paths switch to the batch mode:
+    several paths, a directory or a glob pattern.
+    """
+    return len(paths) > 1 or any(
+        os.path.isdir(path) or glob.has_magic(path) for path in paths
+    )
+
+
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python main.py serve",
+        description="Runs a solving server speaking newline-delimited JSON "
+        "(see src/runtime/server.py for the protocol).",
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765, help="TCP port to listen on (default: 8765)"
+    )
+    parser.add_argument(
+        "--unix",
+        metavar="PATH",
+        default=None,
+        help="Listen on a Unix socket instead of TCP",
+    )
+    parser.add_argument(
+        "-t",
+        "--time-limit",
+        type=float,
+        default=10.0,
+        help="Maximal time limit of a single puzzle (in seconds, default: 10)",
+    )
+    parser.add_argument(
+        "-s",
+        "--solver",
+        choices=sorted(SOLVERS),
+        default="dlx",
+        help="Default solving strategy (default: dlx)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="Maximal number of puzzles queued or being solved, "
+        "further ones are rejected with the BUSY status (default: 4 * jobs)",
+    )
+    parser.add_argument(
+        "--presolve",
+        action="store_true",
+        help="Fill the cells forced by constraint propagation before solving",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        default=None,
+        help="Directory of the persistent solution cache",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="Number of solutions kept in memory by the cache of every worker (default: 1024)",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_generate_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python main.py generate",
+        description="Generates random puzzles with a unique solution, "
+        "graded easy/medium/hard/expert, into files named like the bundled ones.",
+    )
+    parser.add_argument(
+        "-b",
+        "--block-size",
+        type=int,
+        default=3,
+        help=f"Size of the blocks, from {MIN_BLOCK_SIZE} to {MAX_BLOCK_SIZE} (default: 3, i.e. 9x9)",
+    )
+    parser.add_argument(
+        "-n", "--count", type=int, default=100, help="Number of puzzles (default: 100)"
+    )
+    parser.add_argument(
+        "-o",
+        "--out-dir",
+        default="generated",
+        help="Output directory (default: generated)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=GENERATOR_FORMATS,
+        default="text",
+        help="Format of the puzzle files: text (default, same as the bundled puzzles) or npy (binary .npy)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the first puzzle (default: 0)"
+    )
+    parser.add_argument(
+        "--holes",
+        type=float,
+        default=1.0,
+        help="Fraction of the cells whose removal is attempted (default: 1.0, as few clues as possible)",
+    )
+    parser.add_argument(
+        "--check-time",
+        type=float,
+        default=None,
+        help="Time limit of a single search-based uniqueness check (in seconds); "
+        "0 accepts only the puzzles solved by constraint propagation, "
+        "which yields easy and medium puzzles only "
+        "(default: 0.05 up to 9x9 grids, 0 for the larger ones)",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="FILE",
+        default=None,
+        help="Write a JSON line per puzzle (path, clues, grade, effort, seed) to FILE",
+    )
+    return parser.parse_args(argv)
 
 
-def parse_args():
+def parse_enqueue_args(argv):
     parser = argparse.ArgumentParser(
-        prog="python main.py", description="Sudolver - yet another sudoku solver."
+        prog="python main.py enqueue",
+        description="Adds puzzle files to a job queue solved by `python main.py worker` processes, "
+        "possibly on several hosts sharing the filesystem.",
     )
+    parser.add_argument("queue", help="Path of the queue database (created if missing)")
     parser.add_argument(
-        "puzzle_path", help="Path to the file containing a sudoku puzzle"
+        "puzzle_paths",
+        nargs="+",
+        metavar="puzzle_path",
+        help="Puzzle files, directories (their .txt and .npy files) or glob patterns; "
+        "files already in the queue are skipped",
     )
     parser.add_argument(
         "-t",
         "--time-limit",
         type=float,
         default=None,
-        help="Time limit for the solver (in seconds)",
+        help="Time limit of a single puzzle (in seconds, default: no limit)",
+    )
+    parser.add_argument(
+        "-s",
+        "--solver",
+        choices=sorted(SOLVERS),
+        default="dlx",
+        help="Solving strategy to use (default: dlx)",
+    )
+    parser.add_argument(
+        "--presolve",
+        action="store_true",
+        help="Fill the cells forced by constraint propagation before solving",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
+
+
+def parse_worker_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python main.py worker",
+        description="Claims and solves the puzzles of a job queue until it is drained. "
+        "Jobs of workers which died are solved again once their lease expires.",
+    )
+    parser.add_argument("queue", help="Path of the queue database")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=60.0,
+        help="Time (in seconds) after which a job of a silent worker is given to another one (default: 60)",
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Keep waiting for new jobs instead of exiting when the queue is drained",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        default=None,
+        help="Directory of the persistent solution cache",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="Number of solutions kept in memory by the cache of every worker (default: 1024)",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_status_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python main.py status",
+        description="Prints the number of jobs of a queue per state and status as a JSON object.",
+    )
+    parser.add_argument("queue", help="Path of the queue database")
+    parser.add_argument(
+        "--results",
+        action="store_true",
+        help="Print a JSON line per finished puzzle instead, the same as the batch mode",
+    )
+    return parser.parse_args(argv)
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "enqueue":
+        run_enqueue(parse_enqueue_args(sys.argv[2:]))
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        run_queue_worker(parse_worker_args(sys.argv[2:]))
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        run_status(parse_status_args(sys.argv[2:]))
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        run_server(parse_serve_args(sys.argv[2:]))
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "generate":
+        run_generator(parse_generate_args(sys.argv[2:]))
+        return
+
     args = parse_args()
 
+    paths = args.puzzle_paths
+    if not paths:
+        solve_single(args, None)
+    elif not is_batch(paths):
+        solve_single(args, paths[0])
+    else:
+        solve_batch(args)
+
+
+def solve_batch(args):
+    """
+    Solves all the given puzzles, printing a JSON line per puzzle.
+    Exits with 0 if all the puzzles are solved, 1 if any is infeasible
+    or failed, 2 if any timed out (and none failed).
+    """
+    counts = run_batch(
+        expand_paths(args.puzzle_paths),
+        args.solver,
+        args.time_limit,
+        args.jobs,
+        sys.stdout,
+        args.presolve,
+        args.cache,
+        args.cache_size,
+    )
+    if counts[INFEASIBLE] or counts[ERROR]:
+        sys.exit(1)
+    if counts[TIMEOUT]:
+        sys.exit(2)
+    sys.exit(0)
+
+
+def run_server(args):
+    server = SolverServer(
+        args.solver,
+        args.time_limit,
+        args.jobs,
+        args.max_pending,
+        args.presolve,
+        args.cache,
+        args.cache_size,
+    )
     try:
-        with open(args.puzzle_path, "r") as f:
-            puzzle_data = f.read()
-    except Exception as e:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_enqueue(args):
+    with JobQueue(args.queue) as queue:
+        added = queue.enqueue(
+            expand_paths(args.puzzle_paths), args.solver, args.time_limit, args.presolve
+        )
+        counts = queue.counts()
+    print(f"Enqueued {added} puzzles, {counts[PENDING]} pending", file=sys.stderr)
+
+
+def run_queue_worker(args):
+    """
+    Solves the jobs of the queue with `args.jobs` processes.
+    Exits with 0 when the queue is drained.
+    """
+    start = time.perf_counter()
+    completed = run_workers(
+        args.queue,
+        args.jobs,
+        args.lease,
+        args.wait,
+        cache_dir=args.cache,
+        cache_size=args.cache_size,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Completed {completed} puzzles in {elapsed:.2f} s", file=sys.stderr)
+
+
+def run_status(args):
+    """
+    Prints the state of the queue. Exits with 0 when all the jobs are finished,
+    1 when some are still pending or running.
+    """
+    with JobQueue(args.queue) as queue:
+        if args.results:
+            for record in queue.results():
+                print(json.dumps(record))
+        else:
+            print(json.dumps(queue.counts()))
+        counts = queue.counts()
+    sys.exit(1 if counts[PENDING] or counts[RUNNING] or counts[EXPIRED] else 0)
+
+
+def run_generator(args):
+    if args.check_time is None:
+        check_limit = default_check_limit(args.block_size)
+    else:
+        check_limit = args.check_time or None
+    start = time.perf_counter()
+    try:
+        if args.index is not None:
+            with open(args.index, "w") as index:
+                counts = generate(
+                    args.block_size,
+                    args.count,
+                    args.out_dir,
+                    args.jobs,
+                    args.seed,
+                    args.format,
+                    args.holes,
+                    check_limit,
+                    index,
+                )
+        else:
+            counts = generate(
+                args.block_size,
+                args.count,
+                args.out_dir,
+                args.jobs,
+                args.seed,
+                args.format,
+                args.holes,
+                check_limit,
+            )
+    except (OSError, ValueError) as e:
+        print(f"Generator error: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{grade}: {count}" for grade, count in counts.items())
+    rate = 60 * args.count / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"Generated {args.count} puzzles in {elapsed:.2f} s ({rate:.0f}/min) - {summary}",
+        file=sys.stderr,
+    )
+
+
+def print_solution(solution, output_format):
+    if output_format == "csv":
+        print(solution.to_text())
+    elif output_format == "npy":
+        sys.stdout.flush()
+        solution.save(sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    else:
+        print(solution)
+
+
+def solve_single(args, puzzle_path):
+    checkpoint = None
+    try:
+        if args.resume is not None:
+            checkpoint = Checkpoint.load(args.resume)
+        puzzle = SudokuGrid.from_file(puzzle_path) if puzzle_path is not None else None
+    except (OSError, UnicodeDecodeError) as e:
         print(f"Error reading puzzle file: {e}")
         sys.exit(1)
+    except ValueError as e:
+        print(f"Solver error: {e}")
+        sys.exit(1)
+    if checkpoint is not None:
+        if puzzle is not None and not keeps_givens(puzzle, checkpoint.puzzle):
+            print(f"Solver error: checkpoint {args.resume} belongs to another puzzle")
+            sys.exit(1)
+        puzzle = SudokuGrid(checkpoint.puzzle)
+
+    if args.dimacs is not None:
+        write_dimacs(puzzle, args.dimacs)
+        sys.exit(0)
+    if args.count:
+        count_single(args, puzzle)
 
+    solver = None
+    checkpoint_path = args.checkpoint or args.resume
+    # wznawiane przeszukiwanie pomija pamięć podręczną - jest już w toku
+    use_cache = args.cache is not None and checkpoint is None
     try:
-        puzzle = SudokuGrid.from_text(puzzle_data.strip().splitlines())
-        solver = NaiveSudokuSolver()
-        solution = solver.solve(puzzle, args.time_limit)
+        time_limit = args.time_limit
+        if args.presolve and checkpoint is None:
+            # propagacja liczy się do limitu czasu, solver dostaje resztę
+            token = CancellationToken(args.time_limit)
+            puzzle = presolve(puzzle, token)
+            time_limit = token.remaining()
+        options = {"jobs": args.jobs} if args.solver == "parallel" else {}
+        if args.solver == "restart":
+            options = {"seed": args.seed}
+        if args.solver == "auto":
+            options = {"on_select": report_selection}
+        if checkpoint_path is not None:
+            options = {
+                "checkpoint_path": checkpoint_path,
+                "checkpoint_interval": args.checkpoint_interval,
+            }
+            if checkpoint is not None:
+                options["value_order"] = checkpoint.value_order
+        solver = create_solver(args.solver, **options)
+        if args.stats or args.progress:
+            instrument(
+                solver, print_progress if args.progress else None, args.progress or 1
+            )
+        if use_cache:
+            cache = SolutionCache(args.cache_size, args.cache)
+            solver = CachingSudokuSolver(solver, cache)
+        if puzzle is None:
+            solution = None
+        elif checkpoint is not None:
+            solution = solver.resume(checkpoint, args.time_limit)
+        else:
+            solution = solver.solve(puzzle, time_limit)
+        if use_cache:
+            print(f"Cache: {cache.hits} hits, {cache.misses} misses", file=sys.stderr)
+
+        winner = getattr(solver, "winner", None)
+        if winner is not None:
+            print(f"Winning strategy: {winner}", file=sys.stderr)
 
         if solution is not None:
-            print(solution)
+            print_solution(solution, args.output_format)
             sys.exit(0)
         else:
             print("INFEASIBLE")
             sys.exit(1)
     except (TimeoutError, concurrent.futures.TimeoutError):
         print("TIMEOUT")
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            report_checkpoint(checkpoint_path)
         sys.exit(2)
     except Exception as e:
         print(f"Solver error: {e}")
         sys.exit(1)
+    finally:
+        if (
+            args.stats
+            and solver is not None
+            and getattr(solver, "stats", None) is not None
+        ):
+            print(f"Stats: {solver.stats.format()}", file=sys.stderr)
+
+
+def report_selection(solver_name, features):
+    """
+    Prints the solver chosen by the auto solver and the features behind the choice.
+    """
+    print(f"Selected solver: {solver_name} ({features.format()})", file=sys.stderr)
+
+
+def keeps_givens(puzzle, grid):
+    """
+    Checks whether the grid has the same size and keeps all the givens of the puzzle.
+    """
+    givens = np.asarray(puzzle._array)
+    values = np.asarray(grid)
+    return values.shape == givens.shape and bool(
+        ((givens == 0) | (givens == values)).all()
+    )
+
+
+def report_checkpoint(path):
+    """
+    Prints where the search state has been saved and how far the search got.
+    """
+    checkpoint = Checkpoint.load(path)
+    empty = len(checkpoint.cells)
+    print(
+        f"Checkpoint saved to {path}: {checkpoint.depth}/{empty} cells assigned, "
+        f"best {checkpoint.best_depth}/{empty}, {checkpoint.nodes} nodes",
+        file=sys.stderr,
+    )
+
+
+def count_single(args, puzzle):
+    """
+    Prints the number of solutions of the puzzle (up to `args.count_limit`) and a witness.
+    Exits with 0 if there is a solution, 1 if there is none, 2 on timeout.
+    """
+    try:
+        result = count_solutions(puzzle, args.count_limit, args.time_limit)
+    except ValueError as e:
+        print(f"Solver error: {e}")
+        sys.exit(1)
+
+    if result.status == EXHAUSTED:
+        print(f"COUNT: {result.count} (exhausted)")
+    elif result.status == LIMIT:
+        print(f"COUNT: {result.count} (limit reached, at least {result.count})")
+    else:
+        print(f"COUNT: {result.count} (timeout, at least {result.count})")
+    if args.stats:
+        print(f"Stats: {result.stats.format()}", file=sys.stderr)
+    if result.solution is not None:
+        print_solution(result.solution, args.output_format)
+
+    if result.status not in (EXHAUSTED, LIMIT):
+        sys.exit(2)
+    sys.exit(0 if result.count else 1)
+
+
+def write_dimacs(puzzle, path):
+    cnf = encode(puzzle)
+    if path == "-":
+        cnf.to_dimacs(sys.stdout)
+        return
+    try:
+        with open(path, "w") as out:
+            cnf.to_dimacs(out)
+    except OSError as e:
+        print(f"Error writing DIMACS file: {e}")
+        sys.exit(1)
+
+
+def print_progress(stats):
+    print(f"Progress: {stats.format()}", file=sys.stderr, flush=True)
 
 
 if __name__ == "__main__":
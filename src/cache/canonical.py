@@ -0,0 +1,142 @@
+"""
+Canonical form of sudoku puzzles under the symmetries which keep
+the grid structure: relabeling the digits, permuting rows within a band
+(a horizontal strip of blocks) and permuting columns within a stack
+(a vertical strip of blocks).
+
+Rows and columns are ordered by features invariant under all these
+symmetries (givens per block), refined once by the pattern of given cells,
+and the digits are then relabeled in the order of their first appearance.
+Ties are broken by the original order, so some equivalent puzzles may get
+different canonical forms - which only costs a cache miss. Equal canonical
+forms always mean equivalent puzzles.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+
+
+@dataclass(frozen=True, slots=True)
+class Transform:
+    """
+    A symmetry mapping a puzzle to its canonical form:
+    `canonical[i, j] == relabel[puzzle[rows[i], cols[j]]]`.
+
+    Attributes:
+    -----------
+    rows: npt.NDArray[np.intp]
+        original row of every canonical row
+    cols: npt.NDArray[np.intp]
+        original column of every canonical column
+    relabel: npt.NDArray[np.intp]
+        canonical label of every original value (`relabel[0] == 0`)
+    """
+
+    rows: npt.NDArray[np.intp]
+    cols: npt.NDArray[np.intp]
+    relabel: npt.NDArray[np.intp]
+
+    def apply(self, grid: SudokuGrid) -> SudokuGrid:
+        """
+        Maps a grid of the original puzzle to the canonical frame.
+        """
+        values = np.asarray(grid._array)[np.ix_(self.rows, self.cols)]
+        return SudokuGrid(self.relabel[values].astype(values.dtype))
+
+    def invert(self, grid: SudokuGrid) -> SudokuGrid:
+        """
+        Maps a grid of the canonical frame back to the original puzzle.
+        """
+        values = np.asarray(grid._array)
+        restore = np.empty_like(self.relabel)
+        restore[self.relabel] = np.arange(self.relabel.size)
+        original = np.empty_like(values)
+        original[np.ix_(self.rows, self.cols)] = restore[values]
+        return SudokuGrid(original)
+
+
+def _order_within_strips(keys: list[npt.NDArray], bs: int) -> npt.NDArray[np.intp]:
+    """
+    Sorts lines (rows or columns) by the keys, keeping every line
+    inside its own strip (band or stack).
+
+    Parameters:
+    -----------
+    keys: list[npt.NDArray]
+        sort keys of the lines, the most significant first
+    bs: int
+        size of the block
+
+    Returns:
+    --------
+    order: npt.NDArray[np.intp]
+        original index of every sorted line
+    """
+    n = keys[0].shape[0]
+    strip = np.arange(n) // bs
+    # np.lexsort sortuje według ostatniego klucza jako najważniejszego
+    return np.lexsort([np.arange(n)] + keys[::-1] + [strip])
+
+
+def canonicalize(puzzle: SudokuGrid) -> tuple[SudokuGrid, Transform]:
+    """
+    Computes the canonical form of the puzzle.
+
+    Parameters:
+    -----------
+    puzzle: SudokuGrid
+        a sudoku puzzle
+
+    Returns:
+    --------
+    canonical: SudokuGrid
+        the canonical form of the puzzle
+    transform: Transform
+        the symmetry mapping the puzzle to its canonical form
+    """
+    values = np.asarray(puzzle._array).astype(np.intp)
+    n = puzzle.size
+    bs = puzzle.block_size
+    given = values != 0
+
+    # liczba danych w każdym bloku wiersza / kolumny - niezmiennicze cechy
+    blocks = given.reshape(bs, bs, bs, bs)
+    row_keys = [-k for k in blocks.sum(axis=3).reshape(n, bs).T]
+    col_keys = [-k for k in blocks.sum(axis=1).transpose(1, 2, 0).reshape(n, bs).T]
+    rows = _order_within_strips(row_keys, bs)
+    cols = _order_within_strips(col_keys, bs)
+
+    # doprecyzowanie: wzór zajętych komórek po wstępnym uporządkowaniu
+    row_pattern = [-k for k in np.packbits(given[:, cols], axis=1).T]
+    rows = _order_within_strips(row_keys + row_pattern, bs)
+    col_pattern = [-k for k in np.packbits(given[rows].T, axis=1).T]
+    cols = _order_within_strips(col_keys + col_pattern, bs)
+
+    # etykiety cyfr w kolejności pierwszego wystąpienia; brakujące na końcu
+    ordered = values[np.ix_(rows, cols)].ravel()
+    present = ordered[ordered != 0]
+    limit = max(n, int(values.max(initial=0)))
+    _, first = np.unique(present, return_index=True)
+    appearance = present[np.sort(first)]
+    missing = np.setdiff1d(np.arange(1, limit + 1), appearance)
+    relabel = np.zeros(limit + 1, dtype=np.intp)
+    relabel[np.concatenate((appearance, missing))] = np.arange(1, limit + 1)
+
+    transform = Transform(rows, cols, relabel)
+    return transform.apply(puzzle), transform
+
+
+def canonical_key(canonical: SudokuGrid) -> str:
+    """
+    Returns a hash identifying the canonical form.
+    """
+    values = np.ascontiguousarray(canonical._array, dtype=np.uint32)
+    digest = hashlib.sha256(values.tobytes()).hexdigest()
+    return f"{canonical.size}-{digest}"
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from src.cache.canonical import canonical_key, canonicalize
+from src.model.grid import SudokuGrid
+
+
+class SolutionCache:
+    """
+    A cache of sudoku solutions keyed on the canonical form of the puzzle
+    (see `src.cache.canonical`), so puzzles equal up to digit relabeling
+    and row / column permutations within bands / stacks share an entry.
+
+    Solutions are stored in the canonical frame: an in-memory LRU tier
+    and an optional on-disk tier, a directory of `.npy` grids
+    (see `SudokuGrid.save`) which can be shared between processes.
+
+    Attributes:
+    -----------
+    max_entries: int
+        capacity of the in-memory tier
+    directory: Path | None
+        directory of the on-disk tier, `None` disables it
+    hits: int
+        number of lookups which found a solution
+    misses: int
+        number of lookups which did not
+
+    Methods:
+    --------
+    get(puzzle: SudokuGrid) -> SudokuGrid | None:
+        returns a cached solution of the puzzle
+    put(puzzle: SudokuGrid, solution: SudokuGrid) -> None:
+        stores a solution of the puzzle
+    """
+
+    max_entries: int
+    directory: Path | None
+    hits: int
+    misses: int
+
+    def __init__(
+        self, max_entries: int = 1024, directory: str | Path | None = None
+    ) -> None:
+        if max_entries < 0:
+            raise ValueError("Cache size must not be negative")
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, SudokuGrid] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, puzzle: SudokuGrid) -> SudokuGrid | None:
+        """
+        Returns a cached solution of the puzzle, mapped back
+        from the canonical frame.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle
+
+        Returns:
+        --------
+        solution: SudokuGrid | None
+            - the solution of the puzzle if it is cached
+            - `None` otherwise
+        """
+        canonical, transform = canonicalize(puzzle)
+        key = canonical_key(canonical)
+        stored = self._memory.get(key)
+        if stored is not None:
+            self._memory.move_to_end(key)
+        else:
+            stored = self._load(key)
+            if stored is not None:
+                self._remember(key, stored)
+
+        if stored is not None:
+            solution = transform.invert(stored)
+            # zabezpieczenie przed kolizją klucza: dane muszą się zgadzać
+            given = np.asarray(puzzle._array) != 0
+            if (
+                np.asarray(solution._array)[given] == np.asarray(puzzle._array)[given]
+            ).all():
+                self.hits += 1
+                return solution
+        self.misses += 1
+        return None
+
+    def put(self, puzzle: SudokuGrid, solution: SudokuGrid) -> None:
+        """
+        Stores a solution of the puzzle in both tiers.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle
+        solution: SudokuGrid
+            its solution
+        """
+        canonical, transform = canonicalize(puzzle)
+        key = canonical_key(canonical)
+        stored = transform.apply(solution)
+        self._remember(key, stored)
+        if self.directory is not None:
+            path = self.directory / f"{key}.npy"
+            if not path.exists():
+                # zapis do pliku tymczasowego i rename - inne procesy nie zobaczą połowy pliku
+                tmp = path.with_suffix(f".{id(stored)}.tmp")
+                stored.save(tmp)
+                tmp.replace(path)
+
+    def _remember(self, key: str, stored: SudokuGrid) -> None:
+        """
+        Puts an entry in the in-memory tier, evicting the least recently used ones.
+        """
+        if self.max_entries == 0:
+            return
+        self._memory[key] = stored
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> SudokuGrid | None:
+        """
+        Reads an entry from the on-disk tier.
+        """
+        if self.directory is None:
+            return None
+        path = self.directory / f"{key}.npy"
+        try:
+            return SudokuGrid.load(path, mmap=False)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,388 @@
+"""
+Generation of random puzzles with a unique solution, graded by difficulty.
+
+A puzzle is made in three steps:
+
+1. a random full grid - a valid base pattern shuffled by the sudoku
+   symmetries (digit relabeling, rows within bands, bands, columns within
+   stacks, stacks and transposition),
+2. digging holes - clues are removed in random order while the puzzle stays
+   unique; uniqueness is proved by constraint propagation when it solves
+   the puzzle and by a short `count_solutions(limit=2)` search otherwise;
+   clues are removed in batches which grow on success and shrink on
+   failure, so that the easy early phase needs only a few checks,
+3. grading - by how far constraint propagation gets and by the search
+   effort of the final uniqueness check.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any, TextIO
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+from src.solvers.counting import count_solutions
+from src.solvers.propagation import candidates_from_grid, is_solved, propagate
+from src.solvers.stats import SolverStats
+
+GRADES = ("easy", "medium", "hard", "expert")
+OUTPUT_FORMATS = ("text", "npy")
+
+MIN_BLOCK_SIZE = 2
+MAX_BLOCK_SIZE = 16
+
+# limit czasu pojedynczego sprawdzenia jednoznaczności przeszukiwaniem
+SEARCH_CHECK_LIMIT = 0.05
+# powyżej tego rozmiaru bloku przeszukiwanie zwykle nie mieści się w limicie
+SEARCH_MAX_BLOCK_SIZE = 3
+
+
+@dataclass(frozen=True, slots=True)
+class GeneratedPuzzle:
+    """
+    A generated puzzle with its grade.
+
+    Attributes:
+    -----------
+    puzzle: SudokuGrid
+        the puzzle, with a unique solution
+    solution: SudokuGrid
+        its solution
+    grade: str
+        one of `GRADES`
+    effort: int
+        number of search nodes of the final uniqueness check
+    seed: int
+        seed the puzzle was generated from
+    """
+
+    puzzle: SudokuGrid
+    solution: SudokuGrid
+    grade: str
+    effort: int
+    seed: int
+
+    @property
+    def clues(self) -> int:
+        """
+        Number of given cells.
+        """
+        return int(np.count_nonzero(self.puzzle._array))
+
+
+def default_check_limit(block_size: int) -> float | None:
+    """
+    Returns the default time limit of the search-based uniqueness checks:
+    `SEARCH_CHECK_LIMIT` up to `SEARCH_MAX_BLOCK_SIZE`, `None`
+    (propagation only) for the larger grids.
+    """
+    return SEARCH_CHECK_LIMIT if block_size <= SEARCH_MAX_BLOCK_SIZE else None
+
+
+def random_solution(block_size: int, rng: np.random.Generator) -> SudokuGrid:
+    """
+    Creates a random full valid grid.
+
+    Parameters:
+    -----------
+    block_size: int
+        size of the blocks, the grid is `block_size**2` wide
+    rng: np.random.Generator
+        random generator
+
+    Returns:
+    --------
+    solution: SudokuGrid
+        a full valid grid
+    """
+    bs = block_size
+    n = bs * bs
+    # wzór bazowy: przesunięcie o `bs` w kolejnych wierszach pasma, o 1 między pasmami
+    r = np.arange(n)[:, None]
+    c = np.arange(n)[None, :]
+    pattern = (bs * (r % bs) + r // bs + c) % n
+
+    def order() -> npt.NDArray[np.intp]:
+        # losowa kolejność pasm i losowa kolejność wierszy w każdym paśmie
+        bands = rng.permutation(bs)
+        within = np.argsort(rng.random((bs, bs)), axis=1)
+        return (bands[:, None] * bs + within).ravel()
+
+    grid = pattern[order()][:, order()]
+    if rng.random() < 0.5:
+        grid = grid.T
+    labels = rng.permutation(n) + 1
+    return SudokuGrid(labels[grid].astype(SudokuGrid.compact_dtype(n)))
+
+
+def dig(
+    solution: SudokuGrid,
+    rng: np.random.Generator,
+    holes: float = 1.0,
+    check_limit: float | None = SEARCH_CHECK_LIMIT,
+) -> tuple[SudokuGrid, SolverStats]:
+    """
+    Removes clues of a full grid while the puzzle keeps a unique solution.
+
+    A trial is accepted at once when constraint propagation solves it
+    (propagation only removes candidates which cannot be in any solution,
+    so it proves uniqueness); otherwise it has to pass `count_solutions`
+    within `check_limit`.
+
+    Parameters:
+    -----------
+    solution: SudokuGrid
+        a full valid grid
+    rng: np.random.Generator
+        random generator
+    holes: float
+        fraction of the cells whose removal is attempted, `1.0` tries all of them
+    check_limit: float | None
+        time limit (in seconds) of a single search-based uniqueness check,
+        a check that times out counts as "not unique"; `None` accepts
+        only the trials solved by propagation
+
+    Returns:
+    --------
+    puzzle: tuple[SudokuGrid, SolverStats]
+        the puzzle and the statistics of its last successful uniqueness check
+    """
+    n = solution.size
+    values = np.array(solution._array)
+    cells = rng.permutation(n * n)[: round(holes * n * n)]
+    stats = SolverStats()
+    batch = max(len(cells) // 8, 1)
+    i = 0
+    while i < len(cells):
+        chunk = cells[i : i + batch]
+        trial = values.copy()
+        trial.flat[chunk] = 0
+        unique, trial_stats = _unique(SudokuGrid(trial), check_limit)
+        if unique:
+            values = trial
+            stats = trial_stats
+            i += len(chunk)
+            batch *= 2
+        elif batch > 1:
+            batch //= 2
+        else:
+            # tej wskazówki nie można usunąć
+            i += 1
+    return SudokuGrid(values), stats
+
+
+def _unique(puzzle: SudokuGrid, check_limit: float | None) -> tuple[bool, SolverStats]:
+    """
+    Checks whether a puzzle made from a valid grid has a unique solution,
+    by propagation first and by a time-limited search if that is not enough.
+    """
+    candidates = candidates_from_grid(puzzle)
+    if propagate(candidates) and is_solved(candidates):
+        return True, SolverStats()
+    if check_limit is None:
+        return False, SolverStats()
+    result = count_solutions(puzzle, 2, check_limit)
+    return result.unique, result.stats
+
+
+def grade(puzzle: SudokuGrid, effort: int) -> str:
+    """
+    Grades a unique puzzle.
+
+    Parameters:
+    -----------
+    puzzle: SudokuGrid
+        a puzzle with a unique solution
+    effort: int
+        number of search nodes needed to prove its uniqueness
+
+    Returns:
+    --------
+    grade: str
+        - "easy" if naked and hidden singles solve it
+        - "medium" if pointing pairs and box-line reduction are needed as well
+        - "hard" if it needs search, with at most two nodes per empty cell
+        - "expert" otherwise
+    """
+    candidates = candidates_from_grid(puzzle)
+    if propagate(candidates, intersections=False) and is_solved(candidates):
+        return "easy"
+    if propagate(candidates, intersections=True) and is_solved(candidates):
+        return "medium"
+    empty = puzzle.size**2 - int(np.count_nonzero(puzzle._array))
+    return "hard" if effort <= 2 * empty else "expert"
+
+
+def generate_puzzle(
+    block_size: int,
+    seed: int,
+    holes: float = 1.0,
+    check_limit: float | None = SEARCH_CHECK_LIMIT,
+) -> GeneratedPuzzle:
+    """
+    Generates a single graded puzzle.
+
+    Parameters:
+    -----------
+    block_size: int
+        size of the blocks, from `MIN_BLOCK_SIZE` to `MAX_BLOCK_SIZE`
+    seed: int
+        seed of the random generator
+    holes: float
+        fraction of the cells whose removal is attempted
+    check_limit: float | None
+        time limit (in seconds) of a single search-based uniqueness check,
+        `None` for propagation only
+
+    Returns:
+    --------
+    puzzle: GeneratedPuzzle
+        the puzzle with its solution and grade
+
+    Raises:
+    -------
+    value_error: ValueError
+        when the block size is out of range
+    """
+    if not MIN_BLOCK_SIZE <= block_size <= MAX_BLOCK_SIZE:
+        raise ValueError(
+            f"Block size must be between {MIN_BLOCK_SIZE} and {MAX_BLOCK_SIZE}"
+        )
+    rng = np.random.default_rng(seed)
+    solution = random_solution(block_size, rng)
+    puzzle, stats = dig(solution, rng, holes, check_limit)
+    return GeneratedPuzzle(
+        puzzle, solution, grade(puzzle, stats.nodes), stats.nodes, seed
+    )
+
+
+def _generate_array(
+    block_size: int, seed: int, holes: float, check_limit: float | None
+) -> tuple[npt.NDArray[np.uint], str, int, int]:
+    """
+    Worker task: generates a puzzle and returns it in a picklable form.
+    """
+    generated = generate_puzzle(block_size, seed, holes, check_limit)
+    return np.asarray(generated.puzzle._array), generated.grade, generated.effort, seed
+
+
+def generate(
+    block_size: int,
+    count: int,
+    out_dir: str,
+    jobs: int = 1,
+    seed: int = 0,
+    output_format: str = "text",
+    holes: float = 1.0,
+    check_limit: float | None = SEARCH_CHECK_LIMIT,
+    index: TextIO | None = None,
+) -> dict[str, int]:
+    """
+    Generates puzzles in parallel and writes them to files named like the
+    bundled ones, `sudokuN{block_size}num{i}.txt` (or `.npy`).
+
+    Parameters:
+    -----------
+    block_size: int
+        size of the blocks
+    count: int
+        number of puzzles
+    out_dir: str
+        output directory, created if missing
+    jobs: int
+        number of worker processes, `1` generates in the current process
+    seed: int
+        base seed, puzzle `i` is generated from the seed `seed + i`
+    output_format: str
+        "text" (the format read by `SudokuGrid.from_text`) or "npy"
+        (the binary format read by `SudokuGrid.load`)
+    holes: float
+        fraction of the cells whose removal is attempted
+    check_limit: float | None
+        time limit (in seconds) of a single search-based uniqueness check,
+        `None` for propagation only
+    index: TextIO | None
+        stream receiving a JSON line per puzzle (path, clues, grade, effort, seed)
+
+    Returns:
+    --------
+    counts: dict[str, int]
+        number of puzzles per grade
+
+    Raises:
+    -------
+    value_error: ValueError
+        when the block size is out of range or the output format is unknown
+    """
+    if not MIN_BLOCK_SIZE <= block_size <= MAX_BLOCK_SIZE:
+        raise ValueError(
+            f"Block size must be between {MIN_BLOCK_SIZE} and {MAX_BLOCK_SIZE}"
+        )
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: '{output_format}'")
+    os.makedirs(out_dir, exist_ok=True)
+    counts = dict.fromkeys(GRADES, 0)
+    suffix = ".txt" if output_format == "text" else ".npy"
+
+    def write(number: int, result: tuple[npt.NDArray[np.uint], str, int, int]) -> None:
+        array, puzzle_grade, effort, puzzle_seed = result
+        puzzle = SudokuGrid(array)
+        path = os.path.join(out_dir, f"sudokuN{block_size}num{number}{suffix}")
+        if output_format == "text":
+            with open(path, "w") as out:
+                out.write(puzzle.to_text() + "\n")
+        else:
+            puzzle.save(path)
+        counts[puzzle_grade] += 1
+        if index is not None:
+            record: dict[str, Any] = {
+                "path": path,
+                "clues": int(np.count_nonzero(array)),
+                "grade": puzzle_grade,
+                "effort": effort,
+                "seed": puzzle_seed,
+            }
+            index.write(json.dumps(record) + "\n")
+
+    for number, result in enumerate(
+        _results(block_size, count, jobs, seed, holes, check_limit)
+    ):
+        write(number, result)
+    return counts
+
+
+def _results(
+    block_size: int,
+    count: int,
+    jobs: int,
+    seed: int,
+    holes: float,
+    check_limit: float | None,
+) -> Iterator[tuple[npt.NDArray[np.uint], str, int, int]]:
+    """
+    Yields generated puzzles in the order of their seeds.
+    """
+    seeds = range(seed, seed + count)
+    if jobs <= 1:
+        for puzzle_seed in seeds:
+            yield _generate_array(block_size, puzzle_seed, holes, check_limit)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        # małe paczki zadań ograniczają narzut komunikacji przy małych planszach
+        chunksize = max(1, min(64, count // (8 * jobs)))
+        yield from pool.map(
+            _generate_array,
+            [block_size] * count,
+            seeds,
+            [holes] * count,
+            [check_limit] * count,
+            chunksize=chunksize,
+        )
@@ -0,0 +1,139 @@
+"""
+Index tables describing the layout of an `n`x`n` grid: the block of every
+cell, the cells of every row, column and block and the peers of every cell.
+
+The tables depend only on the size of the grid, so `geometry` builds them
+once per size and process and all the grids of that size share them.
+The arrays are read-only; a pickled geometry (e.g. sent to a worker process)
+is unpickled as the table cached in the receiving process.
+Cells are addressed by the flat index `row * n + col`, so the tables
+can be used directly for gathers from `grid.ravel()`.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class GridGeometry:
+    """
+    Layout of an `n`x`n` grid with `bs`x`bs` blocks, see `geometry`.
+
+    Attributes:
+    -----------
+    size: int
+        size `n` of the grid
+    block_size: int
+        size `bs` of a single block
+    cell_blocks: npt.NDArray[np.intp]
+        (n, n) index of the block of every cell, see `SudokuGrid`
+    rows: npt.NDArray[np.intp]
+        (n, n) flat indices of the cells of every row
+    cols: npt.NDArray[np.intp]
+        (n, n) flat indices of the cells of every column
+    blocks: npt.NDArray[np.intp]
+        (n, n) flat indices of the cells of every block, row by row
+    units: npt.NDArray[np.intp]
+        (3n, n) all the rows, then all the columns, then all the blocks
+    block_slices: tuple[tuple[slice, slice], ...]
+        (row slice, column slice) of every block
+
+    Properties:
+    -----------
+    peers: npt.NDArray[np.unsignedinteger]
+        (n * n, 3n - 2bs - 1) flat indices of the peers of every cell
+    """
+
+    size: int
+    block_size: int
+    cell_blocks: npt.NDArray[np.intp]
+    rows: npt.NDArray[np.intp]
+    cols: npt.NDArray[np.intp]
+    blocks: npt.NDArray[np.intp]
+    units: npt.NDArray[np.intp]
+    block_slices: tuple[tuple[slice, slice], ...]
+
+    @property
+    def peers(self) -> npt.NDArray[np.unsignedinteger]:
+        """
+        Returns the flat indices of the other cells of the row, column
+        and block of every cell (each peer once, in ascending order).
+        Built on the first use - it takes `O(n^3)` memory.
+        """
+        return _peers(self.size)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (geometry, (self.size,))
+
+
+@functools.cache
+def geometry(size: int) -> GridGeometry:
+    """
+    Returns the geometry of an `n`x`n` grid, built once per size.
+
+    Parameters:
+    -----------
+    size: int
+        size `n` of the grid
+
+    Returns:
+    --------
+    geometry: GridGeometry
+        the shared index tables
+
+    Raises:
+    -------
+    value_error: ValueError
+        when the size is not a perfect square
+    """
+    bs = math.isqrt(size)
+    if size < 1 or bs * bs != size:
+        raise ValueError("Grid size must be a perfect square (blocks of equal size)")
+    n = size
+    flat = np.arange(n * n, dtype=np.intp).reshape(n, n)
+    rows, cols = np.indices((n, n))
+    cell_blocks = (rows // bs) * bs + cols // bs
+    # (wiersz bloków, wiersz w bloku, kolumna bloków, kolumna w bloku) -> bloki jako wiersze
+    blocks = flat.reshape(bs, bs, bs, bs).transpose(0, 2, 1, 3).reshape(n, n)
+    tables = (cell_blocks, flat, np.ascontiguousarray(flat.T), blocks)
+    units = np.concatenate(tables[1:])
+    for table in (*tables, units):
+        table.flags.writeable = False
+    block_slices = tuple(
+        (slice(r, r + bs), slice(c, c + bs))
+        for r in range(0, n, bs)
+        for c in range(0, n, bs)
+    )
+    return GridGeometry(
+        n, bs, cell_blocks, flat, tables[2], blocks, units, block_slices
+    )
+
+
+@functools.cache
+def _peers(size: int) -> npt.NDArray[np.unsignedinteger]:
+    """
+    Builds the peer table of `GridGeometry.peers`.
+    """
+    geo = geometry(size)
+    n, bs = size, geo.block_size
+    dtype = np.min_scalar_type(n * n - 1)
+    cells = np.arange(n * n)
+    row, col = np.divmod(cells, n)
+    block = geo.cell_blocks.ravel()
+    # wiersz, kolumna i blok każdej komórki; powtórzenia i sama komórka są usuwane po sortowaniu
+    units = [table.astype(dtype) for table in (geo.rows, geo.cols, geo.blocks)]
+    candidates = np.concatenate((units[0][row], units[1][col], units[2][block]), axis=1)
+    candidates.sort(axis=1)
+    keep = np.ones(candidates.shape, dtype=bool)
+    keep[:, 1:] = candidates[:, 1:] != candidates[:, :-1]
+    keep &= candidates != cells[:, None]
+    peers = candidates[keep].reshape(n * n, 3 * n - 2 * bs - 1)
+    peers.flags.writeable = False
+    return peers
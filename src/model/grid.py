@@ -1,9 +1,20 @@
 from __future__ import annotations
+
+import os
 from dataclasses import dataclass
-import math # noqa
+from typing import BinaryIO
+
 import numpy as np
 import numpy.typing as npt
 
+from src.model.geometry import GridGeometry, geometry
+from src.model.validation import validate
+
+# najdłuższa liczba, która na pewno mieści się w uint64
+_MAX_DIGITS = 19
+# początek każdego pliku .npy
+_NPY_MAGIC = b"\x93NUMPY"
+
 
 @dataclass(frozen=True, slots=True)
 class SudokuGrid:
@@ -63,7 +74,9 @@ class SudokuGrid:
     ---------------------
     _array: npt.NDArray[np.uint]
         Underlying representation of the grid.
-        Uses dtype=np.uint to ensure its values are non-negative integer numbers.
+        Uses an unsigned dtype to ensure its values are non-negative integer numbers;
+        grids created by this class use the smallest one able to hold the values
+        (see `compact_dtype`). The array may be a read-only `np.memmap` (see `load`).
 
     Properties:
     -----------
@@ -71,6 +84,8 @@ class SudokuGrid:
         size of the grid
     block_size: int
         size of the single block
+    geometry: GridGeometry
+        index tables of the grid layout, shared by all the grids of the same size
 
     Methods:
     --------
@@ -86,28 +101,42 @@ class SudokuGrid:
         returns a block of the grid with the given index
     copy() -> SudokuGrid:
         returns a copy of the grid
+    is_consistent() -> bool:
+        checks that the filled cells break no sudoku rule
+    is_solved() -> bool:
+        checks that the grid is a valid sudoku solution
+    to_text() -> str:
+        returns the basic textual representation of the grid
+    save(path: str | os.PathLike | BinaryIO) -> None:
+        writes the grid in the binary `.npy` format
 
     Static Methods:
     ---------------
     from_text(lines: list[str]) -> SudokuGrid:
         creates the grid from a textual representation
+    from_file(path: str | os.PathLike) -> SudokuGrid:
+        reads the grid from a file with the textual or binary representation
+    load(path: str | os.PathLike, mmap: bool = True) -> SudokuGrid:
+        reads the grid from a binary `.npy` file, memory-mapped by default
+    compact_dtype(max_value: int) -> np.dtype:
+        returns the smallest unsigned dtype able to hold the given value
     """
 
     _array: npt.NDArray[np.uint]
 
     def __post_init__(self) -> None:
-        # TODO: 
+        # TODO:
         # make sure that:
         # - self._array is 2-dimensional
         # - self._array is a square
         # - self._array can be split into blocks
         #
-        # If the _array fails any of tests, 
+        # If the _array fails any of tests,
         # raise a ValueError
-        # 
+        #
         # tip. self._array.shape is a `shape` of the array.
         #      It's a tuple, e.g. (3,2) is a shape of an array
-        #      with 3 rows and 2 columns. 
+        #      with 3 rows and 2 columns.
         arr = self._array
         # Sprawdź, czy tablica jest 2-wymiarowa
         if arr.ndim != 2:
@@ -116,11 +145,8 @@ class SudokuGrid:
         rows, cols = arr.shape
         if rows != cols:
             raise ValueError("Grid must be square (n x n)")
-        # Sprawdź, czy rozmiar jest kwadratem liczby całkowitej
-        size = rows
-        block_size = math.isqrt(size)
-        if block_size * block_size != size:
-            raise ValueError("Grid size must be a perfect square (blocks of equal size)")
+        # Sprawdź, czy rozmiar jest kwadratem liczby całkowitej (geometria rzuca ValueError)
+        geometry(rows)
 
     @property
     def size(self) -> int:
@@ -146,7 +172,19 @@ class SudokuGrid:
         """
         # TODO:
         # Implement the method according to the docstring
-        return math.isqrt(self.size)
+        return geometry(self._array.shape[0]).block_size
+
+    @property
+    def geometry(self) -> GridGeometry:
+        """
+        Returns the index tables of the grid layout (see `src.model.geometry`).
+
+        Returns:
+        --------
+        geometry: GridGeometry
+            the geometry shared by all the grids of this size
+        """
+        return geometry(self._array.shape[0])
 
     def __getitem__(self, coords: tuple[int, int]) -> np.uint:
         """
@@ -208,10 +246,7 @@ class SudokuGrid:
         # - implement the method according to the docstring
         #
         # tip. check the docstring of the class to know what is the block index
-        bs = self.block_size
-        block_row = cell_row // bs
-        block_col = cell_column // bs
-        return block_row * bs + block_col
+        return int(self.geometry.cell_blocks[cell_row, cell_column])
 
     def block(self, block_index: int) -> npt.NDArray[np.uint]:
         """
@@ -231,26 +266,59 @@ class SudokuGrid:
         # - implement the method according to the docstring
         # tip 1. use array slicing: https://www.w3schools.com/python/numpy/numpy_array_slicing.asp
         # tip 2. check the docstring of the class to know what is the block index
-        bs = self.block_size
-        n = self.size
-        blocks_per_row = n // bs  # == bs
-        block_row = block_index // blocks_per_row
-        block_col = block_index % blocks_per_row
-        row_start = block_row * bs
-        col_start = block_col * bs
-        return self._array[row_start:row_start + bs, col_start:col_start + bs]
-
+        return self._array[self.geometry.block_slices[block_index]]
 
     def copy(self) -> SudokuGrid:
-            """
-            Creates copy of the grid.
+        """
+        Creates copy of the grid.
+
+        Returns:
+        -------
+        copy: SudokuGrid
+            a copy of the current grid
+        """
+        # np.array zamiast .copy(), żeby kopia memmapy była zwykłą tablicą
+        return SudokuGrid(np.array(self._array))
+
+    def is_consistent(self) -> bool:
+        """
+        Checks that no value occurs twice in a row, column or block
+        and that no value exceeds the size of the grid (empty cells are ignored).
 
-            Returns:
-            -------
-            copy: SudokuGrid
-                a copy of the current grid
-            """
-            return SudokuGrid(self._array.copy())
+        Returns:
+        --------
+        consistent: bool
+            whether the filled cells break no sudoku rule
+        """
+        return bool(validate(np.asarray(self._array)[None])[0][0])
+
+    def is_solved(self) -> bool:
+        """
+        Checks that the grid is full and every row, column and block
+        contains every value exactly once.
+
+        Returns:
+        --------
+        solved: bool
+            whether the grid is a valid sudoku solution
+        """
+        return bool(validate(np.asarray(self._array)[None])[1][0])
+
+    def save(self, path: str | os.PathLike | BinaryIO) -> None:
+        """
+        Writes the grid in the binary `.npy` format,
+        which can be memory-mapped back with `load`.
+
+        Parameters:
+        -----------
+        path: str | os.PathLike | BinaryIO
+            path of the file or a binary stream
+        """
+        if hasattr(path, "write"):
+            np.save(path, np.asarray(self._array))
+            return
+        with open(path, "wb") as f:
+            np.save(f, np.asarray(self._array))
 
     def __str__(self) -> str:
         """
@@ -277,41 +345,71 @@ class SudokuGrid:
         ascii_representation: str
             string containing a pretty ascii representation of the grid
         """
-        # TODO: 
+        # TODO:
         # Implement the method according to the docstring.
         # tip. formatting numbers should be done via `format`
         #   https://docs.python.org/3/library/string.html#format-examples
-        #.  https://www.w3schools.com/python/ref_string_format.asp
+        # .  https://www.w3schools.com/python/ref_string_format.asp
         n = self.size
         bs = self.block_size
         width = len(str(n))  # szerokość do wyrównania większych cyfr
-
-        # Funkcja pomocnicza: generuje reprezentację wiersza numer row
-        def format_row(row: int) -> str:
-            row_vals = [self._array[row, j] for j in range(n)]
-            blocks_str = []
-            for b in range(bs):
-                start = b * bs
-                block_vals = row_vals[start:start + bs]
-                # Formatowanie każdej liczby na stałą szerokość
-                formatted = [format(int(val), f">{width}") for val in block_vals]
-                blocks_str.append(",".join(formatted))
-            return "| " + " | ".join(blocks_str) + " |"
-
-        lines = []
-        # Pierwszy wiersz i pierwsza linia pozioma
-        first_row_str = format_row(0)
-        dashed = "-" * len(first_row_str)
-        lines.append(dashed)
-        lines.append(first_row_str)
-        # Pozostałe wiersze
-        for row in range(1, n):
-            if row % bs == 0:
+        keys, index = self._lookup_index()
+
+        # Tablice wyrównanych liczb razem z następującym po nich separatorem,
+        # indeksowane bezpośrednio wartościami komórek
+        padded = [format(v, f">{width}") for v in keys]
+        inner = np.array([p + "," for p in padded], dtype=object)
+        edge = np.array([p + " | " for p in padded], dtype=object)
+        block_end = np.arange(n) % bs == bs - 1
+        cells = np.where(block_end, edge[index], inner[index])
+
+        # jeden join na wiersz; ostatni separator " | " traci końcową spację
+        rows = ["| " + "".join(row)[:-1] for row in cells.tolist()]
+        dashed = "-" * len(rows[0])
+        lines = [dashed]
+        for row, row_str in enumerate(rows):
+            lines.append(row_str)
+            if row % bs == bs - 1:
                 lines.append(dashed)  # oddziel blok w poziomie
-            lines.append(format_row(row))
-        lines.append(dashed)  # zakończenie wierszy
         return "\n".join(lines)
 
+    def to_text(self) -> str:
+        """
+        Returns the basic textual representation of the grid,
+        the one read by `from_text`, e.g.
+
+        ```
+        4,5,0,7
+        0,2,0,4
+        ...
+        ```
+
+        Returns:
+        --------
+        text: str
+            comma-separated values, one row per line
+        """
+        keys, index = self._lookup_index()
+        table = np.array([str(v) for v in keys], dtype=object)
+        return "\n".join(",".join(row) for row in table[index].tolist())
+
+    def _lookup_index(self) -> tuple[list[int], npt.NDArray]:
+        """
+        Prepares indexing of per-value lookup tables by the grid cells.
+
+        Returns:
+        --------
+        keys: list[int]
+            values the lookup table has to cover, in the table order
+        index: npt.NDArray
+            position of every cell's value in the table
+        """
+        values = np.asarray(self._array)
+        if values.max(initial=0) <= self.size:
+            return list(range(self.size + 1)), values
+        # wartości spoza zakresu - tablica tylko dla występujących wartości
+        keys, index = np.unique(values, return_inverse=True)
+        return keys.tolist(), index.reshape(values.shape)
 
     @staticmethod
     def from_text(lines: list[str]) -> SudokuGrid:
@@ -341,12 +439,169 @@ class SudokuGrid:
             a new sudoku grid
         """
 
-        # TODO: 
+        # TODO:
         # Implement the method according to the docstring.
         # - if `lines` are ill-formatted, raise a ValueError
         # tip. there are many ways to initialize an array
         #      the easiest is to start with normal lists:
         #      https://numpy.org/devdocs/user/basics.creation.html#converting-python-sequences-to-numpy-arrays
+        if not lines:
+            raise ValueError("No lines provided")
+        arr = SudokuGrid._parse_csv("\n".join(lines).encode())
+        if arr is not None:
+            return SudokuGrid(arr)
+        return SudokuGrid._from_lines(lines)
+
+    @staticmethod
+    def from_file(path: str | os.PathLike) -> SudokuGrid:
+        """
+        Reads a grid from a file with the textual representation
+        (see `from_text`), decoding the whole file at once with numpy.
+        Files in the binary `.npy` format (see `save`) are memory-mapped with `load`.
+
+        Parameters:
+        -----------
+        path: str | os.PathLike
+            path of the file
+
+        Returns:
+        ---------
+        grid: SudokuGrid
+            a new sudoku grid
+
+        Raises:
+        -------
+        os_error: OSError
+            when the file cannot be read
+        value_error: ValueError
+            when the file is ill-formatted, the same as `from_text`
+        """
+        with open(path, "rb") as f:
+            data = f.read(len(_NPY_MAGIC))
+            if data == _NPY_MAGIC:
+                return SudokuGrid.load(path)
+            data += f.read()
+        arr = SudokuGrid._parse_csv(data)
+        if arr is not None:
+            return SudokuGrid(arr)
+        return SudokuGrid.from_text(data.decode().strip().splitlines())
+
+    @staticmethod
+    def load(path: str | os.PathLike, mmap: bool = True) -> SudokuGrid:
+        """
+        Reads a grid from a binary `.npy` file written by `save`.
+
+        Parameters:
+        -----------
+        path: str | os.PathLike
+            path of the file
+        mmap: bool
+            - `True` - the grid is a read-only view of the file (`np.memmap`),
+              nothing is copied and the pages are shared between processes
+            - `False` - the file is read into memory
+
+        Returns:
+        ---------
+        grid: SudokuGrid
+            a new sudoku grid
+
+        Raises:
+        -------
+        value_error: ValueError
+            when the file does not hold an unsigned integer square grid
+        """
+        arr = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        if not np.issubdtype(arr.dtype, np.unsignedinteger):
+            raise ValueError(
+                f"Grid must have an unsigned integer dtype, got {arr.dtype}"
+            )
+        return SudokuGrid(arr)
+
+    @staticmethod
+    def compact_dtype(max_value: int) -> np.dtype:
+        """
+        Returns the smallest unsigned integer dtype able to hold the value.
+
+        Parameters:
+        -----------
+        max_value: int
+            the largest value to be stored, e.g. the size of the grid
+
+        Returns:
+        --------
+        dtype: np.dtype
+            one of uint8, uint16, uint32 or uint64
+        """
+        return np.min_scalar_type(max_value) if max_value > 0 else np.dtype(np.uint8)
+
+    @staticmethod
+    def _compact(values: npt.NDArray) -> npt.NDArray[np.uint]:
+        """
+        Converts grid values to the smallest sufficient dtype.
+        """
+        n = values.shape[0] if values.ndim else 0
+        return values.astype(
+            SudokuGrid.compact_dtype(max(n, int(values.max(initial=0))))
+        )
+
+    @staticmethod
+    def _parse_csv(data: bytes) -> npt.NDArray[np.uint] | None:
+        """
+        Decodes comma-separated digits with whole-array operations.
+        Handles only the well-formed input (digits, commas and newlines,
+        a square table with no empty cells).
+
+        Parameters:
+        -----------
+        data: bytes
+            contents of a puzzle file
+
+        Returns:
+        --------
+        array: npt.NDArray[np.uint] | None
+            - decoded grid values
+            - `None` if the input has to go through the line-by-line parser
+        """
+        if b"\r" in data:
+            data = data.replace(b"\r\n", b"\n")
+        buf = np.frombuffer(data.strip(), dtype=np.uint8)
+        if buf.size == 0:
+            return None
+        newline = buf == ord("\n")
+        sep = newline | (buf == ord(","))
+        digits = buf - np.uint8(
+            ord("0")
+        )  # bajty spoza '0'..'9' przekręcają się powyżej 9
+        if not ((digits < 10) | sep).all():
+            return None
+
+        # granice tokenów: każdy separator kończy jeden token
+        sep_pos = np.flatnonzero(sep)
+        ends = np.append(sep_pos, buf.size)
+        starts = np.insert(sep_pos + 1, 0, 0)
+        lengths = ends - starts
+        if lengths.min() == 0 or lengths.max() > _MAX_DIGITS:
+            return None
+        n = int(np.count_nonzero(newline)) + 1
+        if ends.size != n * n:
+            return None
+        row_ends = np.append(np.flatnonzero(newline[sep_pos]), ends.size - 1)
+        if not (np.diff(row_ends, prepend=-1) == n).all():
+            return None
+
+        # wartość tokenu: k-ta cyfra od końca leży tuż przed jego separatorem
+        values = np.zeros(ends.size, dtype=np.uint64)
+        for k in range(int(lengths.max())):
+            digit_k = np.where(lengths > k, digits[ends - 1 - k], 0)
+            values += digit_k * np.uint64(10**k)
+        return SudokuGrid._compact(values.reshape(n, n))
+
+    @staticmethod
+    def _from_lines(lines: list[str]) -> SudokuGrid:
+        """
+        Reads a grid line by line, see `from_text`.
+        Reports precisely what is wrong with ill-formatted lines.
+        """
         if not lines:
             raise ValueError("No lines provided")
         rows_list = []
@@ -379,4 +634,4 @@ class SudokuGrid:
             arr = np.array(rows_list, dtype=np.uint)
         except Exception as e:
             raise ValueError("Could not create grid array") from e
-        return SudokuGrid(arr)
+        return SudokuGrid(SudokuGrid._compact(arr))
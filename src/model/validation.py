@@ -0,0 +1,74 @@
+"""
+Vectorized validity checks of sudoku grids.
+
+The rows, columns and blocks (gathered with the cached `units` table of
+`src.model.geometry`) of a whole (B, n, n) stack of grids are laid out
+as B * 3n units of n cells and the
+occurrences of every value in every unit are counted with a single
+`np.bincount`, so the cost is linear in the number of cells and does not
+depend on how the cells are split between the grids.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.geometry import geometry
+
+
+def validate(
+    grids: npt.ArrayLike,
+) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+    """
+    Checks a stack of grids of the same size.
+
+    Parameters:
+    -----------
+    grids: npt.ArrayLike
+        (B, n, n) array of non-negative values, `0` for an empty cell
+
+    Returns:
+    --------
+    masks: tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]
+        two (B,) boolean arrays:
+        - `consistent` - no value occurs twice in a row, column or block
+          and no value exceeds `n`
+        - `solved` - the grid is full and consistent
+
+    Raises:
+    -------
+    value_error: ValueError
+        when the array is not a stack of square grids split into blocks
+        or contains negative values
+    """
+    values = np.asarray(grids)
+    if values.ndim != 3 or values.shape[1] != values.shape[2]:
+        raise ValueError("Grids must be a (B, n, n) stack")
+    count, n = values.shape[0], values.shape[1]
+    geo = geometry(n)
+    if values.dtype.kind not in "ui":
+        raise ValueError("Grids must hold integer values")
+    if values.dtype.kind == "i" and values.min(initial=0) < 0:
+        raise ValueError("Grids must hold non-negative values")
+    if count == 0:
+        empty = np.zeros(0, dtype=bool)
+        return empty, empty.copy()
+
+    # wartości spoza zakresu liczone jako puste, taka plansza i tak jest odrzucana
+    too_large = (values > n).any(axis=(1, 2))
+    # zbieranie jednostek na najwęższym typie, klucze i tak są liczone w np.intp
+    values = np.where(values > n, 0, values).astype(np.min_scalar_type(n))
+
+    units = values.reshape(count, n * n)[:, geo.units]
+    # klucz (jednostka, wartość) - jednostki kolejnych plansz leżą obok siebie
+    keys = units + (n + 1) * np.arange(count * 3 * n, dtype=np.intp).reshape(
+        count, 3 * n, 1
+    )
+    occurrences = np.bincount(keys.ravel(), minlength=count * 3 * n * (n + 1))
+    occurrences = occurrences.reshape(count, 3 * n, n + 1)[:, :, 1:]
+
+    consistent = (occurrences <= 1).all(axis=(1, 2)) & ~too_large
+    # pełna jednostka bez powtórzeń zawiera każdą wartość dokładnie raz
+    solved = (occurrences == 1).all(axis=(1, 2)) & ~too_large
+    return consistent, solved
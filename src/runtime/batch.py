@@ -0,0 +1,305 @@
+"""
+Batch solving of many puzzle files with a pool of worker processes.
+
+Results are streamed as JSON lines, one per puzzle, in the order
+the puzzles are solved:
+
+```
+{"path": "puzzles/sudokuN3num0.txt", "status": "SOLVED", "elapsed": 0.0012, "solution": [[4, 5, 3, ...], ...]}
+```
+"""
+
+import concurrent.futures
+import glob
+import json
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict
+from timeit import default_timer as timer
+from typing import Any, TextIO
+
+import numpy as np
+
+from src.cache.solution_cache import SolutionCache
+from src.model.grid import SudokuGrid
+from src.solvers.auto_solver import AutoSudokuSolver
+from src.solvers.caching_solver import CachingSudokuSolver
+from src.solvers.cancellation import CancellationToken
+from src.solvers.propagation import presolve as presolve_grid
+from src.solvers.registry import create_solver
+
+SOLVED = "SOLVED"
+INFEASIBLE = "INFEASIBLE"
+TIMEOUT = "TIMEOUT"
+ERROR = "ERROR"
+
+# rozszerzenia plików łamigłówek w katalogach (tekst i binarny zapis `generate --format npy`)
+PUZZLE_SUFFIXES = (".txt", ".npy")
+
+# pamięć podręczna rozwiązań każdego procesu roboczego, tworzona przy pierwszym użyciu
+_caches: dict[tuple[str, int], SolutionCache] = {}
+
+
+def _worker_cache(directory: str, max_entries: int) -> SolutionCache:
+    """
+    Returns the solution cache of the current process.
+    """
+    key = (directory, max_entries)
+    if key not in _caches:
+        _caches[key] = SolutionCache(max_entries, directory)
+    return _caches[key]
+
+
+def expand_paths(patterns: Iterable[str]) -> Iterator[str]:
+    """
+    Lazily expands files, directories and glob patterns into puzzle paths.
+
+    Parameters:
+    -----------
+    patterns: Iterable[str]
+        paths of files, directories (all `*.txt` and `*.npy` files inside)
+        or glob patterns, e.g. `puzzles/sudokuN3*.txt`
+
+    Returns:
+    --------
+    paths: Iterator[str]
+        paths of the puzzle files
+    """
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            with os.scandir(pattern) as entries:
+                names = sorted(
+                    e.name
+                    for e in entries
+                    if e.is_file() and e.name.endswith(PUZZLE_SUFFIXES)
+                )
+            for name in names:
+                yield os.path.join(pattern, name)
+        elif glob.has_magic(pattern):
+            for path in glob.iglob(pattern, recursive=True):
+                if os.path.isfile(path):
+                    yield path
+        else:
+            yield pattern
+
+
+def solve_file(
+    path: str,
+    solver_name: str,
+    time_limit: float | None,
+    presolve: bool = False,
+    cache_dir: str | None = None,
+    cache_size: int = 1024,
+) -> dict[str, Any]:
+    """
+    Reads and solves a single puzzle file. Never raises, failures are
+    reported with the `ERROR` status and an `error` message.
+
+    Parameters:
+    -----------
+    path: str
+        path of the puzzle file
+    solver_name: str
+        name of the solver (see `src.solvers.registry.SOLVERS`)
+    time_limit: float | None
+        time limit for the solver (in seconds), `None` if unlimited
+    presolve: bool
+        whether to fill the cells forced by propagation first
+    cache_dir: str | None
+        directory of the on-disk solution cache, `None` disables caching
+    cache_size: int
+        capacity of the in-memory solution cache of the worker
+
+    Returns:
+    --------
+    result: dict[str, Any]
+        a JSON-serializable record with `path`, `status`, `elapsed` and `solution`
+        (and `cached` when caching is enabled)
+    """
+    start = timer()
+    record: dict[str, Any] = {
+        "path": path,
+        "status": ERROR,
+        "elapsed": 0.0,
+        "solution": None,
+    }
+    try:
+        puzzle = SudokuGrid.from_file(path)
+    except Exception as e:
+        record["error"] = str(e)
+    else:
+        record.update(
+            solve_grid(puzzle, solver_name, time_limit, presolve, cache_dir, cache_size)
+        )
+    record["elapsed"] = round(timer() - start, 6)
+    return record
+
+
+def solve_grid(
+    puzzle: SudokuGrid,
+    solver_name: str,
+    time_limit: float | None,
+    presolve: bool = False,
+    cache_dir: str | None = None,
+    cache_size: int = 1024,
+) -> dict[str, Any]:
+    """
+    Solves a single puzzle. Never raises, failures are reported
+    with the `ERROR` status and an `error` message.
+
+    Puzzles with contradictory givens are `INFEASIBLE` without running
+    the solver and every solution is verified before it is returned.
+
+    Parameters:
+    -----------
+    puzzle: SudokuGrid
+        a sudoku puzzle to be solved
+    solver_name: str
+        name of the solver (see `src.solvers.registry.SOLVERS`)
+    time_limit: float | None
+        time limit for the solver (in seconds), `None` if unlimited
+    presolve: bool
+        whether to fill the cells forced by propagation first
+    cache_dir: str | None
+        directory of the on-disk solution cache, `None` disables caching
+    cache_size: int
+        capacity of the in-memory solution cache of the worker
+
+    Returns:
+    --------
+    result: dict[str, Any]
+        a JSON-serializable record with `status` and `solution`
+        (and `cached` when caching is enabled, `strategy` and `features`
+        with the `auto` solver)
+    """
+    record: dict[str, Any] = {"status": ERROR, "solution": None}
+    try:
+        if not puzzle.is_consistent():
+            record["status"] = INFEASIBLE
+            return record
+        grid: SudokuGrid | None = puzzle
+        if presolve:
+            # propagacja liczy się do limitu czasu, solver dostaje resztę
+            token = CancellationToken(time_limit)
+            grid = presolve_grid(puzzle, token)
+            time_limit = token.remaining()
+        solver = base_solver = create_solver(solver_name)
+        if cache_dir is not None:
+            solver = CachingSudokuSolver(solver, _worker_cache(cache_dir, cache_size))
+        try:
+            solution = solver.solve(grid, time_limit) if grid is not None else None
+        finally:
+            if (
+                isinstance(base_solver, AutoSudokuSolver)
+                and base_solver.features is not None
+            ):
+                record["strategy"] = base_solver.choice
+                record["features"] = asdict(base_solver.features)
+        if cache_dir is not None:
+            record["cached"] = solver.last_hit
+        if solution is not None and not _verified(puzzle, solution):
+            record["error"] = f"Solver {solver_name} returned an invalid solution"
+        elif solution is not None:
+            record["status"] = SOLVED
+            record["solution"] = solution._array.tolist()
+        else:
+            record["status"] = INFEASIBLE
+    except (TimeoutError, concurrent.futures.TimeoutError):
+        record["status"] = TIMEOUT
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def _verified(puzzle: SudokuGrid, solution: SudokuGrid) -> bool:
+    """
+    Checks that the solution is a valid full grid keeping the givens of the puzzle.
+    """
+    givens = np.asarray(puzzle._array)
+    values = np.asarray(solution._array)
+    if values.shape != givens.shape or not solution.is_solved():
+        return False
+    return bool(((givens == 0) | (givens == values)).all())
+
+
+def run_batch(
+    paths: Iterable[str],
+    solver_name: str,
+    time_limit: float | None,
+    jobs: int,
+    out: TextIO,
+    presolve: bool = False,
+    cache_dir: str | None = None,
+    cache_size: int = 1024,
+) -> dict[str, int]:
+    """
+    Solves puzzles in parallel and writes a JSON line per puzzle as soon as it is solved.
+
+    At most `2 * jobs` puzzles are in flight at once, so the input may be
+    an arbitrarily long (lazy) iterable of paths.
+
+    Parameters:
+    -----------
+    paths: Iterable[str]
+        paths of the puzzle files
+    solver_name: str
+        name of the solver (see `src.solvers.registry.SOLVERS`)
+    time_limit: float | None
+        time limit for every single puzzle (in seconds), `None` if unlimited
+    jobs: int
+        number of worker processes, `1` solves in the current process
+    out: TextIO
+        stream the JSON lines are written to
+    presolve: bool
+        whether to fill the cells forced by propagation first
+    cache_dir: str | None
+        directory of the on-disk solution cache shared by the workers,
+        `None` disables caching
+    cache_size: int
+        capacity of the in-memory solution cache of every worker
+
+    Returns:
+    --------
+    counts: dict[str, int]
+        number of puzzles per status
+    """
+    counts = {SOLVED: 0, INFEASIBLE: 0, TIMEOUT: 0, ERROR: 0}
+
+    def emit(record: dict[str, Any]) -> None:
+        counts[record["status"]] += 1
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    if jobs <= 1:
+        for path in paths:
+            emit(
+                solve_file(
+                    path, solver_name, time_limit, presolve, cache_dir, cache_size
+                )
+            )
+        return counts
+
+    max_pending = 2 * jobs
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: set[concurrent.futures.Future] = set()
+        for path in paths:
+            pending.add(
+                pool.submit(
+                    solve_file,
+                    path,
+                    solver_name,
+                    time_limit,
+                    presolve,
+                    cache_dir,
+                    cache_size,
+                )
+            )
+            if len(pending) >= max_pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    emit(future.result())
+        for future in concurrent.futures.as_completed(pending):
+            emit(future.result())
+    return counts
@@ -0,0 +1,123 @@
+"""
+A minimal blocking client of the solving server (see `src.runtime.server`).
+"""
+
+import itertools
+import json
+import socket
+from typing import Any, Self
+
+from src.model.grid import SudokuGrid
+
+
+class SolverClient:
+    """
+    A blocking connection to the solving server. Requests are sent
+    one at a time, so responses always come in order.
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid | str, time_limit: float | None = None, solver: str | None = None)
+        -> dict[str, Any]:
+        solves a puzzle on the server
+    stats() -> dict[str, Any]:
+        returns the counters of the server
+    close() -> None:
+        closes the connection
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        path: str | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Parameters:
+        -----------
+        host: str
+            TCP address of the server
+        port: int
+            TCP port of the server
+        path: str | None
+            path of the Unix socket of the server, used instead of TCP
+        timeout: float | None
+            socket timeout (in seconds), `None` blocks forever
+        """
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout)
+        self._file = self._socket.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Sends a raw request and waits for its response.
+
+        Raises:
+        -------
+        connection_error: ConnectionError
+            when the server closes the connection
+        """
+        request = {"id": next(self._ids), **request}
+        self._file.write(json.dumps(request).encode() + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(line)
+
+    def solve(
+        self,
+        puzzle: SudokuGrid | str,
+        time_limit: float | None = None,
+        solver: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Solves a puzzle on the server.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid | str
+            the puzzle, either a grid or a text in the `SudokuGrid.from_text` format
+        time_limit: float | None
+            time limit (in seconds), `None` uses the limit of the server
+        solver: str | None
+            name of the solver, `None` uses the solver of the server
+
+        Returns:
+        --------
+        response: dict[str, Any]
+            the response with `status`, `elapsed` and `solution`
+        """
+        request: dict[str, Any] = {
+            "puzzle": puzzle if isinstance(puzzle, str) else puzzle.to_text()
+        }
+        if time_limit is not None:
+            request["time_limit"] = time_limit
+        if solver is not None:
+            request["solver"] = solver
+        return self.request(request)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the throughput and latency counters of the server.
+        """
+        return self.request({"command": "stats"})["stats"]
+
+    def close(self) -> None:
+        """
+        Closes the connection.
+        """
+        self._file.close()
+        self._socket.close()
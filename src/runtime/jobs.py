@@ -0,0 +1,494 @@
+"""
+A durable job queue of puzzle files in an SQLite database, shared by
+worker processes on one or several hosts (through a shared filesystem).
+
+Every job is a puzzle path with its solver, time limit and presolving flag.
+A worker claims the oldest pending job in a single write transaction,
+so no job is ever given to two workers at once, and holds a lease on it,
+renewed by a heartbeat thread while the puzzle is being solved. A job whose
+lease has expired - its worker died or lost the filesystem - goes back
+to the queue on the next claim, up to `max_attempts` times, and is then
+finished with the `ERROR` status. All the state lives in the database,
+so the queue survives crashes of the workers and of the hosts.
+
+Results are the records of `src.runtime.batch.solve_file`:
+
+```
+{"path": "puzzles/sudokuN3num0.txt", "status": "SOLVED", "elapsed": 0.0012, "solution": [[4, 5, 3, ...], ...]}
+```
+
+The database uses the default rollback journal (not WAL), which relies
+only on file locking and works on network filesystems with working locks.
+Lease expiry is based on the wall clock, so the clocks of the hosts
+should be synchronized.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any, Self
+
+from src.runtime.batch import ERROR, INFEASIBLE, SOLVED, TIMEOUT, solve_file
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+EXPIRED = "EXPIRED"
+
+# czas oczekiwania (w sekundach) na zwolnienie blokady bazy przez inny proces
+_BUSY_TIMEOUT = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    solver TEXT NOT NULL,
+    time_limit REAL,
+    presolve INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'PENDING',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    result TEXT,
+    enqueued REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Job:
+    """
+    A claimed job.
+
+    Attributes:
+    -----------
+    id: int
+        identifier of the job
+    path: str
+        path of the puzzle file
+    solver: str
+        name of the solver (see `src.solvers.registry.SOLVERS`)
+    time_limit: float | None
+        time limit for the solver (in seconds), `None` if unlimited
+    presolve: bool
+        whether to fill the cells forced by propagation first
+    attempts: int
+        number of times the job has been claimed, including this one
+    """
+
+    id: int
+    path: str
+    solver: str
+    time_limit: float | None
+    presolve: bool
+    attempts: int
+
+
+def worker_name() -> str:
+    """
+    Returns a name identifying the current process across hosts, `host:pid`.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    A job queue stored in an SQLite database.
+
+    Attributes:
+    -----------
+    path: str
+        path of the database file
+    lease: float
+        time (in seconds) a claimed job is reserved for its worker
+        without a heartbeat
+    max_attempts: int
+        number of claims after which a job whose worker keeps dying
+        is finished with the `ERROR` status
+
+    Methods:
+    --------
+    enqueue(paths: Iterable[str], solver: str, time_limit: float | None, presolve: bool = False) -> int:
+        adds puzzle files to the queue
+    claim(worker: str) -> Job | None:
+        reserves the oldest pending job for a worker
+    renew(job: Job, worker: str) -> bool:
+        extends the lease of a claimed job
+    complete(job: Job, worker: str, record: dict[str, Any]) -> bool:
+        stores the result of a claimed job
+    counts() -> dict[str, int]:
+        returns the number of jobs per state and per result status
+    results() -> Iterator[dict[str, Any]]:
+        yields the result records of the finished jobs
+    close() -> None:
+        closes the database connection
+    """
+
+    path: str
+    lease: float
+    max_attempts: int
+
+    def __init__(self, path: str, lease: float = 60.0, max_attempts: int = 3) -> None:
+        """
+        Opens the queue, creating the database if it does not exist.
+
+        Parameters:
+        -----------
+        path: str
+            path of the database file
+        lease: float
+            time (in seconds) a claimed job is reserved without a heartbeat
+        max_attempts: int
+            number of claims of a job before it is given up
+        """
+        if lease <= 0:
+            raise ValueError("Lease must be positive")
+        if max_attempts < 1:
+            raise ValueError("Number of attempts must be positive")
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        # transakcje są otwierane jawnie (BEGIN IMMEDIATE)
+        self._db = sqlite3.connect(path, timeout=_BUSY_TIMEOUT, isolation_level=None)
+        with self._transaction():
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    self._db.execute(statement)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        self._db.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs a write transaction, taking the database lock at its start.
+        """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def enqueue(
+        self,
+        paths: Iterable[str],
+        solver: str,
+        time_limit: float | None,
+        presolve: bool = False,
+    ) -> int:
+        """
+        Adds puzzle files to the queue. Paths are stored as absolute paths;
+        paths already in the queue are skipped.
+
+        Parameters:
+        -----------
+        paths: Iterable[str]
+            paths of the puzzle files
+        solver: str
+            name of the solver (see `src.solvers.registry.SOLVERS`)
+        time_limit: float | None
+            time limit for every single puzzle (in seconds), `None` if unlimited
+        presolve: bool
+            whether to fill the cells forced by propagation first
+
+        Returns:
+        --------
+        added: int
+            number of new jobs
+        """
+        now = time.time()
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO jobs (path, solver, time_limit, presolve, enqueued) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (os.path.abspath(path), solver, time_limit, int(presolve), now)
+                    for path in paths
+                ),
+            )
+            return db.total_changes - before
+
+    def claim(self, worker: str) -> Job | None:
+        """
+        Reserves the oldest pending job for a worker. Jobs with an expired
+        lease are returned to the queue (or given up) first.
+
+        Parameters:
+        -----------
+        worker: str
+            name of the worker, see `worker_name`
+
+        Returns:
+        --------
+        job: Job | None
+            the claimed job, `None` if no job is pending
+        """
+        now = time.time()
+        with self._transaction() as db:
+            self._expire(db, now)
+            row = db.execute(
+                "SELECT id, path, solver, time_limit, presolve, attempts FROM jobs "
+                "WHERE state = ? ORDER BY id LIMIT 1",
+                (PENDING,),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, worker, now + self.lease, row[0]),
+            )
+        job_id, path, solver, time_limit, presolve, attempts = row
+        return Job(job_id, path, solver, time_limit, bool(presolve), attempts + 1)
+
+    def _expire(self, db: sqlite3.Connection, now: float) -> None:
+        """
+        Returns the running jobs with an expired lease to the queue,
+        or finishes them with the `ERROR` status after `max_attempts` claims.
+        """
+        for job_id, path, worker, attempts in db.execute(
+            "SELECT id, path, worker, attempts FROM jobs WHERE state = ? AND lease_until < ?",
+            (RUNNING, now),
+        ).fetchall():
+            if attempts < self.max_attempts:
+                db.execute(
+                    "UPDATE jobs SET state = ?, worker = NULL, lease_until = NULL WHERE id = ?",
+                    (PENDING, job_id),
+                )
+                continue
+            record = {
+                "path": path,
+                "status": ERROR,
+                "elapsed": 0.0,
+                "solution": None,
+                "error": f"Worker lost {attempts} times, last {worker}",
+            }
+            db.execute(
+                "UPDATE jobs SET state = ?, lease_until = NULL, status = ?, result = ?, finished = ? WHERE id = ?",
+                (DONE, ERROR, json.dumps(record), now, job_id),
+            )
+
+    def renew(self, job: Job, worker: str) -> bool:
+        """
+        Extends the lease of a claimed job by `lease` seconds from now.
+
+        Parameters:
+        -----------
+        job: Job
+            the claimed job
+        worker: str
+            name of the worker holding the job
+
+        Returns:
+        --------
+        renewed: bool
+            `False` if the job is no longer held by the worker
+        """
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND state = ? AND worker = ?",
+                (time.time() + self.lease, job.id, RUNNING, worker),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job: Job, worker: str, record: dict[str, Any]) -> bool:
+        """
+        Stores the result of a claimed job. The result is dropped
+        if the job has meanwhile been given to another worker.
+
+        Parameters:
+        -----------
+        job: Job
+            the claimed job
+        worker: str
+            name of the worker holding the job
+        record: dict[str, Any]
+            the result record with the `status` key, see `solve_file`
+
+        Returns:
+        --------
+        stored: bool
+            `False` if the job is no longer held by the worker
+        """
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET state = ?, lease_until = NULL, status = ?, result = ?, finished = ? "
+                "WHERE id = ? AND state = ? AND worker = ?",
+                (
+                    DONE,
+                    record["status"],
+                    json.dumps(record),
+                    time.time(),
+                    job.id,
+                    RUNNING,
+                    worker,
+                ),
+            )
+            return cursor.rowcount == 1
+
+    def counts(self) -> dict[str, int]:
+        """
+        Returns the number of jobs per state (`PENDING`, `RUNNING`, `EXPIRED`
+        - running with an expired lease) and per result status of the finished ones.
+        """
+        counts = {
+            PENDING: 0,
+            RUNNING: 0,
+            EXPIRED: 0,
+            SOLVED: 0,
+            INFEASIBLE: 0,
+            TIMEOUT: 0,
+            ERROR: 0,
+        }
+        rows = self._db.execute(
+            "SELECT CASE WHEN state = ? THEN status WHEN state = ? AND lease_until < ? THEN ? ELSE state END, "
+            "COUNT(*) FROM jobs GROUP BY 1",
+            (DONE, RUNNING, time.time(), EXPIRED),
+        )
+        for key, count in rows:
+            counts[key] = count
+        return counts
+
+    def results(self) -> Iterator[dict[str, Any]]:
+        """
+        Yields the result records of the finished jobs in the order they were enqueued.
+        """
+        for (result,) in self._db.execute(
+            "SELECT result FROM jobs WHERE state = ? ORDER BY id", (DONE,)
+        ):
+            yield json.loads(result)
+
+
+class _Heartbeat:
+    """
+    A thread renewing the lease of a job every third of the lease,
+    with its own database connection.
+    """
+
+    def __init__(self, path: str, lease: float, job: Job, worker: str) -> None:
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(path, lease, job, worker), daemon=True
+        )
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self, path: str, lease: float, job: Job, worker: str) -> None:
+        with JobQueue(path, lease) as queue:
+            while not self._stop.wait(lease / 3):
+                if not queue.renew(job, worker):
+                    return
+
+
+def run_worker(
+    path: str,
+    lease: float = 60.0,
+    wait: bool = False,
+    poll: float = 1.0,
+    cache_dir: str | None = None,
+    cache_size: int = 1024,
+) -> int:
+    """
+    Claims and solves jobs until the queue is drained.
+
+    Parameters:
+    -----------
+    path: str
+        path of the queue database
+    lease: float
+        lease of the claimed jobs (in seconds), renewed by a heartbeat
+    wait: bool
+        whether to keep polling for new jobs instead of exiting when
+        no job is pending
+    poll: float
+        time (in seconds) between two polls of an empty queue
+    cache_dir: str | None
+        directory of the on-disk solution cache, `None` disables caching
+    cache_size: int
+        capacity of the in-memory solution cache of the worker
+
+    Returns:
+    --------
+    solved: int
+        number of jobs completed by this worker
+    """
+    worker = worker_name()
+    completed = 0
+    with JobQueue(path, lease) as queue:
+        while True:
+            job = queue.claim(worker)
+            if job is None:
+                counts = queue.counts()
+                # zadania innych procesów mogą jeszcze wrócić do kolejki po wygaśnięciu dzierżawy
+                if not wait and not counts[RUNNING] and not counts[EXPIRED]:
+                    return completed
+                time.sleep(poll)
+                continue
+            with _Heartbeat(path, lease, job, worker):
+                record = solve_file(
+                    job.path,
+                    job.solver,
+                    job.time_limit,
+                    job.presolve,
+                    cache_dir,
+                    cache_size,
+                )
+            record["worker"] = worker
+            record["attempts"] = job.attempts
+            if queue.complete(job, worker, record):
+                completed += 1
+
+
+def run_workers(
+    path: str,
+    jobs: int,
+    lease: float = 60.0,
+    wait: bool = False,
+    poll: float = 1.0,
+    cache_dir: str | None = None,
+    cache_size: int = 1024,
+) -> int:
+    """
+    Runs `jobs` worker processes (see `run_worker`) and waits for them.
+
+    Returns:
+    --------
+    solved: int
+        number of jobs completed by all the workers
+    """
+    if jobs <= 1:
+        return run_worker(path, lease, wait, poll, cache_dir, cache_size)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(run_worker, path, lease, wait, poll, cache_dir, cache_size)
+            for _ in range(jobs)
+        ]
+        return sum(future.result() for future in futures)
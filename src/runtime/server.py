@@ -0,0 +1,518 @@
+"""
+A long-running solving server speaking newline-delimited JSON over TCP
+or a Unix socket.
+
+Every request is a single JSON object in a line, every response as well.
+Responses carry the `id` of their request, so a client may pipeline many
+requests over one connection and receive the answers out of order:
+
+```
+> {"id": 1, "puzzle": "0,0,2,1\\n0,2,0,0\\n2,3,0,0\\n4,0,0,0", "time_limit": 2.0}
+< {"id": 1, "status": "SOLVED", "elapsed": 0.0021, "solution": [[3, 4, 2, 1], ...]}
+> {"id": 2, "command": "stats"}
+< {"id": 2, "status": "OK", "stats": {"received": 1, "completed": 1, ...}}
+```
+
+A puzzle is given in the `SudokuGrid.from_text` format (lines joined with
+`\\n`); `solver` and `time_limit` are optional and the time limit can only
+lower the one of the server. Puzzles are solved by a pre-warmed pool
+of worker processes. When `max_pending` puzzles are already queued or being
+solved, new ones are rejected straight away with the `BUSY` status.
+The time limit of a puzzle runs from the moment a worker starts solving it,
+not from its arrival, so the time spent in the queue is never counted.
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import os
+import signal
+import sys
+from collections import deque
+from collections.abc import Iterator
+from timeit import default_timer as timer
+from typing import Any
+
+from src.model.grid import SudokuGrid
+from src.runtime.batch import ERROR, INFEASIBLE, SOLVED, TIMEOUT, solve_grid
+from src.solvers.registry import SOLVERS, create_solver
+
+BUSY = "BUSY"
+OK = "OK"
+
+# zapas czasu ponad limit solvera, po którym proces roboczy sam przerywa zadanie
+_RESULT_GRACE = 1.0
+# liczba ostatnich opóźnień, z których liczone są percentyle
+_LATENCY_WINDOW = 1024
+# maksymalna długość jednej linii żądania (w bajtach)
+_LINE_LIMIT = 16 * 1024 * 1024
+
+_WARM_UP_PUZZLE = ["0,0,2,1", "0,2,0,0", "2,3,0,0", "4,0,0,0"]
+
+
+def _init_worker(solver_name: str) -> None:
+    """
+    Warms a worker process up: imports the solvers and solves a tiny puzzle.
+    """
+    create_solver(solver_name).solve(SudokuGrid.from_text(_WARM_UP_PUZZLE), None)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _expire(signum: int, frame: Any) -> None:
+    raise TimeoutError("Solver time limit exceeded")
+
+
+@contextlib.contextmanager
+def _alarm(seconds: float | None) -> Iterator[None]:
+    """
+    Raises TimeoutError in the current (main) thread after `seconds`,
+    even if the solver misses its own deadline checks. No-op where
+    interval timers are unavailable or when `seconds` is `None`.
+    """
+    if seconds is None or not hasattr(signal, "setitimer"):
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _solve_job(
+    text: str,
+    solver_name: str,
+    time_limit: float | None,
+    presolve: bool,
+    cache_dir: str | None,
+    cache_size: int,
+) -> dict[str, Any]:
+    """
+    Solves a puzzle in a worker process, see `solve_text`. The safety timer
+    (`time_limit` plus `_RESULT_GRACE`) starts when the worker starts the job.
+    """
+    try:
+        with _alarm(time_limit + _RESULT_GRACE if time_limit is not None else None):
+            return solve_text(
+                text, solver_name, time_limit, presolve, cache_dir, cache_size
+            )
+    except TimeoutError:
+        # alarm między końcem rozwiązywania a wyłączeniem zegara
+        return {"status": TIMEOUT, "solution": None}
+
+
+def solve_text(
+    text: str,
+    solver_name: str,
+    time_limit: float | None,
+    presolve: bool = False,
+    cache_dir: str | None = None,
+    cache_size: int = 1024,
+) -> dict[str, Any]:
+    """
+    Parses and solves a single puzzle given in the `SudokuGrid.from_text` format.
+    Never raises, failures are reported with the `ERROR` status.
+
+    Parameters:
+    -----------
+    text: str
+        the puzzle, lines separated with `\\n`
+    solver_name: str
+        name of the solver (see `src.solvers.registry.SOLVERS`)
+    time_limit: float | None
+        time limit for the solver (in seconds), `None` if unlimited
+    presolve: bool
+        whether to fill the cells forced by propagation first
+    cache_dir: str | None
+        directory of the on-disk solution cache, `None` disables caching
+    cache_size: int
+        capacity of the in-memory solution cache of the worker
+
+    Returns:
+    --------
+    result: dict[str, Any]
+        a JSON-serializable record with `status` and `solution`
+    """
+    try:
+        puzzle = SudokuGrid.from_text(text.strip().splitlines())
+    except Exception as e:
+        return {"status": ERROR, "solution": None, "error": f"Invalid puzzle: {e}"}
+    return solve_grid(puzzle, solver_name, time_limit, presolve, cache_dir, cache_size)
+
+
+class ServerStats:
+    """
+    Throughput and latency counters of a server.
+
+    Attributes:
+    -----------
+    started: float
+        start time of the server (`timeit.default_timer` seconds)
+    received: int
+        number of received puzzles
+    statuses: dict[str, int]
+        number of responses per status (including `BUSY`)
+    in_flight: int
+        number of puzzles queued or being solved
+    latencies: deque[float]
+        latencies (in seconds) of the last solved puzzles
+    timed: int
+        number of puzzles dispatched to the workers
+    total_latency: float
+        sum of the latencies of all the solved puzzles
+    max_latency: float
+        maximal latency of a solved puzzle
+    """
+
+    def __init__(self) -> None:
+        self.started = timer()
+        self.received = 0
+        self.statuses = {SOLVED: 0, INFEASIBLE: 0, TIMEOUT: 0, ERROR: 0, BUSY: 0}
+        self.in_flight = 0
+        self.latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self.timed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, status: str, latency: float | None = None) -> None:
+        """
+        Counts a response, with the latency of a solved puzzle.
+        """
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if latency is not None:
+            self.latencies.append(latency)
+            self.timed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns the counters as a JSON-serializable dictionary.
+        """
+        uptime = timer() - self.started
+        completed = sum(n for status, n in self.statuses.items() if status != BUSY)
+        recent = sorted(self.latencies)
+
+        def percentile(q: float) -> float:
+            if not recent:
+                return 0.0
+            return round(recent[min(int(q * len(recent)), len(recent) - 1)], 6)
+
+        return {
+            "uptime": round(uptime, 3),
+            "received": self.received,
+            "completed": completed,
+            "in_flight": self.in_flight,
+            "statuses": dict(self.statuses),
+            "throughput": round(completed / uptime, 3) if uptime > 0 else 0.0,
+            "latency_mean": round(self.total_latency / self.timed, 6)
+            if self.timed
+            else 0.0,
+            "latency_max": round(self.max_latency, 6),
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_p99": percentile(0.99),
+        }
+
+
+class SolverServer:
+    """
+    An asyncio server dispatching puzzles to a pool of worker processes.
+
+    Attributes:
+    -----------
+    solver_name: str
+        default solver (see `src.solvers.registry.SOLVERS`)
+    time_limit: float | None
+        maximal time limit of a single puzzle (in seconds), `None` if unlimited
+    jobs: int
+        number of worker processes
+    max_pending: int
+        maximal number of puzzles queued or being solved at once
+    presolve: bool
+        whether to fill the cells forced by propagation first
+    cache_dir: str | None
+        directory of the on-disk solution cache, `None` disables caching
+    cache_size: int
+        capacity of the in-memory solution cache of every worker
+    stats: ServerStats
+        throughput and latency counters
+
+    Methods:
+    --------
+    start(host: str = "127.0.0.1", port: int = 0, path: str | None = None) -> asyncio.Server:
+        pre-warms the workers and starts listening
+    close() -> None:
+        stops listening and shuts the workers down
+    handle(request: dict[str, Any]) -> dict[str, Any]:
+        answers a single request
+    """
+
+    def __init__(
+        self,
+        solver_name: str = "dlx",
+        time_limit: float | None = 10.0,
+        jobs: int | None = None,
+        max_pending: int | None = None,
+        presolve: bool = False,
+        cache_dir: str | None = None,
+        cache_size: int = 1024,
+    ) -> None:
+        if solver_name not in SOLVERS:
+            raise ValueError(f"Unknown solver: '{solver_name}'")
+        self.solver_name = solver_name
+        self.time_limit = time_limit
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.jobs
+        self.presolve = presolve
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.stats = ServerStats()
+        self._pool: concurrent.futures.ProcessPoolExecutor | None = None
+        self._server: asyncio.Server | None = None
+        self._path: str | None = None
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, path: str | None = None
+    ) -> asyncio.Server:
+        """
+        Pre-warms the worker processes and starts listening.
+
+        Parameters:
+        -----------
+        host: str
+            TCP address to listen on
+        port: int
+            TCP port to listen on, `0` picks a free one
+        path: str | None
+            path of a Unix socket to listen on instead of TCP
+
+        Returns:
+        --------
+        server: asyncio.Server
+            the listening server
+        """
+        loop = asyncio.get_running_loop()
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_worker,
+            initargs=(self.solver_name,),
+        )
+        # uruchom wszystkie procesy robocze przed przyjęciem pierwszego żądania
+        await asyncio.gather(
+            *(loop.run_in_executor(self._pool, _ping) for _ in range(self.jobs))
+        )
+        self.stats = ServerStats()
+        self._path = path
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._serve_client, path, limit=_LINE_LIMIT
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._serve_client, host, port, limit=_LINE_LIMIT
+            )
+        return self._server
+
+    async def close(self) -> None:
+        """
+        Stops listening and shuts the worker processes down.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(self._path)
+            self._path = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Reads the requests of a single connection and answers each
+        of them as soon as it is done.
+        """
+        lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+
+        async def answer(line: bytes) -> None:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise TypeError("request must be a JSON object")
+            except (TypeError, ValueError) as e:
+                response: dict[str, Any] = {
+                    "id": None,
+                    "status": ERROR,
+                    "error": f"Invalid request: {e}",
+                }
+                self.stats.record(ERROR)
+            else:
+                response = await self.handle(request)
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Answers a single request.
+
+        Parameters:
+        -----------
+        request: dict[str, Any]
+            either `{"command": "stats"}` or a puzzle
+            `{"puzzle": str, "solver": str, "time_limit": float}`
+            (`solver` and `time_limit` are optional), both with an optional `id`
+
+        Returns:
+        --------
+        response: dict[str, Any]
+            the response with the `id` of the request and its `status`
+        """
+        request_id = request.get("id")
+        if request.get("command") == "stats":
+            return {"id": request_id, "status": OK, "stats": self.stats.snapshot()}
+        if "command" in request:
+            self.stats.record(ERROR)
+            return {
+                "id": request_id,
+                "status": ERROR,
+                "error": f"Unknown command: '{request['command']}'",
+            }
+
+        start = timer()
+        self.stats.received += 1
+        try:
+            text, solver_name, time_limit = self._parse(request)
+        except (TypeError, ValueError) as e:
+            self.stats.record(ERROR)
+            return {"id": request_id, "status": ERROR, "error": str(e)}
+
+        if self.stats.in_flight >= self.max_pending or self._pool is None:
+            self.stats.record(BUSY)
+            return {"id": request_id, "status": BUSY}
+
+        try:
+            future = self._pool.submit(
+                _solve_job,
+                text,
+                solver_name,
+                time_limit,
+                self.presolve,
+                self.cache_dir,
+                self.cache_size,
+            )
+        except (RuntimeError, concurrent.futures.BrokenExecutor) as e:
+            self.stats.record(ERROR)
+            return {"id": request_id, "status": ERROR, "error": f"Worker failed: {e}"}
+        # miejsce w kolejce jest zajęte, dopóki zadanie naprawdę się nie skończy (lub nie zostanie anulowane)
+        self.stats.in_flight += 1
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda _: self._release(loop))
+        try:
+            # anulowanie oczekiwania (np. rozłączenie klienta) anuluje zadanie, które jeszcze nie ruszyło
+            record = await asyncio.wrap_future(future)
+        except concurrent.futures.BrokenExecutor as e:
+            record = {"status": ERROR, "solution": None, "error": f"Worker failed: {e}"}
+
+        latency = timer() - start
+        self.stats.record(record["status"], latency)
+        return {"id": request_id, **record, "elapsed": round(latency, 6)}
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Frees the slot of a finished or cancelled job; called from the thread of the pool.
+        """
+
+        def release() -> None:
+            self.stats.in_flight -= 1
+
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(release)
+
+    def _parse(self, request: dict[str, Any]) -> tuple[str, str, float | None]:
+        """
+        Validates a puzzle request.
+
+        Returns:
+        --------
+        request: tuple[str, str, float | None]
+            the puzzle text, the solver name and the effective time limit
+        """
+        text = request.get("puzzle")
+        if not isinstance(text, str):
+            raise TypeError("Missing puzzle")
+        solver_name = request.get("solver", self.solver_name)
+        if solver_name not in SOLVERS:
+            raise ValueError(f"Unknown solver: '{solver_name}'")
+        time_limit = self.time_limit
+        if request.get("time_limit") is not None:
+            requested = float(request["time_limit"])
+            if requested <= 0:
+                raise ValueError("Time limit must be positive")
+            time_limit = requested if time_limit is None else min(requested, time_limit)
+        return text, solver_name, time_limit
+
+
+async def serve(
+    server: SolverServer,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    path: str | None = None,
+) -> None:
+    """
+    Runs the server until it is cancelled (e.g. with Ctrl+C or SIGTERM).
+
+    Parameters:
+    -----------
+    server: SolverServer
+        the server to run
+    host: str
+        TCP address to listen on
+    port: int
+        TCP port to listen on
+    path: str | None
+        path of a Unix socket to listen on instead of TCP
+    """
+    listening = await server.start(host, port, path)
+    addresses = ", ".join(str(sock.getsockname()) for sock in listening.sockets)
+    print(
+        f"Listening on {addresses} ({server.jobs} workers, solver: {server.solver_name})",
+        file=sys.stderr,
+    )
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    with contextlib.suppress(NotImplementedError):
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    try:
+        await listening.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
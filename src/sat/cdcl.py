@@ -0,0 +1,394 @@
+"""
+A pure-Python CDCL SAT solver.
+
+The engine follows the MiniSat design: two watched literals per clause,
+first-UIP conflict analysis with clause learning and non-chronological
+backjumping, VSIDS variable activities with phase saving, Luby restarts
+and periodic deletion of learnt clauses with a high LBD.
+
+Literals are DIMACS integers on the outside and codes `2 * var + sign`
+(sign `1` for negative literals) inside, so that `code ^ 1` is the negation.
+"""
+
+from __future__ import annotations
+
+import heapq
+
+from src.solvers.cancellation import CancellationToken
+from src.solvers.stats import SolverStats
+
+# mnożnik przyrostu aktywności po każdym konflikcie (1 / współczynnik zanikania)
+_VAR_DECAY = 1 / 0.95
+_RESCALE_LIMIT = 1e100
+# liczba konfliktów w jednostce sekwencji Luby'ego
+_RESTART_BASE = 100
+# początkowy limit liczby klauzul wyuczonych i jego przyrost po każdym czyszczeniu
+_LEARNT_LIMIT = 2000
+_LEARNT_LIMIT_INCREMENT = 500
+# klauzule o LBD nie większym niż ten próg nigdy nie są usuwane
+_GLUE_LBD = 2
+
+
+def luby(i: int) -> int:
+    """
+    Returns the `i`-th (1-based) element of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ...
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while (1 << k) - 1 != i:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class CdclSolver:
+    """
+    A CDCL SAT solver.
+
+    Attributes:
+    -----------
+    num_vars: int
+        number of variables
+    stats: SolverStats
+        statistics of the last `solve` call: decisions as nodes, conflicts
+        as backtracks and the maximal decision level as depth
+    learnt_count: int
+        number of clauses learnt by the last `solve` call
+
+    Methods:
+    --------
+    solve(token: CancellationToken | None = None) -> list[bool] | None:
+        finds a model of the formula
+    """
+
+    def __init__(
+        self,
+        num_vars: int,
+        clauses: list[list[int]],
+        token: CancellationToken | None = None,
+    ) -> None:
+        """
+        Parameters:
+        -----------
+        num_vars: int
+            number of variables, ids `1..num_vars`
+        clauses: list[list[int]]
+            clauses as lists of non-zero DIMACS literals
+        token: CancellationToken | None
+            deadline of loading the clauses, `None` if unlimited
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the token expires
+        """
+        # tablice dla setek tysięcy zmiennych same zajmują sekundę - najpierw sprawdź termin
+        if token is not None and token.check():
+            raise TimeoutError("Solver time limit exceeded")
+        self.num_vars = num_vars
+        self.stats = SolverStats()
+        self.learnt_count = 0
+        size = 2 * (num_vars + 1)
+        # wartość literału: 1 - prawdziwy, -1 - fałszywy, 0 - nieprzypisany
+        self._value = [0] * size
+        self._level = [0] * (num_vars + 1)
+        self._reason: list[list[int] | None] = [None] * (num_vars + 1)
+        self._watches: list[list[list[int]]] = [[] for _ in range(size)]
+        self._trail: list[int] = []
+        self._trail_lim: list[int] = []
+        self._qhead = 0
+        self._activity = [0.0] * (num_vars + 1)
+        self._var_inc = 1.0
+        self._phase = [1] * (num_vars + 1)
+        self._heap = [(0.0, var) for var in range(1, num_vars + 1)]
+        self._learnts: list[tuple[int, list[int]]] = []
+        self._seen = [False] * (num_vars + 1)
+        self._units: list[int] = []
+        self._empty = False
+
+        for clause in clauses:
+            if token is not None and token.expired():
+                raise TimeoutError("Solver time limit exceeded")
+            codes = sorted({self._code(lit) for lit in clause})
+            if any(codes[i] ^ 1 == codes[i + 1] for i in range(len(codes) - 1)):
+                continue  # tautologia
+            if not codes:
+                self._empty = True
+            elif len(codes) == 1:
+                self._units.append(codes[0])
+            else:
+                self._watch(codes)
+
+    @staticmethod
+    def _code(lit: int) -> int:
+        return 2 * lit if lit > 0 else -2 * lit + 1
+
+    def _watch(self, clause: list[int]) -> None:
+        self._watches[clause[0]].append(clause)
+        self._watches[clause[1]].append(clause)
+
+    def solve(self, token: CancellationToken | None = None) -> list[bool] | None:
+        """
+        Finds a model of the formula.
+
+        Parameters:
+        -----------
+        token: CancellationToken | None
+            deadline and cancellation of the search, `None` if unlimited
+
+        Returns:
+        --------
+        model: list[bool] | None
+            - truth values of the variables indexed by the variable id
+              (index `0` is unused) if the formula is satisfiable
+            - `None` if it is unsatisfiable
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the token expires
+        """
+        token = token or CancellationToken()
+        self.stats = SolverStats()
+        self.learnt_count = 0
+        if self._empty:
+            return None
+        for code in self._units:
+            if self._value[code] == -1:
+                return None
+            if self._value[code] == 0:
+                self._assign(code, None)
+        if self._propagate() is not None:
+            return None
+
+        stats = self.stats
+        restarts = 0
+        learnt_limit = _LEARNT_LIMIT
+        while True:
+            restarts += 1
+            budget = luby(restarts) * _RESTART_BASE
+            while True:
+                token.countdown -= 1
+                if token.countdown <= 0 and token.check():
+                    raise TimeoutError("Solver time limit exceeded")
+
+                conflict = self._propagate()
+                if conflict is not None:
+                    stats.backtracks += 1
+                    if not self._trail_lim:
+                        return None
+                    learnt, level = self._analyze(conflict)
+                    self._backtrack(level)
+                    self._learn(learnt)
+                    self._var_inc *= _VAR_DECAY
+                    budget -= 1
+                    continue
+
+                if budget <= 0:
+                    # restart - wyuczone klauzule zostają
+                    self._backtrack(0)
+                    break
+                if len(self._learnts) >= learnt_limit:
+                    self._reduce()
+                    learnt_limit += _LEARNT_LIMIT_INCREMENT
+
+                var = self._pick()
+                if var == 0:
+                    return [False] + [
+                        self._value[2 * v] == 1 for v in range(1, self.num_vars + 1)
+                    ]
+                stats.nodes += 1
+                self._trail_lim.append(len(self._trail))
+                stats.max_depth = max(stats.max_depth, len(self._trail_lim))
+                self._assign(2 * var + (self._phase[var] ^ 1), None)
+
+    def _assign(self, code: int, reason: list[int] | None) -> None:
+        var = code >> 1
+        self._value[code] = 1
+        self._value[code ^ 1] = -1
+        self._level[var] = len(self._trail_lim)
+        self._reason[var] = reason
+        self._trail.append(code)
+
+    def _propagate(self) -> list[int] | None:
+        """
+        Runs unit propagation over the watched literals.
+
+        Returns:
+        --------
+        conflict: list[int] | None
+            a falsified clause, `None` if there is no conflict
+        """
+        value = self._value
+        watches = self._watches
+        trail = self._trail
+        while self._qhead < len(trail):
+            false_lit = trail[self._qhead] ^ 1
+            self._qhead += 1
+            watching = watches[false_lit]
+            kept = []
+            i = 0
+            count = len(watching)
+            while i < count:
+                clause = watching[i]
+                i += 1
+                if not clause:
+                    continue  # usunięta klauzula wyuczona
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if value[first] == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    if value[clause[k]] != -1:
+                        clause[1], clause[k] = clause[k], false_lit
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value[first] == -1:
+                        kept.extend(watching[i:])
+                        watches[false_lit] = kept
+                        self._qhead = len(trail)
+                        return clause
+                    self._assign(first, clause)
+            watches[false_lit] = kept
+        return None
+
+    def _analyze(self, conflict: list[int]) -> tuple[list[int], int]:
+        """
+        Derives the first-UIP clause of a conflict.
+
+        Returns:
+        --------
+        learnt: tuple[list[int], int]
+            the learnt clause (asserting literal first, a literal of the
+            backjump level second) and the backjump level
+        """
+        level = self._level
+        current = len(self._trail_lim)
+        seen = self._seen
+        learnt = [0]
+        counter = 0
+        index = len(self._trail) - 1
+        clause = conflict
+        lit = -1
+        while True:
+            for q in clause:
+                if q == lit:
+                    continue
+                var = q >> 1
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    self._bump(var)
+                    if level[var] == current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            # następny literał bieżącego poziomu na ścieżce
+            while not seen[self._trail[index] >> 1]:
+                index -= 1
+            lit = self._trail[index]
+            index -= 1
+            seen[lit >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self._reason[lit >> 1]
+        learnt[0] = lit ^ 1
+
+        # minimalizacja: usuń literały wynikające z pozostałych przez swoje przyczyny
+        minimized = [learnt[0]]
+        for q in learnt[1:]:
+            reason = self._reason[q >> 1]
+            if reason is None or any(
+                not seen[r >> 1] and level[r >> 1] > 0 for r in reason if r != q ^ 1
+            ):
+                minimized.append(q)
+        for q in learnt[1:]:
+            seen[q >> 1] = False
+        learnt = minimized
+
+        if len(learnt) == 1:
+            return learnt, 0
+        best = max(range(1, len(learnt)), key=lambda i: level[learnt[i] >> 1])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    def _learn(self, learnt: list[int]) -> None:
+        self.learnt_count += 1
+        if len(learnt) == 1:
+            self._assign(learnt[0], None)
+            return
+        lbd = len({self._level[q >> 1] for q in learnt})
+        self._watch(learnt)
+        self._learnts.append((lbd, learnt))
+        self._assign(learnt[0], learnt)
+
+    def _reduce(self) -> None:
+        """
+        Deletes the worse half of the learnt clauses (by LBD), keeping
+        the glue clauses and the reasons of current assignments.
+        """
+        self._learnts.sort(key=lambda entry: entry[0])
+        keep = len(self._learnts) // 2
+        kept = self._learnts[:keep]
+        for lbd, clause in self._learnts[keep:]:
+            if lbd <= _GLUE_LBD or self._reason[clause[0] >> 1] is clause:
+                kept.append((lbd, clause))
+            else:
+                clause.clear()
+        self._learnts = kept
+
+    def _backtrack(self, level: int) -> None:
+        if len(self._trail_lim) <= level:
+            return
+        start = self._trail_lim[level]
+        for code in self._trail[start:]:
+            var = code >> 1
+            self._value[code] = 0
+            self._value[code ^ 1] = 0
+            self._reason[var] = None
+            self._phase[var] = code & 1 ^ 1
+            heapq.heappush(self._heap, (-self._activity[var], var))
+        del self._trail[start:]
+        del self._trail_lim[level:]
+        self._qhead = start
+
+    def _bump(self, var: int) -> None:
+        self._activity[var] += self._var_inc
+        if self._activity[var] > _RESCALE_LIMIT:
+            self._activity = [a / _RESCALE_LIMIT for a in self._activity]
+            self._var_inc /= _RESCALE_LIMIT
+            self._heap = [
+                (-self._activity[v], v)
+                for v in range(1, self.num_vars + 1)
+                if self._value[2 * v] == 0
+            ]
+            heapq.heapify(self._heap)
+        elif self._value[2 * var] == 0:
+            heapq.heappush(self._heap, (-self._activity[var], var))
+
+    def _pick(self) -> int:
+        """
+        Returns the unassigned variable with the highest activity, `0` if there is none.
+        """
+        heap = self._heap
+        while heap:
+            activity, var = heapq.heappop(heap)
+            if self._value[2 * var] == 0 and -activity == self._activity[var]:
+                return var
+        # wpisy mogły się przedawnić - odbuduj kopiec z nieprzypisanych zmiennych
+        self._heap = [
+            (-self._activity[v], v)
+            for v in range(1, self.num_vars + 1)
+            if self._value[2 * v] == 0
+        ]
+        if not self._heap:
+            return 0
+        heapq.heapify(self._heap)
+        return heapq.heappop(self._heap)[1]
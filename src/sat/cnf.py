@@ -0,0 +1,194 @@
+"""
+CNF encoding of sudoku puzzles.
+
+Variable `x(row, col, v)` is true iff the cell (row, col) holds the value
+`v + 1`. Every cell holds exactly one value and every value occurs exactly
+once in every row, column and block; the givens are unit clauses.
+"Exactly one" is encoded as one at-least-one clause and pairwise
+at-most-one clauses, or a sequential counter for larger groups.
+
+With `simplify=True` (the default) the candidates are first reduced by
+constraint propagation (see `src.solvers.propagation`) and only the
+remaining candidates become variables, which keeps even the largest
+puzzles small. `simplify=False` produces the plain textbook encoding
+with all the n^3 variables.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TextIO
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancellationToken
+from src.solvers.propagation import candidates_from_grid, propagate
+
+Clause = list[int]
+
+# grupy większe niż ten próg dostają licznik sekwencyjny zamiast par
+_PAIRWISE_LIMIT = 6
+
+
+@dataclass(slots=True)
+class Cnf:
+    """
+    A CNF formula of a sudoku puzzle.
+
+    Attributes:
+    -----------
+    num_vars: int
+        number of variables (cell variables first, then auxiliary ones)
+    clauses: list[Clause]
+        clauses as lists of non-zero DIMACS literals
+    variables: npt.NDArray[np.int64]
+        (n, n, n) array of variable ids of the cells, `0` for values ruled out
+    """
+
+    num_vars: int
+    clauses: list[Clause]
+    variables: npt.NDArray[np.int64]
+
+    def decode(self, model: list[bool]) -> SudokuGrid:
+        """
+        Creates the grid described by a model of the formula.
+
+        Parameters:
+        -----------
+        model: list[bool]
+            truth values of the variables, indexed by the variable id
+            (index `0` is unused)
+
+        Returns:
+        --------
+        grid: SudokuGrid
+            the grid with the true cell variables filled in
+        """
+        truth = np.asarray(model, dtype=bool)
+        chosen = (self.variables > 0) & truth[self.variables]
+        n = self.variables.shape[0]
+        values = np.where(chosen.any(axis=2), chosen.argmax(axis=2) + 1, 0)
+        return SudokuGrid(values.astype(SudokuGrid.compact_dtype(n)))
+
+    def to_dimacs(self, out: TextIO) -> None:
+        """
+        Writes the formula in the DIMACS CNF format.
+
+        Parameters:
+        -----------
+        out: TextIO
+            stream the formula is written to
+        """
+        n = self.variables.shape[0]
+        out.write(
+            f"c sudoku {n}x{n}, x(row, col, v) ids in row-major order of the candidates\n"
+        )
+        out.write(f"p cnf {self.num_vars} {len(self.clauses)}\n")
+        out.writelines(" ".join(map(str, clause)) + " 0\n" for clause in self.clauses)
+
+
+def encode(
+    puzzle: SudokuGrid, simplify: bool = True, token: CancellationToken | None = None
+) -> Cnf:
+    """
+    Encodes a sudoku puzzle to CNF.
+
+    Parameters:
+    -----------
+    puzzle: SudokuGrid
+        a sudoku puzzle
+    simplify: bool
+        whether to reduce the candidates by constraint propagation first
+    token: CancellationToken | None
+        deadline of the encoding, checked in every propagation round
+        and for every group of the clauses, `None` if unlimited
+
+    Returns:
+    --------
+    cnf: Cnf
+        the formula, satisfiable iff the puzzle is solvable
+        (an infeasible puzzle may be encoded by an empty clause)
+
+    Raises:
+    -------
+    timeout_error: TimeoutError
+        when the token expires
+    """
+    n = puzzle.size
+    try:
+        candidates = candidates_from_grid(puzzle)
+    except ValueError:
+        return Cnf(0, [[]], np.zeros((n, n, n), dtype=np.int64))
+    if simplify and not propagate(candidates, token=token):
+        return Cnf(0, [[]], np.zeros((n, n, n), dtype=np.int64))
+    if token is not None and token.check():
+        raise TimeoutError("Solver time limit exceeded")
+
+    variables = np.zeros((n, n, n), dtype=np.int64)
+    variables[candidates] = np.arange(1, int(candidates.sum()) + 1)
+    encoder = _Encoder(int(candidates.sum()))
+
+    bs = puzzle.block_size
+    # (blok, komórka w bloku, wartość) - bloki jako wiersze
+    blocks = (
+        variables.reshape(bs, bs, bs, bs, n).transpose(0, 2, 1, 3, 4).reshape(n, n, n)
+    )
+    groups = (
+        variables.reshape(n * n, n),  # komórka: wartości
+        variables.transpose(0, 2, 1).reshape(n * n, n),  # wiersz i wartość: kolumny
+        variables.transpose(1, 2, 0).reshape(n * n, n),  # kolumna i wartość: wiersze
+        blocks.transpose(0, 2, 1).reshape(n * n, n),  # blok i wartość: komórki
+    )
+    for group in groups:
+        present = group > 0
+        counts = present.sum(axis=1)
+        literals = group[present]
+        starts = np.cumsum(counts) - counts
+        # puste grupy to sprzeczność, pojedyncze - klauzule jednostkowe
+        encoder.clauses.extend([] for _ in range(int((counts == 0).sum())))
+        encoder.clauses.extend([x] for x in literals[starts[counts == 1]].tolist())
+        for start, count in zip(
+            starts[counts > 1].tolist(), counts[counts > 1].tolist()
+        ):
+            if token is not None and token.expired():
+                raise TimeoutError("Solver time limit exceeded")
+            encoder.exactly_one(literals[start : start + count].tolist())
+
+    # wartości wpisane w łamigłówce
+    rows, cols = np.nonzero(puzzle._array)
+    values = np.asarray(puzzle._array, dtype=np.intp)[rows, cols] - 1
+    for var in variables[rows, cols, values].tolist():
+        encoder.clauses.append([var])
+
+    return Cnf(encoder.num_vars, encoder.clauses, variables)
+
+
+class _Encoder:
+    """
+    Clauses under construction together with the auxiliary variable counter.
+    """
+
+    def __init__(self, num_vars: int) -> None:
+        self.num_vars = num_vars
+        self.clauses: list[Clause] = []
+
+    def exactly_one(self, literals: list[int]) -> None:
+        self.clauses.append(literals)
+        if len(literals) <= _PAIRWISE_LIMIT:
+            for i, x in enumerate(literals):
+                for y in literals[i + 1 :]:
+                    self.clauses.append([-x, -y])
+            return
+
+        # licznik sekwencyjny (Sinz 2005): s_i musi być prawdziwe, gdy któryś z x_1..x_i jest prawdziwy
+        k = len(literals)
+        s = list(range(self.num_vars + 1, self.num_vars + k))
+        self.num_vars += k - 1
+        self.clauses.append([-literals[0], s[0]])
+        for i in range(1, k - 1):
+            self.clauses.append([-literals[i], s[i]])
+            self.clauses.append([-s[i - 1], s[i]])
+            self.clauses.append([-literals[i], -s[i - 1]])
+        self.clauses.append([-literals[k - 1], -s[k - 2]])
@@ -0,0 +1,301 @@
+"""
+Automatic choice of the solver from cheap features of the puzzle.
+
+The features (`puzzle_features`) take a single vectorized pass over the
+grid: the size, the fraction of givens and the candidate counts of the
+empty cells. The choice follows the rules of `auto_rules.json`, calibrated
+from benchmark reports by `python -m benchmarks.calibrate`: every rule
+names a solver and a range `[low, high)` of some features, the first rule
+matching the puzzle wins and `default` is used when none does.
+
+```
+{"default": "dlx", "rules": [{"solver": "dlx", "when": {"size": [null, 100]}}, ...]}
+```
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent
+from src.solvers.stats import SolverStats
+
+RULES_PATH = Path(__file__).with_name("auto_rules.json")
+
+# (nazwa solvera, cechy łamigłówki) - wywoływane przed uruchomieniem wybranego solvera
+SelectionCallback = Callable[[str, "PuzzleFeatures"], None]
+
+
+@dataclass(frozen=True, slots=True)
+class PuzzleFeatures:
+    """
+    Cheap features of a puzzle used to choose the solver.
+
+    Attributes:
+    -----------
+    size: int
+        size `n` of the grid
+    fill: float
+        fraction of the cells which are given
+    min_candidates: int
+        smallest number of legal values of an empty cell (`0` means the puzzle
+        is infeasible, `1` for a full grid)
+    mean_candidates: float
+        average number of legal values of an empty cell (`1.0` for a full grid)
+    forced: int
+        number of empty cells with a single legal value
+    """
+
+    size: int
+    fill: float
+    min_candidates: int
+    mean_candidates: float
+    forced: int
+
+    def format(self) -> str:
+        """
+        Returns the features as a single line of text.
+        """
+        return (
+            f"size {self.size}, fill {self.fill:.3f}, candidates min {self.min_candidates}"
+            f" / mean {self.mean_candidates:.2f}, forced {self.forced}"
+        )
+
+
+def puzzle_features(puzzle: SudokuGrid) -> PuzzleFeatures:
+    """
+    Computes the features of a puzzle in a single vectorized pass.
+
+    The values used in every row, column and block are marked in three
+    (n, n + 1) tables, the legal values of an empty cell are the ones missing
+    from all three tables of the cell.
+
+    Parameters:
+    -----------
+    puzzle: SudokuGrid
+        a sudoku puzzle
+
+    Returns:
+    --------
+    features: PuzzleFeatures
+        features of the puzzle
+
+    Raises:
+    -------
+    value_error: ValueError
+        when the grid contains a value larger than its size
+    """
+    values = np.asarray(puzzle._array, dtype=np.intp)
+    n = puzzle.size
+    if values.max(initial=0) > n:
+        raise ValueError(f"Grid values must not exceed {n}")
+    cell_blocks = puzzle.geometry.cell_blocks
+    rows, cols = np.indices((n, n))
+    # kolumna 0 (pusta komórka) jest pomijana przy liczeniu kandydatów
+    used = np.zeros((3, n, n + 1), dtype=bool)
+    used[0, rows, values] = True
+    used[1, cols, values] = True
+    used[2, cell_blocks, values] = True
+
+    empty_rows, empty_cols = np.nonzero(values == 0)
+    if len(empty_rows) == 0:
+        return PuzzleFeatures(n, 1.0, 1, 1.0, 0)
+    taken = (
+        used[0, empty_rows, 1:]
+        | used[1, empty_cols, 1:]
+        | used[2, cell_blocks[empty_rows, empty_cols], 1:]
+    )
+    counts = n - np.count_nonzero(taken, axis=1)
+    return PuzzleFeatures(
+        size=n,
+        fill=1.0 - len(empty_rows) / (n * n),
+        min_candidates=int(counts.min()),
+        mean_candidates=float(counts.mean()),
+        forced=int(np.count_nonzero(counts == 1)),
+    )
+
+
+@functools.cache
+def load_rules(path: str | os.PathLike = RULES_PATH) -> dict[str, Any]:
+    """
+    Reads and checks a rules file (cached, the file is read once per process).
+
+    Parameters:
+    -----------
+    path: str | os.PathLike
+        path of the rules file, the bundled `auto_rules.json` by default
+
+    Returns:
+    --------
+    rules: dict[str, Any]
+        the `default` solver name and the list of `rules`
+
+    Raises:
+    -------
+    os_error: OSError
+        when the file cannot be read
+    value_error: ValueError
+        when the file is not a valid rules file
+    """
+    # import w funkcji - rejestr solverów importuje ten moduł
+    from src.solvers.registry import SOLVERS
+
+    try:
+        data = json.loads(Path(path).read_text())
+        names = [data["default"], *(rule["solver"] for rule in data["rules"])]
+        bounds = [bound for rule in data["rules"] for bound in rule["when"].items()]
+    except (KeyError, TypeError, AttributeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Not a solver rules file: {path}") from e
+    known = {field.name for field in fields(PuzzleFeatures)}
+    for name in names:
+        if name not in SOLVERS or name == "auto":
+            raise ValueError(f"Unknown solver in {path}: '{name}'")
+    for feature, bound in bounds:
+        if feature not in known or not isinstance(bound, list) or len(bound) != 2:
+            raise ValueError(f"Invalid condition in {path}: {feature}: {bound}")
+    return data
+
+
+def choose_solver(features: PuzzleFeatures, rules: dict[str, Any]) -> str:
+    """
+    Returns the solver of the first rule matching the features,
+    i.e. with `low <= feature < high` for every condition of the rule
+    (`null` bounds are open), or the default solver.
+
+    Parameters:
+    -----------
+    features: PuzzleFeatures
+        features of the puzzle
+    rules: dict[str, Any]
+        rules read by `load_rules`
+
+    Returns:
+    --------
+    solver_name: str
+        name of the chosen solver (see `src.solvers.registry.SOLVERS`)
+    """
+    values = asdict(features)
+    for rule in rules["rules"]:
+        if all(
+            (low is None or values[feature] >= low)
+            and (high is None or values[feature] < high)
+            for feature, (low, high) in rule["when"].items()
+        ):
+            return rule["solver"]
+    return rules["default"]
+
+
+class AutoSudokuSolver:
+    """
+    A sudoku solver delegating every puzzle to the solver which
+    the calibrated rules expect to be the fastest one for its features.
+
+    Puzzles with a value larger than the size of the grid or with an empty
+    cell without legal values are reported infeasible without running
+    any solver.
+
+    Attributes:
+    -----------
+    rules: dict[str, Any]
+        rules of the choice, see `load_rules`
+    on_select: SelectionCallback | None
+        function called with the chosen solver and the features before solving
+    choice: str | None
+        name of the solver chosen by the last `solve` call,
+        `None` if the puzzle was infeasible without running a solver
+    features: PuzzleFeatures | None
+        features of the puzzle of the last `solve` call,
+        `None` if the puzzle has a value larger than the size of the grid
+    stats: SolverStats
+        statistics of the chosen solver, empty if it does not publish them
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    rules: dict[str, Any]
+    on_select: SelectionCallback | None
+    choice: str | None
+    features: PuzzleFeatures | None
+    stats: SolverStats
+
+    def __init__(
+        self,
+        rules_path: str | os.PathLike = RULES_PATH,
+        on_select: SelectionCallback | None = None,
+    ) -> None:
+        """
+        Parameters:
+        -----------
+        rules_path: str | os.PathLike
+            path of the rules file, the bundled `auto_rules.json` by default
+        on_select: SelectionCallback | None
+            function called with the chosen solver and the features before solving
+        """
+        self.rules = load_rules(rules_path)
+        self.on_select = on_select
+        self.choice = None
+        self.features = None
+        self.stats = SolverStats()
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        from src.solvers.registry import create_solver
+
+        self.stats = SolverStats()
+        self.choice = None
+        self.features = None
+        try:
+            self.features = puzzle_features(puzzle)
+        except ValueError:
+            # wartości spoza planszy - jak w pozostałych solverach łamigłówka jest sprzeczna
+            return None
+        if self.features.min_candidates == 0:
+            return None
+        self.choice = choose_solver(self.features, self.rules)
+        if self.on_select is not None:
+            self.on_select(self.choice, self.features)
+        solver = create_solver(self.choice)
+        try:
+            return solver.solve(puzzle, time_limit, cancel)
+        finally:
+            self.stats = getattr(solver, "stats", None) or SolverStats()
@@ -0,0 +1,79 @@
+from src.cache.solution_cache import SolutionCache
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent
+from src.solvers.registry import SudokuSolver
+
+
+class CachingSudokuSolver:
+    """
+    A solver wrapper looking puzzles up in a `SolutionCache`
+    before running the wrapped solver, and storing its solutions.
+
+    Attributes:
+    -----------
+    solver: SudokuSolver
+        the wrapped solver
+    cache: SolutionCache
+        the solution cache
+    last_hit: bool
+        whether the last `solve` call was answered from the cache
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    solver: SudokuSolver
+    cache: SolutionCache
+    last_hit: bool
+
+    def __init__(self, solver: SudokuSolver, cache: SolutionCache) -> None:
+        self.solver = solver
+        self.cache = cache
+        self.last_hit = False
+
+    @property
+    def winner(self) -> str | None:
+        """
+        Winning strategy of the wrapped solver, if it reports one.
+        """
+        return getattr(self.solver, "winner", None)
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        solution = self.cache.get(puzzle)
+        self.last_hit = solution is not None
+        if solution is None:
+            solution = self.solver.solve(puzzle, time_limit, cancel)
+            if solution is not None:
+                self.cache.put(puzzle, solution)
+        return solution
@@ -0,0 +1,161 @@
+"""
+Cooperative cancellation of the solvers.
+
+A `CancellationToken` combines the deadline of a single `solve` call with an
+optional event that can be set from another thread (`threading.Event`) or
+process (`multiprocessing.Event`). The clock and the event are consulted
+only every N search nodes, where N is adapted to the observed node rate,
+so that a check happens roughly every `CHECK_PERIOD` seconds.
+
+The solvers inline the cheap part in their hot loops::
+
+    token.countdown -= 1
+    if token.countdown <= 0 and token.check():
+        raise TimeoutError(...)
+
+which is equivalent to calling `token.expired()` once per node, but saves
+a Python call per node.
+"""
+
+from __future__ import annotations
+
+from timeit import default_timer as timer
+from typing import Protocol
+
+# docelowy odstęp (w sekundach) między kolejnymi odczytami zegara
+CHECK_PERIOD = 0.002
+# maksymalna liczba węzłów między odczytami zegara
+MAX_INTERVAL = 4096
+
+
+class CancelEvent(Protocol):
+    """
+    An event shared with the canceller, e.g. `threading.Event`
+    or `multiprocessing.Event`.
+    """
+
+    def is_set(self) -> bool: ...
+
+    def set(self) -> None: ...
+
+
+class CancellationToken:
+    """
+    Deadline and external cancellation of a single `solve` call.
+
+    Attributes:
+    -----------
+    deadline: float | None
+        the deadline (in `timeit.default_timer` seconds), `None` if unlimited
+    event: CancelEvent | None
+        the event which cancels the search when set
+    countdown: int
+        number of nodes left until the next `check`
+    nodes: int
+        number of nodes counted down until the last `check`
+
+    Methods:
+    --------
+    expired() -> bool:
+        cheap per-node check whether the search should stop
+    check() -> bool:
+        reads the clock and the event, called when `countdown` reaches zero
+    cancel() -> None:
+        cancels the search (sets the event)
+    remaining() -> float | None:
+        time left until the deadline, e.g. the limit of a following stage
+    """
+
+    __slots__ = ("_interval", "_last_check", "countdown", "deadline", "event", "nodes")
+
+    def __init__(
+        self, time_limit: float | None = None, event: CancelEvent | None = None
+    ) -> None:
+        """
+        Parameters:
+        -----------
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        event: CancelEvent | None
+            an event set by another thread or process to cancel the search
+        """
+        self._last_check = timer()
+        self.deadline = (
+            self._last_check + time_limit if time_limit is not None else None
+        )
+        self.event = event
+        self.nodes = 0
+        self._interval = 1
+        self.countdown = 1
+
+    def expired(self) -> bool:
+        """
+        Checks whether the search should stop. Called once per search node,
+        reads the clock only when `countdown` drops to zero.
+
+        Returns:
+        --------
+        expired: bool
+            - `True` if the deadline has passed or the token has been cancelled
+            - `False` otherwise
+        """
+        self.countdown -= 1
+        if self.countdown > 0:
+            return False
+        return self.check()
+
+    def cancel(self) -> None:
+        """
+        Cancels the search. Requires an event.
+
+        Raises:
+        -------
+        value_error: ValueError
+            when the token has no event
+        """
+        if self.event is None:
+            raise ValueError("Token without an event cannot be cancelled")
+        self.event.set()
+
+    def remaining(self) -> float | None:
+        """
+        Returns the time left until the deadline.
+
+        Returns:
+        --------
+        remaining: float | None
+            time (in seconds) left, `0.0` once the deadline has passed,
+            `None` if the token has no deadline
+        """
+        if self.deadline is None:
+            return None
+        return max(self.deadline - timer(), 0.0)
+
+    def check(self) -> bool:
+        """
+        Reads the clock and the event and adapts the checking interval.
+        Resets `countdown` to the new interval.
+
+        Returns:
+        --------
+        expired: bool
+            - `True` if the deadline has passed or the token has been cancelled
+            - `False` otherwise
+        """
+        self.nodes += self._interval
+        now = timer()
+        elapsed = now - self._last_check
+        # dopasuj liczbę węzłów między odczytami do zmierzonego tempa przeszukiwania
+        if elapsed > 0:
+            interval = int(self._interval * CHECK_PERIOD / elapsed)
+            # nie zwiększaj odstępu gwałtownie - tempo może się zmieniać
+            interval = min(interval, 2 * self._interval, MAX_INTERVAL)
+            self._interval = max(interval, 1)
+        else:
+            self._interval = min(2 * self._interval, MAX_INTERVAL)
+        self.countdown = self._interval
+        self._last_check = now
+
+        if self.event is not None and self.event.is_set():
+            return True
+        return self.deadline is not None and now > self.deadline
@@ -0,0 +1,182 @@
+"""
+Checkpoints of the MRV search, see `MrvSudokuSolver.checkpoint` and
+`MrvSudokuSolver.resume`.
+
+A checkpoint is a compressed `.npz` archive (written without pickling)
+holding the puzzle, the order of its empty cells, the search stack
+(untried values and the current value of every assigned cell), the
+deepest partial assignment reached so far and the search counters.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+
+
+@dataclass(frozen=True, slots=True)
+class Checkpoint:
+    """
+    A saved state of the MRV search.
+
+    Attributes:
+    -----------
+    puzzle: npt.NDArray[np.uint]
+        (n, n) the solved puzzle
+    cells: npt.NDArray[np.uint16]
+        (m, 2) rows and columns of the empty cells of the puzzle in the search order;
+        the first `depth` of them are assigned
+    candidates: npt.NDArray[np.uint8]
+        (depth, bytes) little-endian bitmasks of the values not tried yet
+        in the assigned cells (bit `v` is set when `v` is untried)
+    values: npt.NDArray[np.uint16]
+        (depth,) values currently put in the assigned cells
+    best: npt.NDArray[np.uint]
+        (n, n) the deepest partial assignment reached by the search
+    nodes: int
+        number of search nodes visited so far (as of the last clock reading
+        for the checkpoints saved periodically during the search)
+    backtracks: int
+        number of backtracks so far (as of the start of the current
+        `solve` or `resume` call for the periodic checkpoints)
+    value_order: str
+        value order of the solver, see `MrvSudokuSolver.VALUE_ORDERS`
+
+    Methods:
+    --------
+    pack_masks(masks: list[int], size: int) -> npt.NDArray[np.uint8]:
+        packs bitmasks of untried values into the `candidates` array
+    masks() -> list[int]:
+        unpacks the `candidates` array into bitmasks
+    partial() -> SudokuGrid:
+        returns the puzzle with the currently assigned cells filled in
+    save(path: str | os.PathLike) -> None:
+        writes the checkpoint to a file, replacing the previous one atomically
+    load(path: str | os.PathLike) -> Checkpoint:
+        reads a checkpoint written by `save`
+    """
+
+    puzzle: npt.NDArray[np.uint]
+    cells: npt.NDArray[np.uint16]
+    candidates: npt.NDArray[np.uint8]
+    values: npt.NDArray[np.uint16]
+    best: npt.NDArray[np.uint]
+    nodes: int
+    backtracks: int
+    value_order: str
+
+    @staticmethod
+    def pack_masks(masks: list[int], size: int) -> npt.NDArray[np.uint8]:
+        """
+        Packs bitmasks of the values `1..size` into a (len(masks), bytes) array.
+        """
+        width = size // 8 + 1
+        data = b"".join(mask.to_bytes(width, "little") for mask in masks)
+        return np.frombuffer(data, dtype=np.uint8).reshape(len(masks), width)
+
+    def masks(self) -> list[int]:
+        """
+        Returns the bitmasks of the untried values, see `pack_masks`.
+        """
+        return [int.from_bytes(row.tobytes(), "little") for row in self.candidates]
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of assigned empty cells.
+        """
+        return len(self.values)
+
+    @property
+    def best_depth(self) -> int:
+        """
+        Number of empty cells assigned in the deepest partial assignment.
+        """
+        return int(np.count_nonzero(self.best)) - int(np.count_nonzero(self.puzzle))
+
+    def partial(self) -> SudokuGrid:
+        """
+        Returns the puzzle with the currently assigned cells filled in.
+        """
+        grid = np.array(self.puzzle)
+        rows, cols = self.cells[: self.depth].T
+        grid[rows, cols] = self.values
+        return SudokuGrid(grid)
+
+    def save(self, path: str | os.PathLike) -> None:
+        """
+        Writes the checkpoint to a file. The file is replaced atomically,
+        so an interrupted write never destroys the previous checkpoint.
+
+        Parameters:
+        -----------
+        path: str | os.PathLike
+            path of the file
+        """
+        tmp_path = f"{os.fspath(path)}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                puzzle=self.puzzle,
+                cells=self.cells,
+                candidates=self.candidates,
+                values=self.values,
+                best=self.best,
+                counters=np.array([self.nodes, self.backtracks], dtype=np.int64),
+                value_order=np.array(self.value_order),
+            )
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str | os.PathLike) -> Checkpoint:
+        """
+        Reads a checkpoint written by `save`.
+
+        Parameters:
+        -----------
+        path: str | os.PathLike
+            path of the file
+
+        Returns:
+        --------
+        checkpoint: Checkpoint
+            the saved state of the search
+
+        Raises:
+        -------
+        os_error: OSError
+            when the file cannot be read
+        value_error: ValueError
+            when the file is not a checkpoint
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            nodes, backtracks = arrays["counters"].tolist()
+            checkpoint = Checkpoint(
+                arrays["puzzle"],
+                arrays["cells"],
+                arrays["candidates"],
+                arrays["values"],
+                arrays["best"],
+                nodes,
+                backtracks,
+                str(arrays["value_order"]),
+            )
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Not a solver checkpoint: {path}") from e
+        n = checkpoint.puzzle.shape[0]
+        if (
+            checkpoint.puzzle.shape != (n, n)
+            or checkpoint.best.shape != (n, n)
+            or checkpoint.cells.shape != (np.count_nonzero(checkpoint.puzzle == 0), 2)
+            or checkpoint.candidates.shape != (checkpoint.depth, n // 8 + 1)
+            or checkpoint.depth > len(checkpoint.cells)
+        ):
+            raise ValueError(f"Inconsistent solver checkpoint: {path}")
+        return checkpoint
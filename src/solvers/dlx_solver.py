@@ -0,0 +1,367 @@
+from array import array
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent, CancellationToken
+from src.solvers.stats import SolverStats
+
+
+class DlxSudokuSolver:
+    """
+    An exact-cover sudoku solver based on Knuth's Algorithm X with Dancing Links.
+    See: https://arxiv.org/abs/cs/0011047
+
+    Every candidate (row, col, value) is a row of the constraint matrix
+    covering 4 columns: the cell, the value in the row, the value in the column
+    and the value in the block. Rows and columns already fixed by the givens
+    are left out, so the matrix is built only for the empty part of the grid.
+
+    All the links live in flat `array`s of node indices instead of
+    one Python object per node. Node `0` is the root, nodes `1..C`
+    are column headers and the rest are matrix entries, 4 per candidate.
+
+    Attributes:
+    -----------
+    puzzle: SudokuGrid | None
+        a currently solved puzzle, has value set only when called the `solve` method
+    solution: SudokuGrid | None
+        a current solution, has value set only after called the `solve` method
+    token: CancellationToken | None
+        deadline and cancellation of the current search,
+        has value set only after called the `solve` method
+    stats: SolverStats
+        statistics of the last `solve` call (see `src.solvers.stats`)
+
+    Protected Attributes:
+    ---------------------
+    _left, _right, _up, _down: array
+        horizontal and vertical links of every node
+    _column: array
+        column header of every node
+    _count: array
+        number of nodes in every column (indexed by the header node)
+    _candidates: npt.NDArray[np.intp]
+        (row, col, value) of every candidate, indexed by the candidate number
+    _first_node: int
+        index of the first matrix entry (the one after the last header)
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    puzzle: SudokuGrid | None
+    solution: SudokuGrid | None
+    token: CancellationToken | None
+    stats: SolverStats
+    _left: array
+    _right: array
+    _up: array
+    _down: array
+    _column: array
+    _count: array
+    _candidates: npt.NDArray[np.intp]
+    _first_node: int
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        self.token = CancellationToken(time_limit, cancel)
+        self.stats = SolverStats()
+        self.puzzle = puzzle
+        self.solution = puzzle.copy()
+
+        if not self._build_links():
+            return None
+        chosen = self._search()
+        if chosen is None:
+            return None
+        for node in chosen:
+            row, col, val = self._candidates[(node - self._first_node) // 4]
+            self.solution[row, col] = val
+        return self.solution
+
+    def _timeout(self) -> bool:
+        """
+        Checks whether the available time has run out or the search
+        has been cancelled. Called only when `token.countdown` drops to zero,
+        i.e. every few nodes (see `src.solvers.cancellation`).
+
+        Returns:
+        --------
+        timeout: bool
+            - `True` if solver has missed the deadline or has been cancelled
+            - `False` otherwise
+        """
+        return self.token.check()
+
+    def _build_links(self) -> bool:
+        """
+        Builds the dancing links of the constraint matrix restricted
+        to the empty cells of the puzzle.
+
+        Returns:
+        --------
+        consistent: bool
+            - `False` if the givens already break the sudoku rules
+            - `True` otherwise
+        """
+        grid = np.asarray(self.puzzle._array, dtype=np.intp)
+        n = self.puzzle.size
+        if grid.max(initial=0) > n:
+            return False
+
+        rows, cols = np.indices((n, n))
+        blocks = self.puzzle.geometry.cell_blocks
+        given = grid != 0
+
+        # used[k, unit, value] - whether value is given in the unit of kind k
+        used = np.zeros((3, n, n + 1), dtype=np.intp)
+        for k, unit in enumerate((rows, cols, blocks)):
+            np.add.at(used[k], (unit[given], grid[given]), 1)
+        if (used[:, :, 1:] > 1).any():
+            return False
+        used = used > 0
+
+        # kandydaci: puste komórki i wartości niewykluczone przez dane
+        empty_r, empty_c = np.nonzero(~given)
+        empty_b = blocks[empty_r, empty_c]
+        values = np.arange(1, n + 1)
+        allowed = ~(
+            used[0][empty_r][:, values]
+            | used[1][empty_c][:, values]
+            | used[2][empty_b][:, values]
+        )
+        cell_idx, val_idx = np.nonzero(allowed)
+        cand_r = empty_r[cell_idx]
+        cand_c = empty_c[cell_idx]
+        cand_b = empty_b[cell_idx]
+        cand_v = values[val_idx]
+        self._candidates = np.stack((cand_r, cand_c, cand_v), axis=1)
+
+        # kolumny macierzy: komórka, wiersz-wartość, kolumna-wartość, blok-wartość
+        n2 = n * n
+        constraint = np.stack(
+            (
+                cand_r * n + cand_c,
+                n2 + cand_r * n + cand_v - 1,
+                2 * n2 + cand_c * n + cand_v - 1,
+                3 * n2 + cand_b * n + cand_v - 1,
+            ),
+            axis=1,
+        ).ravel()
+
+        # aktywne kolumny: puste komórki i pary (jednostka, wartość) bez danych
+        active = np.ones(4 * n2, dtype=bool)
+        active[:n2] = ~given.ravel()
+        active[n2:] = ~used[:, :, 1:].reshape(-1)
+        header = np.cumsum(active)  # numer nagłówka (1..C) każdej kolumny
+        num_columns = int(header[-1]) if header.size else 0
+        node_column = header[constraint]
+
+        num_entries = node_column.size
+        first = num_columns + 1
+        total = first + num_entries
+        nodes = np.arange(first, total)
+
+        left = np.empty(total, dtype=np.int64)
+        right = np.empty(total, dtype=np.int64)
+        up = np.empty(total, dtype=np.int64)
+        down = np.empty(total, dtype=np.int64)
+        column = np.empty(total, dtype=np.int64)
+
+        # nagłówki tworzą cykliczną listę z korzeniem 0
+        headers = np.arange(first)
+        left[:first] = np.roll(headers, 1)
+        right[:first] = np.roll(headers, -1)
+        column[:first] = headers
+        column[first:] = node_column
+
+        # każdy kandydat to cykliczna lista 4 węzłów
+        offset = (nodes - first) % 4
+        left[first:] = nodes - offset + (offset + 3) % 4
+        right[first:] = nodes - offset + (offset + 1) % 4
+
+        # listy pionowe: nagłówek, a potem węzły kolumny w kolejności kandydatów
+        order = np.argsort(column, kind="stable")
+        nxt = np.roll(order, -1)
+        prv = np.roll(order, 1)
+        same_next = column[nxt] == column[order]
+        same_prev = column[prv] == column[order]
+        down[order] = np.where(same_next, nxt, column[order])
+        # ostatni węzeł kolumny to poprzednik nagłówka
+        tail = order[~same_next]
+        last = np.empty(first, dtype=np.int64)
+        last[column[tail]] = tail
+        up[order] = np.where(same_prev, prv, last[column[order]])
+
+        count = np.bincount(node_column, minlength=first)
+        if num_columns and (count[1:] == 0).any():
+            return False
+
+        self._first_node = first
+        self._left = array("q", left.tobytes())
+        self._right = array("q", right.tobytes())
+        self._up = array("q", up.tobytes())
+        self._down = array("q", down.tobytes())
+        self._column = array("q", column.tobytes())
+        self._count = array("q", count.astype(np.int64).tobytes())
+        return True
+
+    def _cover(self, c: int) -> None:
+        """
+        Removes a column and all the rows intersecting it from the matrix.
+        """
+        L, R, U, D, C, S = (
+            self._left,
+            self._right,
+            self._up,
+            self._down,
+            self._column,
+            self._count,
+        )
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, c: int) -> None:
+        """
+        Restores a column removed by `_cover`.
+        """
+        L, R, U, D, C, S = (
+            self._left,
+            self._right,
+            self._up,
+            self._down,
+            self._column,
+            self._count,
+        )
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def _choose_column(self) -> int:
+        """
+        Picks the column with the fewest nodes (Knuth's S heuristic).
+
+        Returns:
+        --------
+        column: int
+            header node of the chosen column
+        """
+        R, S = self._right, self._count
+        best = c = R[0]
+        best_size = S[c]
+        while c != 0 and best_size > 1:
+            if S[c] < best_size:
+                best, best_size = c, S[c]
+            c = R[c]
+        return best
+
+    def _search(self) -> list[int] | None:
+        """
+        Runs Algorithm X with an explicit stack of chosen nodes.
+
+        Returns:
+        --------
+        chosen: list[int] | None
+            - nodes of the candidates forming the exact cover
+            - `None` if there is no exact cover
+        """
+        R, L, D, C = self._right, self._left, self._down, self._column
+        cover, uncover = self._cover, self._uncover
+        token = self.token
+        chosen: list[int] = []
+        nodes = backtracks = max_depth = 0
+        try:
+            while True:
+                if R[0] == 0:
+                    return chosen
+                nodes += 1
+                token.countdown -= 1
+                if token.countdown <= 0 and self._timeout():
+                    raise TimeoutError("Solver time limit exceeded")
+                max_depth = max(max_depth, len(chosen))
+
+                c = self._choose_column()
+                cover(c)
+                r = D[c]
+                if r != c:
+                    chosen.append(r)
+                    j = R[r]
+                    while j != r:
+                        cover(C[j])
+                        j = R[j]
+                    continue
+                uncover(c)
+
+                # Cofnij się do ostatniego wyboru, który ma jeszcze alternatywę
+                while chosen:
+                    backtracks += 1
+                    r = chosen.pop()
+                    c = C[r]
+                    j = L[r]
+                    while j != r:
+                        uncover(C[j])
+                        j = L[j]
+                    r = D[r]
+                    if r != c:
+                        chosen.append(r)
+                        j = R[r]
+                        while j != r:
+                            cover(C[j])
+                            j = R[j]
+                        break
+                    uncover(c)
+                else:
+                    return None
+        finally:
+            self.stats.nodes = nodes
+            self.stats.backtracks = backtracks
+            self.stats.max_depth = max_depth
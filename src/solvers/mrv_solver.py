@@ -0,0 +1,394 @@
+import random
+from timeit import default_timer as timer
+
+import numpy as np
+
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent, CancellationToken
+from src.solvers.checkpoint import Checkpoint
+from src.solvers.naive_solver import NaiveSudokuSolver
+from src.solvers.stats import SolverStats
+
+
+class MrvSudokuSolver(NaiveSudokuSolver):
+    """
+    A backtracking sudoku solver with an explicit stack instead of recursion.
+
+    Given cells are never visited. At every node the solver branches
+    on the empty cell with the fewest legal values
+    (minimum-remaining-values heuristic), so forced cells are filled first
+    and dead ends are detected as soon as some cell runs out of values.
+
+    Attributes:
+    -----------
+    puzzle: SudokuGrid | None
+        a currently solved puzzle, has value set only when called the `solve` method
+    solution: SudokuGrid | None
+        a current solution, has value set only after called the `solve` method
+    token: CancellationToken | None
+        deadline and cancellation of the current search,
+        has value set only after called the `solve` method
+    stats: SolverStats
+        statistics of the last `solve` call (see `src.solvers.stats`)
+    value_order: str
+        order in which values of a cell are tried,
+        one of `VALUE_ORDERS`: "ascending", "descending" or "random"
+    checkpoint_path: str | None
+        file the search state is periodically saved to (see `checkpoint`),
+        `None` disables checkpointing
+    checkpoint_interval: float
+        time (in seconds) between two saved checkpoints; a checkpoint
+        is also saved when the search times out or is cancelled
+
+    Protected Attributes:
+    ---------------------
+    _random: random.Random
+        random generator used by the "random" value order
+    _cells: list[tuple[int, int, int]]
+        (row, col, block) of every empty cell of the puzzle;
+        cells at positions `< depth` are assigned, the rest are still free
+    _stack: list[list[int]]
+        the search stack of the running `_search`, frame `i` belongs to `_cells[i]`
+    _best: list[tuple[int, int, int]]
+        (row, col, value) of the cells of the deepest partial assignment
+        reached by the search, in the search order; the grid is built
+        only by `checkpoint`
+    _next_checkpoint: float
+        time (`timeit.default_timer` seconds) of the next periodic checkpoint
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    resume(checkpoint: Checkpoint, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        continues the search saved in a checkpoint
+    checkpoint() -> Checkpoint:
+        returns the current state of the search
+    """
+
+    VALUE_ORDERS = ("ascending", "descending", "random")
+
+    value_order: str
+    _random: random.Random
+    _cells: list[tuple[int, int, int]]
+    _stack: list[list[int]]
+    _best: list[tuple[int, int, int]]
+    _next_checkpoint: float
+    checkpoint_path: str | None
+    checkpoint_interval: float
+
+    def __init__(
+        self,
+        value_order: str = "ascending",
+        seed: int | None = None,
+        checkpoint_path: str | None = None,
+        checkpoint_interval: float = 60.0,
+    ) -> None:
+        if value_order not in self.VALUE_ORDERS:
+            raise ValueError(f"Unknown value order: '{value_order}'")
+        self.value_order = value_order
+        self._random = random.Random(seed)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        self.token = CancellationToken(time_limit, cancel)
+        self.stats = SolverStats()
+        self.puzzle = puzzle
+        self.solution = puzzle.copy()
+        self._init_masks()
+
+        blocks = self._cell_blocks
+        self._cells = [
+            (row, col, blocks[row][col])
+            for (row, col), val in puzzle.enumerate()
+            if val == 0
+        ]
+        self._stack = []
+        self._best = []
+
+        return self._run()
+
+    def resume(
+        self,
+        checkpoint: Checkpoint,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Continues the search saved in a checkpoint exactly where it stopped:
+        the remaining part of the search tree is explored in the same order
+        (with the "random" value order the untried values are shuffled anew).
+
+        Parameters:
+        -----------
+        checkpoint: Checkpoint
+            a state of the search saved by `checkpoint`
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        self.token = CancellationToken(time_limit, cancel)
+        self.stats = SolverStats(
+            resumed_nodes=checkpoint.nodes, resumed_backtracks=checkpoint.backtracks
+        )
+        self.puzzle = SudokuGrid(np.array(checkpoint.puzzle))
+        self.solution = checkpoint.partial()
+        self._init_masks()
+
+        blocks = self._cell_blocks
+        self._cells = [
+            (row, col, blocks[row][col]) for row, col in checkpoint.cells.tolist()
+        ]
+        self._stack = [
+            list(frame) for frame in zip(checkpoint.masks(), checkpoint.values.tolist())
+        ]
+        best = np.asarray(checkpoint.best)
+        self._best = [
+            (row, col, int(best[row, col]))
+            for row, col, _ in self._cells
+            if best[row, col]
+        ]
+        self.stats.max_depth = checkpoint.best_depth
+
+        return self._run()
+
+    def checkpoint(self) -> Checkpoint:
+        """
+        Returns the current state of the search, which can be continued
+        with `resume`. Valid between the search nodes, i.e. in `_timeout`
+        or after `solve` has raised `TimeoutError`.
+        """
+        best = np.array(self.puzzle._array)
+        for row, col, val in self._best:
+            best[row, col] = val
+        # węzeł przerwany przy sprawdzaniu terminu jest już policzony,
+        # a wznowione przeszukiwanie wejdzie do niego ponownie
+        nodes = max(self.stats.total_nodes - 1, 0)
+        return Checkpoint(
+            np.array(self.puzzle._array),
+            np.array(
+                [(row, col) for row, col, _ in self._cells], dtype=np.uint16
+            ).reshape(-1, 2),
+            Checkpoint.pack_masks(
+                [frame[0] for frame in self._stack], self.puzzle.size
+            ),
+            np.array([frame[1] for frame in self._stack], dtype=np.uint16),
+            best,
+            nodes,
+            self.stats.total_backtracks,
+            self.value_order,
+        )
+
+    def _run(self) -> SudokuGrid | None:
+        """
+        Runs the search from the prepared state and saves the final
+        checkpoint when it times out.
+        """
+        self._next_checkpoint = timer() + self.checkpoint_interval
+        try:
+            solved = self._search()
+        except TimeoutError:
+            if self.checkpoint_path is not None:
+                self.checkpoint().save(self.checkpoint_path)
+            raise
+        if solved:
+            return self.solution
+        return None
+
+    def _timeout(self) -> bool:
+        """
+        Checks the deadline (see `NaiveSudokuSolver._timeout`)
+        and saves a periodic checkpoint when it is due.
+        """
+        if self.token.check():
+            return True
+        if self.checkpoint_path is not None and timer() >= self._next_checkpoint:
+            # `_search` jest między węzłami i przed odczytem zegara zapisuje liczniki w `stats`
+            self.checkpoint().save(self.checkpoint_path)
+            self._next_checkpoint = timer() + self.checkpoint_interval
+        return False
+
+    def _select(self, depth: int) -> int:
+        """
+        Finds the free cell with the fewest legal values and moves it
+        to the position `depth` of `_cells`.
+
+        Parameters:
+        -----------
+        depth: int
+            number of already assigned cells
+
+        Returns:
+        --------
+        candidates: int
+            bitmask of the legal values of the selected cell
+        """
+        cells = self._cells
+        best = depth
+        best_candidates = -1
+        best_count = self.solution.size + 1
+        for i in range(depth, len(cells)):
+            candidates = self._candidates(*cells[i])
+            count = candidates.bit_count()
+            if count < best_count:
+                best, best_candidates, best_count = i, candidates, count
+                if count <= 1:
+                    break
+        cells[depth], cells[best] = cells[best], cells[depth]
+        return best_candidates
+
+    def _next_value(self, candidates: int) -> int:
+        """
+        Picks the next value to try according to `value_order`.
+
+        Parameters:
+        -----------
+        candidates: int
+            non-empty bitmask of the values not tried yet
+
+        Returns:
+        --------
+        bit: int
+            bitmask with the single bit of the chosen value
+        """
+        if self.value_order == "ascending":
+            return candidates & -candidates
+        if self.value_order == "descending":
+            return 1 << (candidates.bit_length() - 1)
+        bits = []
+        while candidates:
+            bit = candidates & -candidates
+            bits.append(bit)
+            candidates ^= bit
+        return self._random.choice(bits)
+
+    def _accept(self) -> bool:
+        """
+        Called when all the cells are assigned, i.e. `solution` is a solution.
+
+        Returns:
+        --------
+        stop: bool
+            `True` to stop the search, `False` to backtrack and look for
+            further solutions
+        """
+        return True
+
+    def _search(self) -> bool:
+        """
+        Performs an iterative depth-first-search over the empty cells.
+
+        The stack holds one frame `[candidates, value]` per assigned cell:
+        `candidates` are the values not tried yet and `value` is the one
+        currently put in the cell (`0` if none). The search continues
+        from the frames already on `_stack` and the counters of `stats`.
+        The counters are written back to `stats` before every deadline check,
+        so that a periodic checkpoint saves the current ones.
+
+        Returns:
+        --------
+        solved: bool
+            `True` - if method found the soluton
+            `False` - otherwise
+        """
+        cells = self._cells
+        token = self.token
+        stack = self._stack
+        stats = self.stats
+        nodes, backtracks, max_depth = stats.nodes, stats.backtracks, stats.max_depth
+        best = self._best
+        # najmniejsza głębokość zmieniona od zapamiętania `best` - płytsze ramki się z nim zgadzają
+        changed = 0
+        try:
+            while True:
+                nodes += 1
+                token.countdown -= 1
+                if token.countdown <= 0:
+                    stats.nodes, stats.backtracks, stats.max_depth = (
+                        nodes,
+                        backtracks,
+                        max_depth,
+                    )
+                    if self._timeout():
+                        raise TimeoutError("Solver time limit exceeded")
+                depth = len(stack)
+                if depth > max_depth:
+                    max_depth = depth
+                    # kopiujemy tylko ramki zmienione od poprzedniego rekordu
+                    best[changed:] = [
+                        (*cells[i][:2], stack[i][1]) for i in range(changed, depth)
+                    ]
+                    changed = depth
+                if depth < len(cells):
+                    stack.append([self._select(depth), 0])
+                elif self._accept():
+                    return True
+
+                # Wstaw kolejną wartość na szczycie stosu, cofając się w razie potrzeby
+                while stack:
+                    top = len(stack) - 1
+                    frame = stack[top]
+                    row, col, block = cells[top]
+                    if frame[1]:
+                        backtracks += 1
+                        self._unplace(row, col, block, frame[1])
+                    if not frame[0]:
+                        self.solution[row, col] = 0
+                        stack.pop()
+                        continue
+                    bit = self._next_value(frame[0])
+                    frame[0] ^= bit
+                    frame[1] = bit.bit_length() - 1
+                    self.solution[row, col] = frame[1]
+                    self._place(row, col, block, frame[1])
+                    changed = min(changed, top)
+                    break
+                else:
+                    return False
+        finally:
+            self.stats.nodes = nodes
+            self.stats.backtracks = backtracks
+            self.stats.max_depth = max_depth
@@ -1,6 +1,8 @@
-from src.model.grid import SudokuGrid
-from timeit import default_timer as timer
+import numpy as np
 
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent, CancellationToken
+from src.solvers.stats import SolverStats
 
 
 class NaiveSudokuSolver:
@@ -13,20 +15,48 @@ class NaiveSudokuSolver:
         a currently solved puzzle, has value set only when called the `solve` method
     solution: SudokuGrid | None
         a current solution, has value set only after called the `solve` method
-    deadline: float | None
-        a current deadline, has value set only after called the `solve` method
+    token: CancellationToken | None
+        deadline and cancellation of the current search,
+        has value set only after called the `solve` method
+    stats: SolverStats
+        statistics of the last `solve` call (see `src.solvers.stats`)
+
+    Protected Attributes:
+    ---------------------
+    _row_masks: list[int]
+        bitmasks of values already used in each row (bit `v` is set when `v` is used)
+    _col_masks: list[int]
+        bitmasks of values already used in each column
+    _block_masks: list[int]
+        bitmasks of values already used in each block
+    _full_mask: int
+        bitmask with bits `1..n` set, i.e. all the legal values of a cell
+    _cell_blocks: list[list[int]]
+        block index of every cell, from the shared geometry of the grid size
 
     Methods:
     --------
-    solve(puzzle: SudokuGrid, time_limit: float) -> SudokuGrid | None:
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
         solves the given sudoku puzzle within a specified time limit
     """
 
     puzzle: SudokuGrid | None
     solution: SudokuGrid | None
-    deadline: float | None
+    token: CancellationToken | None
+    stats: SolverStats
+    _row_masks: list[int]
+    _col_masks: list[int]
+    _block_masks: list[int]
+    _full_mask: int
+    _cell_blocks: list[list[int]]
 
-    def solve(self, puzzle: SudokuGrid, time_limit: float) -> SudokuGrid | None:
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
         """
         Solves the given sudoku puzzle within a specified time limit.
 
@@ -34,8 +64,10 @@ class NaiveSudokuSolver:
         -----------
         puzzle: SudokuGrid
             a sudoku puzzle to be solved
-        time_limit: float
-            amount of time (in seconds) available to the solver
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
 
         Returns:
         --------
@@ -46,27 +78,72 @@ class NaiveSudokuSolver:
         Raises:
         -------
         timeout_error: TimeoutError
-            when the available time runs out
+            when the available time runs out or the search is cancelled
         """
-        self.deadline = timer() + time_limit
+        self.token = CancellationToken(time_limit, cancel)
+        self.stats = SolverStats()
         self.puzzle = puzzle
         self.solution = puzzle.copy()
+        self._init_masks()
 
         if self._dfs(0, 0):
             return self.solution
         return None
 
+    def _init_masks(self) -> None:
+        """
+        Builds the per-row, per-column and per-block masks of used values
+        from the current solution.
+        """
+        size = self.solution.size
+        self._cell_blocks = self.solution.geometry.cell_blocks.tolist()
+        self._row_masks = [0] * size
+        self._col_masks = [0] * size
+        self._block_masks = [0] * size
+        self._full_mask = ((1 << size) - 1) << 1
+        for (row, col), val in self.solution.enumerate():
+            if val != 0:
+                self._place(row, col, self._cell_blocks[row][col], int(val))
+
+    def _place(self, row: int, col: int, block: int, val: int) -> None:
+        """
+        Marks a value as used in the row, column and block of the cell.
+        """
+        bit = 1 << val
+        self._row_masks[row] |= bit
+        self._col_masks[col] |= bit
+        self._block_masks[block] |= bit
+
+    def _unplace(self, row: int, col: int, block: int, val: int) -> None:
+        """
+        Clears a value from the row, column and block of the cell.
+        """
+        bit = ~(1 << val)
+        self._row_masks[row] &= bit
+        self._col_masks[col] &= bit
+        self._block_masks[block] &= bit
+
+    def _candidates(self, row: int, col: int, block: int) -> int:
+        """
+        Returns a bitmask of the values that can be put in the given cell.
+        """
+        return self._full_mask & ~(
+            self._row_masks[row] | self._col_masks[col] | self._block_masks[block]
+        )
+
     def _timeout(self) -> bool:
         """
-        Checks whether the available time has run out.
+        Checks whether the available time has run out or the search
+        has been cancelled. Called only when `token.countdown` drops to zero,
+        i.e. every few nodes (see `src.solvers.cancellation`).
 
         Returns:
         --------
         timeout: bool
-            - `True` if solver has missed the deadline
+            - `True` if solver has missed the deadline or has been cancelled
             - `False` otherwise
         """
-        return timer() > self.deadline
+        return self.token.check()
 
     def _increment_coordinates(self, row: int, col: int) -> tuple[int, int]:
         """
@@ -115,53 +192,37 @@ class NaiveSudokuSolver:
             - `True` if the value can**not** be put in the cell
             - `False` otherwise
         """
-        # TODO:
-        # Implement the method according to the docstring
-        # 
-        # tip 1. check if val is already in the row, col and block of the cell
-        # tip 2. use array slicing to get row and column
-        #        https://www.w3schools.com/python/numpy/numpy_array_slicing.asp
-        # tip 2. use `self.solution.block_index` and `self.solution.block`
-        #        to get the block
-        size = self.solution.size
-
-        # 1) Sprawdź wiersz
-        if any(self.solution[row, j] == val for j in range(size)):
-            return True
-
-        # 2) Sprawdź kolumnę
-        if any(self.solution[i, col] == val for i in range(size)):
-            return True
-
-        # 3) Sprawdź blok
-        idx = self.solution.block_index(row, col)
-        block_vals = self.solution.block(idx)
-        # block_vals to tablica 2D; iterujemy po wartościach
-        if any(x == val for row_vals in block_vals for x in row_vals):
-            return True
-
-        return False
+        used = (
+            self._row_masks[row]
+            | self._col_masks[col]
+            | self._block_masks[self._cell_blocks[row][col]]
+        )
+        return bool(used >> val & 1)
 
     def _dfs(self, row: int, col: int) -> bool:
         """
         Performs a depth-first-search to solve the sudoku puzzle.
         Basically, it tries to put any acceptable value at the current cell
-        and then moves to the next cell recursively.
+        and then moves to the next empty cell.
 
         It may happen that it is impossible to find any
         acceptable value for the given cell.
         In such a case we check other values for the **previous**
         cells. This is called backtracking.
 
+        The search keeps an explicit stack with one frame `[candidates, value]`
+        per assigned cell instead of recursing, so its depth is not limited
+        by the Python recursion limit.
+
         - https://en.wikipedia.org/wiki/Backtracking
         - https://www.geeksforgeeks.org/introduction-to-backtracking-2/
 
         Parameters:
         -----------
         row: int
-            row coordinate of the currently considered cell 
+            row coordinate of the cell the search starts from
         col: int
-            column coordinate of the currently considered cell 
+            column coordinate of the cell the search starts from
 
         Returns:
         --------
@@ -169,44 +230,60 @@ class NaiveSudokuSolver:
             `True` - if method found the soluton
             `False` - otherwise
         """
-        # TODO:
-        # Implement the method according to the docstring
-        # 
-        # - if `row` is outside the grid, we have explored all the cells
-        #   it means, we have solved the puzzle!
-        # - if the time has run out (`self._timeout` method)
-        #   raise the TimeoutError
-        # - if the value of the current cell in the original puzzle is not 0
-        #   it means, we don't have to do anything with the cell
-        #   just increment the coordinates (`self._increment_coordinates`)
-        #   and call _dfs recursively
-        # - otherwise we have to loop over all the possible sudoku values:
-        #   * ignore values that are already excluded (`self._is_excluded`)
-        #   * put value in the current cell
-        #   * run recursively _dfs on the next cell
-        #       - if the recursive call returns True, we have solved the puzzle!
-        #       - otherwise we reset value of the current cell to 0
-        # - if we finish the loop without success, the puzzle is infeasible
-        #   so we should return `False`
         size = self.solution.size
-        # Jeśli skończyliśmy przeszukiwać ostatni wiersz, rozwiązano zagadkę
-        if row >= size:
-            return True
-        # Sprawdź limit czasu
-        if self._timeout():
-            raise TimeoutError("Solver time limit exceeded")
-        # Jeśli komórka była zapełniona oryginalnie, pomiń ją
-        if self.puzzle._array[row, col] != 0:
-            nxt_row, nxt_col = self._increment_coordinates(row, col)
-            return self._dfs(nxt_row, nxt_col)
-        # W przeciwnym razie spróbuj wstawić do komórki wszystkie wartości od 1 do size
-        for val in range(1, size + 1):
-            if not self._is_excluded(row, col, val):
-                self.solution[row, col] = val
-                nxt_row, nxt_col = self._increment_coordinates(row, col)
-                if self._dfs(nxt_row, nxt_col):
+        start = row * size + col
+        # puste komórki od (row, col) wierszami; komórki zapełnione oryginalnie są pomijane
+        empty = (
+            np.flatnonzero(np.asarray(self.puzzle._array).ravel()[start:] == 0) + start
+        )
+        cells = [
+            (r, c, self._cell_blocks[r][c])
+            for r, c in (divmod(i, size) for i in empty.tolist())
+        ]
+        solution = self.solution
+        token = self.token
+        stats = self.stats
+        nodes, backtracks, max_depth = stats.nodes, stats.backtracks, stats.max_depth
+        stack: list[list[int]] = []
+        try:
+            while True:
+                depth = len(stack)
+                # Jeśli wszystkie puste komórki mają wartości, rozwiązano zagadkę
+                if depth == len(cells):
                     return True
-                # Cofnij ruch
-                self.solution[row, col] = 0
-        # Jeśli żadna wartość nie działa, to puzzle jest niespełnialny na tej ścieżce
-        return False
+                row, col, block = cells[depth]
+                nodes += 1
+                max_depth = max(max_depth, row * size + col)
+                # Sprawdź limit czasu
+                token.countdown -= 1
+                if token.countdown <= 0 and self._timeout():
+                    raise TimeoutError("Solver time limit exceeded")
+                stack.append([self._candidates(row, col, block), 0])
+
+                # Wstaw kolejną dozwoloną wartość na szczycie stosu, cofając się w razie potrzeby
+                while stack:
+                    frame = stack[-1]
+                    row, col, block = cells[len(stack) - 1]
+                    if frame[1]:
+                        # Cofnij ruch
+                        backtracks += 1
+                        self._unplace(row, col, block, frame[1])
+                        frame[1] = 0
+                    if not frame[0]:
+                        solution[row, col] = 0
+                        stack.pop()
+                        continue
+                    bit = frame[0] & -frame[0]
+                    frame[0] ^= bit
+                    val = bit.bit_length() - 1
+                    frame[1] = val
+                    solution[row, col] = val
+                    self._place(row, col, block, val)
+                    break
+                else:
+                    # Żadna wartość pierwszej komórki nie działa - puzzle jest niespełnialny
+                    return False
+        finally:
+            stats.nodes = nodes
+            stats.backtracks = backtracks
+            stats.max_depth = max_depth
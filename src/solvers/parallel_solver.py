@@ -0,0 +1,339 @@
+import multiprocessing as mp
+import os
+import queue
+from collections import deque
+from collections.abc import Iterator
+from timeit import default_timer as timer
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent, CancellationToken
+from src.solvers.mrv_solver import MrvSudokuSolver
+from src.solvers.propagation import (
+    candidates_from_grid,
+    grid_from_candidates,
+    propagate,
+)
+
+# czas oczekiwania bezczynnego procesu na zadanie, zanim sprawdzi sygnał zatrzymania
+_POLL_PERIOD = 0.05
+# czas na zakończenie procesu po sygnale zatrzymania, zanim dostanie SIGTERM/SIGKILL
+_TERMINATE_GRACE = 0.1
+# co ile sekund sprawdzać zewnętrzne anulowanie podczas oczekiwania na wyniki
+_WAIT_PERIOD = 0.05
+
+_SOLVED = "SOLVED"
+_EXHAUSTED = "EXHAUSTED"
+_ERROR = "ERROR"
+
+
+def split(
+    puzzle: SudokuGrid,
+    count: int,
+    intersections: bool = True,
+    token: CancellationToken | None = None,
+) -> Iterator[SudokuGrid]:
+    """
+    Expands the search tree breadth-first into a frontier of at least
+    `count` subproblems (partial assignments), branching on the cell
+    with the fewest candidates. Subproblems proved infeasible by
+    constraint propagation are dropped.
+
+    The frontier keeps compact grids, the candidate tensor of a node
+    exists only while the node is being expanded.
+
+    Parameters:
+    -----------
+    puzzle: SudokuGrid
+        a sudoku puzzle to be split
+    count: int
+        desired number of subproblems
+    intersections: bool
+        whether to apply pointing pairs and box-line reduction
+    token: CancellationToken | None
+        deadline of the splitting, checked in every propagation round
+
+    Yields:
+    -------
+    subproblem: SudokuGrid
+        the subproblems, none if the puzzle is infeasible, or a single
+        solved grid if propagation solves the puzzle;
+        the puzzle is solved iff one of them is solved
+
+    Raises:
+    -------
+    timeout_error: TimeoutError
+        when the token expires
+    """
+    frontier = deque([puzzle])
+    while frontier and len(frontier) < count:
+        grid = frontier.popleft()
+        try:
+            node = candidates_from_grid(grid)
+        except ValueError:
+            continue
+        if not propagate(node, intersections, token):
+            continue
+        counts = node.sum(axis=2)
+        open_counts = np.where(counts > 1, counts, np.iinfo(counts.dtype).max)
+        row, col = np.unravel_index(open_counts.argmin(), counts.shape)
+        if counts[row, col] == 1:
+            # rozwiązane - nie ma czego dzielić
+            yield grid_from_candidates(node)
+            return
+        base = np.asarray(grid_from_candidates(node)._array)
+        for value in np.flatnonzero(node[row, col]).tolist():
+            child = base.copy()
+            child[row, col] = value + 1
+            frontier.append(SudokuGrid(child))
+    yield from frontier
+
+
+class _StealingMrvSolver(MrvSudokuSolver):
+    """
+    An MRV solver donating the untried values of its shallowest open
+    stack frame to the shared task queue whenever some worker is idle.
+    Donations happen at the deadline checks, i.e. every few milliseconds.
+    """
+
+    def __init__(self, tasks: mp.Queue, idle: Any, pending: Any) -> None:
+        super().__init__()
+        self._tasks = tasks
+        self._idle = idle
+        self._pending = pending
+
+    def _timeout(self) -> bool:
+        if self.token.check():
+            return True
+        if self._idle.value > 0:
+            self._donate()
+        return False
+
+    def _donate(self) -> None:
+        """
+        Moves the untried values of the shallowest open frame to the task queue,
+        one subproblem per value.
+        """
+        stack = self._stack
+        for depth, frame in enumerate(stack):
+            if frame[0]:
+                break
+        else:
+            return
+        candidates, frame[0] = frame[0], 0
+
+        base = np.array(self.puzzle._array)
+        cells = self._cells
+        for row, col, _ in cells[:depth]:
+            base[row, col] = self.solution[row, col]
+        row, col, _ = cells[depth]
+        subproblems = []
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            subproblem = base.copy()
+            subproblem[row, col] = bit.bit_length() - 1
+            subproblems.append(subproblem)
+
+        # licznik zwiększany przed wstawieniem zadań - nie spadnie do zera, póki ten proces pracuje
+        with self._pending.get_lock():
+            self._pending.value += len(subproblems)
+        for subproblem in subproblems:
+            self._tasks.put(subproblem)
+
+
+def _run_worker(
+    tasks: "mp.Queue[npt.NDArray[np.uint]]",
+    results: "mp.Queue[tuple[str, Any]]",
+    stop: CancelEvent,
+    idle: Any,
+    pending: Any,
+) -> None:
+    """
+    Solves subproblems from the task queue until the puzzle is solved,
+    all the subproblems are exhausted or the search is stopped.
+    Reports a solution, the exhaustion or an error through the result queue.
+    """
+    # nie czekaj przy wyjściu na opróżnienie kolejki - po zatrzymaniu nikt jej nie czyta
+    tasks.cancel_join_thread()
+    solver = _StealingMrvSolver(tasks, idle, pending)
+    waiting = False
+    try:
+        while not stop.is_set():
+            if not waiting:
+                with idle.get_lock():
+                    idle.value += 1
+                waiting = True
+            try:
+                subproblem = tasks.get(timeout=_POLL_PERIOD)
+            except queue.Empty:
+                continue
+            with idle.get_lock():
+                idle.value -= 1
+            waiting = False
+
+            solution = solver.solve(SudokuGrid(subproblem), None, stop)
+            if solution is not None:
+                results.put((_SOLVED, np.asarray(solution._array)))
+                return
+            with pending.get_lock():
+                pending.value -= 1
+                left = pending.value
+            if left == 0:
+                results.put((_EXHAUSTED, None))
+                return
+    except TimeoutError:
+        return
+    except Exception as e:
+        results.put((_ERROR, str(e)))
+
+
+class ParallelSudokuSolver:
+    """
+    A sudoku solver splitting the search tree of a single puzzle
+    among several worker processes.
+
+    The tree is first expanded into a frontier of subproblems
+    (see `split`), which are put in a shared task queue. Every worker runs
+    the MRV solver on a subproblem at a time; whenever some worker is idle,
+    the busy ones donate the untried values of their shallowest open
+    stack frame as new subproblems (work stealing by stack splitting).
+    All the workers stop as soon as one finds a solution, the puzzle
+    is infeasible only when every subproblem has been exhausted.
+
+    Attributes:
+    -----------
+    jobs: int
+        number of worker processes
+    frontier_factor: int
+        number of initial subproblems per worker
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    jobs: int
+    frontier_factor: int
+
+    def __init__(self, jobs: int | None = None, frontier_factor: int = 4) -> None:
+        self.jobs = jobs or os.cpu_count() or 1
+        self.frontier_factor = frontier_factor
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to all the workers together,
+            `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        runtime_error: RuntimeError
+            when a worker fails
+        """
+        token = CancellationToken(time_limit, cancel)
+        tasks: mp.Queue = mp.Queue()
+        results: mp.Queue = mp.Queue()
+        stop = mp.Event()
+        idle = mp.Value("i", 0)
+        # jednostka podziału drzewa - licznik nie spadnie do zera, póki trwa `split`
+        pending = mp.Value("i", 1)
+        workers = [
+            mp.Process(
+                target=_run_worker,
+                args=(tasks, results, stop, idle, pending),
+                daemon=True,
+            )
+            for _ in range(self.jobs)
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            # procesy startują przed podziałem - uruchamianie nakłada się na propagację
+            for subproblem in split(
+                puzzle, self.jobs * self.frontier_factor, token=token
+            ):
+                if subproblem.is_solved():
+                    return subproblem
+                with pending.get_lock():
+                    pending.value += 1
+                tasks.put(np.asarray(subproblem._array))
+            with pending.get_lock():
+                pending.value -= 1
+                left = pending.value
+            if left == 0:
+                return None
+
+            while True:
+                if token.check():
+                    break
+                remaining = (
+                    token.deadline - timer()
+                    if token.deadline is not None
+                    else _WAIT_PERIOD
+                )
+                if remaining <= 0:
+                    break
+                try:
+                    status, payload = results.get(timeout=min(remaining, _WAIT_PERIOD))
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        raise RuntimeError("All workers died") from None
+                    continue
+                if status == _SOLVED:
+                    return SudokuGrid(payload)
+                if status == _EXHAUSTED:
+                    return None
+                raise RuntimeError(f"Worker failed: {payload}")
+            raise TimeoutError("Solver time limit exceeded")
+        finally:
+            stop.set()
+            self._terminate(workers)
+            tasks.cancel_join_thread()
+            tasks.close()
+            results.close()
+
+    @staticmethod
+    def _terminate(workers: list[mp.Process]) -> None:
+        """
+        Stops all the worker processes: waits a moment for the stopped
+        ones to return, then sends SIGTERM and finally SIGKILL.
+        """
+        end = timer() + _TERMINATE_GRACE
+        for worker in workers:
+            worker.join(max(end - timer(), 0))
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join(_TERMINATE_GRACE)
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
@@ -0,0 +1,183 @@
+import multiprocessing as mp
+import queue
+from timeit import default_timer as timer
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent
+
+# (strategy name, solver name, solver options)
+Strategy = tuple[str, str, dict[str, Any]]
+
+DEFAULT_STRATEGIES: list[Strategy] = [
+    ("dlx", "dlx", {}),
+    ("mrv", "mrv", {}),
+    ("mrv-descending", "mrv", {"value_order": "descending"}),
+    ("mrv-random", "mrv", {"value_order": "random", "seed": 0}),
+    ("propagate", "propagate", {}),
+]
+
+# czas na zakończenie przegranego procesu po sygnale anulowania, zanim dostanie SIGTERM/SIGKILL
+_TERMINATE_GRACE = 0.1
+# co ile sekund sprawdzać zewnętrzne anulowanie podczas oczekiwania na wyniki
+_POLL_PERIOD = 0.05
+
+
+def _run_strategy(
+    strategy: Strategy,
+    puzzle: npt.NDArray[np.uint],
+    time_limit: float | None,
+    results: "mp.Queue[tuple[str, str, npt.NDArray[np.uint] | None]]",
+    stop: CancelEvent,
+) -> None:
+    """
+    Solves the puzzle with a single strategy and reports the outcome
+    `(strategy name, status, solution array)` through the queue.
+    """
+    # import w procesie roboczym - rejestr solverów importuje ten moduł
+    from src.solvers.registry import create_solver
+
+    name, solver_name, options = strategy
+    try:
+        solver = create_solver(solver_name, **options)
+        solution = solver.solve(SudokuGrid(puzzle), time_limit, stop)
+    except TimeoutError:
+        results.put((name, "TIMEOUT", None))
+        return
+    except Exception as e:
+        results.put((name, f"ERROR: {e}", None))
+        return
+    if solution is None:
+        results.put((name, "INFEASIBLE", None))
+    else:
+        results.put((name, "SOLVED", np.asarray(solution._array)))
+
+
+class PortfolioSudokuSolver:
+    """
+    A sudoku solver racing several strategies in separate processes.
+
+    The first strategy to finish decides the outcome: its solution is
+    returned (or `None` if it proved the puzzle infeasible) and all the other
+    processes are cancelled through a shared event (and terminated if they
+    do not stop in time). The time limit is global, i.e. it bounds
+    the whole race, not every strategy separately.
+
+    Attributes:
+    -----------
+    strategies: list[Strategy]
+        raced strategies, `(strategy name, solver name, solver options)`
+    winner: str | None
+        name of the strategy which decided the last `solve` call
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    strategies: list[Strategy]
+    winner: str | None
+
+    def __init__(self, strategies: list[Strategy] | None = None) -> None:
+        self.strategies = list(DEFAULT_STRATEGIES if strategies is None else strategies)
+        self.winner = None
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to all the strategies together,
+            `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the race when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the race is cancelled
+        """
+        deadline = timer() + time_limit if time_limit is not None else None
+        self.winner = None
+        results: mp.Queue = mp.Queue()
+        stop = mp.Event()
+        workers = [
+            mp.Process(
+                target=_run_strategy,
+                args=(strategy, np.asarray(puzzle._array), time_limit, results, stop),
+                daemon=True,
+            )
+            for strategy in self.strategies
+        ]
+        for worker in workers:
+            worker.start()
+
+        errors = []
+        try:
+            received = 0
+            while received < len(workers):
+                if cancel is not None and cancel.is_set():
+                    break
+                remaining = deadline - timer() if deadline is not None else _POLL_PERIOD
+                if remaining <= 0:
+                    break
+                try:
+                    name, status, array = results.get(
+                        timeout=min(remaining, _POLL_PERIOD)
+                    )
+                except queue.Empty:
+                    continue
+                received += 1
+                if status == "SOLVED":
+                    self.winner = name
+                    return SudokuGrid(array)
+                if status == "INFEASIBLE":
+                    self.winner = name
+                    return None
+                if status != "TIMEOUT":
+                    errors.append(f"{name}: {status}")
+            if len(errors) == len(workers):
+                raise RuntimeError("All strategies failed - " + "; ".join(errors))
+            raise TimeoutError("Solver time limit exceeded")
+        finally:
+            stop.set()
+            self._terminate(workers)
+            results.close()
+
+    @staticmethod
+    def _terminate(workers: list[mp.Process]) -> None:
+        """
+        Stops all the worker processes: waits a moment for the cancelled
+        ones to return, then sends SIGTERM and finally SIGKILL.
+        """
+        end = timer() + _TERMINATE_GRACE
+        for worker in workers:
+            worker.join(max(end - timer(), 0))
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join(_TERMINATE_GRACE)
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
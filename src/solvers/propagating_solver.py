@@ -0,0 +1,158 @@
+import numpy as np
+
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent, CancellationToken
+from src.solvers.propagation import (
+    Candidates,
+    candidates_from_grid,
+    grid_from_candidates,
+    propagate,
+)
+from src.solvers.stats import SolverStats
+
+
+class PropagatingSudokuSolver:
+    """
+    A sudoku solver running vectorized constraint propagation
+    (see `src.solvers.propagation`) at every node of the search.
+
+    The search branches on the undecided cell with the fewest candidates
+    only when propagation reaches a fixpoint without solving the puzzle,
+    so mostly-filled puzzles are usually solved without branching at all.
+
+    Attributes:
+    -----------
+    puzzle: SudokuGrid | None
+        a currently solved puzzle, has value set only when called the `solve` method
+    solution: SudokuGrid | None
+        a current solution, has value set only after called the `solve` method
+    token: CancellationToken | None
+        deadline and cancellation of the current search,
+        has value set only after called the `solve` method
+    stats: SolverStats
+        statistics of the last `solve` call (see `src.solvers.stats`)
+    intersections: bool
+        whether to apply pointing pairs and box-line reduction at every node
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    puzzle: SudokuGrid | None
+    solution: SudokuGrid | None
+    token: CancellationToken | None
+    stats: SolverStats
+    intersections: bool
+
+    def __init__(self, intersections: bool = True) -> None:
+        self.intersections = intersections
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        self.token = CancellationToken(time_limit, cancel)
+        self.stats = SolverStats()
+        self.puzzle = puzzle
+        self.solution = None
+
+        try:
+            candidates = candidates_from_grid(puzzle)
+        except ValueError:
+            return None
+        solved = self._search(candidates)
+        if solved is not None:
+            self.solution = grid_from_candidates(solved)
+        return self.solution
+
+    def _timeout(self) -> bool:
+        """
+        Checks whether the available time has run out or the search
+        has been cancelled. Called only when `token.countdown` drops to zero,
+        i.e. every few nodes (see `src.solvers.cancellation`).
+
+        Returns:
+        --------
+        timeout: bool
+            - `True` if solver has missed the deadline or has been cancelled
+            - `False` otherwise
+        """
+        return self.token.check()
+
+    def _search(self, root: Candidates) -> Candidates | None:
+        """
+        Performs a depth-first-search with propagation at every node.
+
+        The stack holds the nodes still to be explored; children of a node
+        are created lazily, one value of the branching cell at a time.
+
+        Parameters:
+        -----------
+        root: Candidates
+            candidate tensor of the puzzle
+
+        Returns:
+        --------
+        solved: Candidates | None
+            - candidate tensor with a single candidate in every cell
+            - `None` if the puzzle is infeasible
+        """
+        stack: list[tuple[Candidates, int, int, list[int]]] = []
+        node: Candidates = root
+        stats = self.stats
+        token = self.token
+        while True:
+            stats.nodes += 1
+            token.countdown -= 1
+            if token.countdown <= 0 and self._timeout():
+                raise TimeoutError("Solver time limit exceeded")
+            stats.max_depth = max(stats.max_depth, len(stack))
+
+            if propagate(node, self.intersections, token):
+                counts = node.sum(axis=2)
+                open_counts = np.where(counts > 1, counts, np.iinfo(counts.dtype).max)
+                row, col = np.unravel_index(open_counts.argmin(), counts.shape)
+                if counts[row, col] == 1:
+                    return node
+                values = np.flatnonzero(node[row, col])[::-1].tolist()
+                stack.append((node, int(row), int(col), values))
+            else:
+                stats.backtracks += 1
+
+            # Weź kolejną nieodwiedzoną wartość z najgłębszego węzła
+            while stack and not stack[-1][3]:
+                stack.pop()
+            if not stack:
+                return None
+            parent, row, col, values = stack[-1]
+            node = parent.copy()
+            node[row, col] = False
+            node[row, col, values.pop()] = True
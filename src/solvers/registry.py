@@ -0,0 +1,69 @@
+from typing import Any, Protocol
+
+from src.model.grid import SudokuGrid
+from src.solvers.auto_solver import AutoSudokuSolver
+from src.solvers.cancellation import CancelEvent
+from src.solvers.dlx_solver import DlxSudokuSolver
+from src.solvers.mrv_solver import MrvSudokuSolver
+from src.solvers.naive_solver import NaiveSudokuSolver
+from src.solvers.parallel_solver import ParallelSudokuSolver
+from src.solvers.portfolio_solver import PortfolioSudokuSolver
+from src.solvers.propagating_solver import PropagatingSudokuSolver
+from src.solvers.restart_solver import RestartingSudokuSolver
+from src.solvers.sat_solver import SatSudokuSolver
+from src.solvers.tensor_solver import TensorSudokuSolver
+
+
+class SudokuSolver(Protocol):
+    """
+    Common interface of all the sudoku solvers.
+    """
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None: ...
+
+
+SOLVERS: dict[str, type[SudokuSolver]] = {
+    "naive": NaiveSudokuSolver,
+    "mrv": MrvSudokuSolver,
+    "dlx": DlxSudokuSolver,
+    "propagate": PropagatingSudokuSolver,
+    "sat": SatSudokuSolver,
+    "portfolio": PortfolioSudokuSolver,
+    "parallel": ParallelSudokuSolver,
+    "tensor": TensorSudokuSolver,
+    "restart": RestartingSudokuSolver,
+    "auto": AutoSudokuSolver,
+}
+
+
+def create_solver(name: str, **options: Any) -> SudokuSolver:
+    """
+    Creates a solver registered under the given name.
+
+    Parameters:
+    -----------
+    name: str
+        name of the solver, one of `SOLVERS` keys
+    options: Any
+        keyword arguments passed to the solver constructor
+
+    Returns:
+    --------
+    solver: SudokuSolver
+        a new solver instance
+
+    Raises:
+    -------
+    value_error: ValueError
+        when there is no solver with the given name
+    """
+    try:
+        solver_class = SOLVERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown solver: '{name}'") from None
+    return solver_class(**options)
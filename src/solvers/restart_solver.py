@@ -0,0 +1,379 @@
+"""
+Randomized search with restarts, dom/wdeg cell ordering and nogood recording.
+
+Backtracking on large grids is heavy-tailed: an unlucky early choice
+can cost orders of magnitude more nodes than a lucky one. This solver
+bounds every run with a node budget following the Luby sequence
+(`restart_base * 1, 1, 2, 1, 1, 2, 4, ...`) and starts again from the root
+when the budget runs out. What the failed runs learned is kept:
+
+- every row, column and block has a weight, increased each time a cell
+  of the unit runs out of legal values; the search branches on the cell
+  with the smallest ratio of legal values to the weight of its units
+  (dom/wdeg), so it focuses on the constraints which keep failing,
+- values of a cell are tried in a random order, different in every run,
+- at a restart every refuted value of the branch is recorded as a nogood
+  (the decisions above it plus the value), which prunes the same dead
+  subtrees in all the later runs.
+
+Luby budgets grow without a bound, so the search stays complete
+and proves infeasibility as well.
+"""
+
+import numpy as np
+
+from src.model.grid import SudokuGrid
+from src.solvers.cancellation import CancelEvent
+from src.solvers.checkpoint import Checkpoint
+from src.solvers.mrv_solver import MrvSudokuSolver
+
+# (indeks komórki row * n + col, wartość)
+Literal = tuple[int, int]
+Nogood = tuple[Literal, ...]
+
+
+def luby(i: int) -> int:
+    """
+    Returns the `i`-th (1-based) element of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ...
+    """
+    while True:
+        k = i.bit_length()
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+
+
+class RestartingSudokuSolver(MrvSudokuSolver):
+    """
+    A randomized backtracking sudoku solver with Luby restarts,
+    dom/wdeg cell ordering and nogoods kept across the restarts.
+
+    Attributes:
+    -----------
+    puzzle: SudokuGrid | None
+        a currently solved puzzle, has value set only when called the `solve` method
+    solution: SudokuGrid | None
+        a current solution, has value set only after called the `solve` method
+    stats: SolverStats
+        statistics of the last `solve` call, summed over all the runs
+    restart_base: int
+        node budget of a run is `restart_base` times the next element of the Luby sequence
+    max_nogood_size: int
+        nogoods with more decisions are not recorded
+    max_nogoods: int
+        maximal number of the recorded nogoods
+    restarts: int
+        number of restarts of the last `solve` call
+    nogoods: set[Nogood]
+        nogoods recorded by the last `solve` call
+
+    Protected Attributes:
+    ---------------------
+    _row_weights: list[int]
+        weights of the rows, i.e. `1` plus the number of failures in the row
+    _col_weights: list[int]
+        weights of the columns
+    _block_weights: list[int]
+        weights of the blocks
+    _grid: list[int]
+        the current assignment, flattened (`row * n + col`)
+    _watches: dict[Literal, list[Nogood]]
+        the recorded nogoods containing a given literal
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    restart_base: int
+    max_nogood_size: int
+    max_nogoods: int
+    restarts: int
+    nogoods: set[Nogood]
+    _row_weights: list[int]
+    _col_weights: list[int]
+    _block_weights: list[int]
+    _grid: list[int]
+    _watches: dict[Literal, list[Nogood]]
+
+    def __init__(
+        self,
+        seed: int | None = 0,
+        restart_base: int = 256,
+        max_nogood_size: int = 8,
+        max_nogoods: int = 100_000,
+    ) -> None:
+        """
+        Parameters:
+        -----------
+        seed: int | None
+            seed of the random value order, `None` for a non-reproducible one
+        restart_base: int
+            node budget of the shortest run
+        max_nogood_size: int
+            maximal number of decisions of a recorded nogood
+        max_nogoods: int
+            maximal number of the recorded nogoods
+        """
+        super().__init__("random", seed)
+        if restart_base < 1:
+            raise ValueError("Restart base must be positive")
+        self.restart_base = restart_base
+        self.max_nogood_size = max_nogood_size
+        self.max_nogoods = max_nogoods
+        self.restarts = 0
+        self.nogoods = set()
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        size = puzzle.size
+        self._row_weights = [1] * size
+        self._col_weights = [1] * size
+        self._block_weights = [1] * size
+        self._grid = np.asarray(puzzle._array).ravel().tolist()
+        self._watches = {}
+        self.nogoods = set()
+        self.restarts = 0
+        return super().solve(puzzle, time_limit, cancel)
+
+    def resume(
+        self,
+        checkpoint: Checkpoint,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Not supported - the weights and the nogoods are not part of a checkpoint.
+
+        Raises:
+        -------
+        value_error: ValueError
+            always
+        """
+        raise ValueError("Restarting search cannot be resumed from a checkpoint")
+
+    def _select(self, depth: int) -> int:
+        """
+        Finds the free cell with the smallest ratio of legal values
+        to the weight of its row, column and block (dom/wdeg) and moves it
+        to the position `depth` of `_cells`. A cell without legal values
+        is selected at once and the weights of its units are increased.
+
+        Parameters:
+        -----------
+        depth: int
+            number of already assigned cells
+
+        Returns:
+        --------
+        candidates: int
+            bitmask of the legal values of the selected cell
+        """
+        cells = self._cells
+        full = self._full_mask
+        row_masks, col_masks, block_masks = (
+            self._row_masks,
+            self._col_masks,
+            self._block_masks,
+        )
+        row_weights, col_weights, block_weights = (
+            self._row_weights,
+            self._col_weights,
+            self._block_weights,
+        )
+        best = depth
+        best_candidates = -1
+        best_count = self.solution.size + 1
+        best_weight = 1
+        for i in range(depth, len(cells)):
+            row, col, block = cells[i]
+            candidates = full & ~(row_masks[row] | col_masks[col] | block_masks[block])
+            count = candidates.bit_count()
+            if count <= 1:
+                best, best_candidates = i, candidates
+                if count == 0:
+                    row_weights[row] += 1
+                    col_weights[col] += 1
+                    block_weights[block] += 1
+                break
+            weight = row_weights[row] + col_weights[col] + block_weights[block]
+            # count / weight < best_count / best_weight bez dzielenia
+            if count * best_weight < best_count * weight:
+                best, best_candidates, best_count, best_weight = (
+                    i,
+                    candidates,
+                    count,
+                    weight,
+                )
+        cells[depth], cells[best] = cells[best], cells[depth]
+        return best_candidates
+
+    def _violates(self, index: int, val: int) -> bool:
+        """
+        Checks whether putting the value in the cell completes a recorded nogood.
+
+        Parameters:
+        -----------
+        index: int
+            index `row * n + col` of the cell
+        val: int
+            a value to be put in the cell
+        """
+        grid = self._grid
+        for nogood in self._watches.get((index, val), ()):
+            if all(grid[i] == v or i == index for i, v in nogood):
+                return True
+        return False
+
+    def _record(self, nogood: Nogood) -> None:
+        """
+        Stores a nogood unless it is already known or the store is full.
+        """
+        if len(self.nogoods) >= self.max_nogoods or nogood in self.nogoods:
+            return
+        self.nogoods.add(nogood)
+        for literal in nogood:
+            self._watches.setdefault(literal, []).append(nogood)
+
+    def _restart(self, stack: list[list[int]]) -> None:
+        """
+        Records the nogoods of the current branch and unwinds it to the root.
+
+        A value tried and refuted at some level is a nogood together with
+        the decisions above it. Cells which had a single legal value are not
+        decisions - their values follow from the decisions above them.
+
+        Parameters:
+        -----------
+        stack: list[list[int]]
+            the search stack, frames `[candidates, value, domain]`
+        """
+        n = self.solution.size
+        cells = self._cells
+        decisions: list[Literal] = []
+        for depth, frame in enumerate(stack):
+            row, col, _ = cells[depth]
+            index = row * n + col
+            refuted = frame[2] & ~frame[0] & ~(1 << frame[1])
+            while refuted:
+                bit = refuted & -refuted
+                refuted ^= bit
+                self._record((*decisions, (index, bit.bit_length() - 1)))
+            if frame[2] & (frame[2] - 1):
+                if len(decisions) == self.max_nogood_size - 1:
+                    break
+                decisions.append((index, frame[1]))
+
+        grid = self._grid
+        for depth in range(len(stack) - 1, -1, -1):
+            row, col, block = cells[depth]
+            val = stack[depth][1]
+            if val:
+                self._unplace(row, col, block, val)
+                grid[row * n + col] = 0
+                self.solution[row, col] = 0
+        stack.clear()
+        self.restarts += 1
+
+    def _search(self) -> bool:
+        """
+        Performs a sequence of depth-first-searches over the empty cells,
+        each limited by a node budget, see `MrvSudokuSolver._search`.
+
+        The stack holds one frame `[candidates, value, domain]` per assigned
+        cell: `domain` are the legal values of the cell when it was selected.
+
+        Returns:
+        --------
+        solved: bool
+            `True` - if method found the soluton
+            `False` - otherwise
+        """
+        cells = self._cells
+        token = self.token
+        grid = self._grid
+        n = self.solution.size
+        stack = self._stack
+        stats = self.stats
+        nodes, backtracks, max_depth = stats.nodes, stats.backtracks, stats.max_depth
+        budget = self.restart_base * luby(self.restarts + 1)
+        run_nodes = 0
+        try:
+            while True:
+                nodes += 1
+                run_nodes += 1
+                token.countdown -= 1
+                if token.countdown <= 0 and self._timeout():
+                    raise TimeoutError("Solver time limit exceeded")
+                if run_nodes > budget:
+                    self._restart(stack)
+                    budget = self.restart_base * luby(self.restarts + 1)
+                    run_nodes = 0
+                depth = len(stack)
+                # bez punktów kontrolnych (zob. `resume`) najgłębsze przypisanie nie jest zapamiętywane
+                max_depth = max(max_depth, depth)
+                if depth < len(cells):
+                    candidates = self._select(depth)
+                    stack.append([candidates, 0, candidates])
+                elif self._accept():
+                    return True
+
+                # Wstaw kolejną wartość na szczycie stosu, cofając się w razie potrzeby
+                while stack:
+                    frame = stack[-1]
+                    row, col, block = cells[len(stack) - 1]
+                    index = row * n + col
+                    if frame[1]:
+                        backtracks += 1
+                        self._unplace(row, col, block, frame[1])
+                        grid[index] = 0
+                        frame[1] = 0
+                    if not frame[0]:
+                        self.solution[row, col] = 0
+                        stack.pop()
+                        continue
+                    bit = self._next_value(frame[0])
+                    frame[0] ^= bit
+                    val = bit.bit_length() - 1
+                    if self._violates(index, val):
+                        continue
+                    frame[1] = val
+                    grid[index] = val
+                    self.solution[row, col] = val
+                    self._place(row, col, block, val)
+                    break
+                else:
+                    return False
+        finally:
+            stats.nodes = nodes
+            stats.backtracks = backtracks
+            stats.max_depth = max_depth
@@ -0,0 +1,91 @@
+from src.model.grid import SudokuGrid
+from src.sat.cdcl import CdclSolver
+from src.sat.cnf import encode
+from src.solvers.cancellation import CancelEvent, CancellationToken
+from src.solvers.stats import SolverStats
+
+
+class SatSudokuSolver:
+    """
+    A sudoku solver encoding the puzzle to CNF (see `src.sat.cnf`)
+    and solving it with the built-in CDCL engine (see `src.sat.cdcl`).
+
+    Clause learning lets it prove infeasibility without exhausting
+    the whole search tree.
+
+    Attributes:
+    -----------
+    puzzle: SudokuGrid | None
+        a currently solved puzzle, has value set only when called the `solve` method
+    solution: SudokuGrid | None
+        a current solution, has value set only after called the `solve` method
+    token: CancellationToken | None
+        deadline and cancellation of the current search,
+        has value set only after called the `solve` method
+    stats: SolverStats
+        statistics of the last `solve` call: decisions as nodes,
+        conflicts as backtracks and the maximal decision level as depth
+    simplify: bool
+        whether to reduce the candidates by constraint propagation before encoding
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    puzzle: SudokuGrid | None
+    solution: SudokuGrid | None
+    token: CancellationToken | None
+    stats: SolverStats
+    simplify: bool
+
+    def __init__(self, simplify: bool = True) -> None:
+        self.simplify = simplify
+        self.stats = SolverStats()
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        self.token = CancellationToken(time_limit, cancel)
+        self.stats = SolverStats()
+        self.puzzle = puzzle
+        self.solution = None
+
+        # kodowanie dużych łamigłówek trwa sekundy - też liczy się do limitu czasu
+        cnf = encode(puzzle, self.simplify, self.token)
+        engine = CdclSolver(cnf.num_vars, cnf.clauses, self.token)
+        try:
+            model = engine.solve(self.token)
+        finally:
+            self.stats = engine.stats
+        if model is not None:
+            self.solution = cnf.decode(model)
+        return self.solution
@@ -0,0 +1,298 @@
+"""
+Solver statistics and hot-path instrumentation.
+
+Every solver publishes cheap counters of its last `solve` call
+(nodes, backtracks, maximal depth) in its `stats` attribute.
+The costly ones - counting and timing exclusion checks, timing the search
+and the live progress callback - are added only by `instrument`, which wraps
+the hot-path methods of a single solver instance. Solvers which are not
+instrumented run exactly the same code as before.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from timeit import default_timer as timer
+from typing import Any
+
+from src.model.grid import SudokuGrid
+
+SOLVED = "SOLVED"
+INFEASIBLE = "INFEASIBLE"
+TIMEOUT = "TIMEOUT"
+
+# metody sprawdzające, czy wartość może trafić do komórki
+_EXCLUSION_METHODS = ("_is_excluded", "_candidates")
+# metody wejścia do przeszukiwania
+_SEARCH_METHODS = ("_dfs", "_search")
+# publiczne wywołania rozwiązujące, po których `stats` jest uzupełniane
+_SOLVE_METHODS = ("solve", "resume")
+
+
+@dataclass(slots=True)
+class SolverStats:
+    """
+    Statistics of a single `solve` (or `resume`) call.
+
+    Attributes:
+    -----------
+    nodes: int
+        number of visited search nodes
+    backtracks: int
+        number of times the search undid a choice
+    resumed_nodes: int
+        nodes visited before the checkpoint continued by `resume`,
+        not included in `nodes`
+    resumed_backtracks: int
+        backtracks made before the checkpoint continued by `resume`,
+        not included in `backtracks`
+    max_depth: int
+        deepest level of the search tree reached (including the resumed runs)
+    exclusion_checks: int
+        number of exclusion / candidate checks (instrumented solvers only)
+    time_exclusion: float
+        time (in seconds) spent in exclusion checks (instrumented solvers only)
+    time_search: float
+        time (in seconds) spent in the search (instrumented solvers only)
+    elapsed: float
+        total time (in seconds) of the `solve` call (instrumented solvers only)
+    """
+
+    nodes: int = 0
+    backtracks: int = 0
+    resumed_nodes: int = 0
+    resumed_backtracks: int = 0
+    max_depth: int = 0
+    exclusion_checks: int = 0
+    time_exclusion: float = 0.0
+    time_search: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def total_nodes(self) -> int:
+        """
+        Nodes of the whole search, including the runs before a resume.
+        """
+        return self.resumed_nodes + self.nodes
+
+    @property
+    def total_backtracks(self) -> int:
+        """
+        Backtracks of the whole search, including the runs before a resume.
+        """
+        return self.resumed_backtracks + self.backtracks
+
+    def format(self) -> str:
+        """
+        Returns the statistics as `name=value` pairs; the rate covers
+        only this call, the totals of a resumed search are appended.
+        """
+        nodes_per_sec = self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+        text = (
+            f"nodes={self.nodes} backtracks={self.backtracks} max_depth={self.max_depth} "
+            f"exclusion_checks={self.exclusion_checks} time_exclusion={self.time_exclusion:.4f}s "
+            f"time_search={self.time_search:.4f}s elapsed={self.elapsed:.4f}s "
+            f"nodes/s={nodes_per_sec:.0f}"
+        )
+        if self.resumed_nodes or self.resumed_backtracks:
+            text += f" total_nodes={self.total_nodes} total_backtracks={self.total_backtracks}"
+        return text
+
+
+ProgressCallback = Callable[[SolverStats], None]
+
+
+@dataclass(frozen=True, slots=True)
+class SolveResult:
+    """
+    Outcome of a solver run together with its statistics.
+
+    Attributes:
+    -----------
+    status: str
+        one of `SOLVED`, `INFEASIBLE` or `TIMEOUT`
+    solution: SudokuGrid | None
+        the solution, if it has been found
+    stats: SolverStats
+        statistics of the run
+    """
+
+    status: str
+    solution: SudokuGrid | None
+    stats: SolverStats = field(default_factory=SolverStats)
+
+
+class _Instrumentation:
+    """
+    Counters updated by the wrapped methods of an instrumented solver.
+    """
+
+    def __init__(self, callback: ProgressCallback | None, every: int) -> None:
+        self.callback = callback
+        self.every = every
+        self.reset()
+
+    def reset(self) -> None:
+        self.start = timer()
+        self.next_report = self.every
+        self.exclusion_checks = 0
+        self.time_exclusion = 0.0
+        self.time_search = 0.0
+
+
+def instrument(
+    solver: Any, callback: ProgressCallback | None = None, every: int = 10_000
+) -> Any:
+    """
+    Adds exclusion-check counting, search timing and an optional progress
+    callback to a single solver instance, by wrapping its hot-path methods.
+
+    After every `solve` (or `resume`) call `solver.stats` holds the full statistics.
+    The callback receives live statistics every `every` nodes
+    (nodes, exclusion checks and times; backtracks and depth are filled
+    in only when the solve call ends). It is called from the deadline checks,
+    which happen every few nodes, so the reported node counts are approximate.
+
+    Parameters:
+    -----------
+    solver: Any
+        a solver instance, e.g. `NaiveSudokuSolver()`
+    callback: ProgressCallback | None
+        function called with live statistics
+    every: int
+        number of nodes between callback calls
+
+    Returns:
+    --------
+    solver: Any
+        the same solver instance
+    """
+    state = _Instrumentation(callback, max(every, 1))
+
+    for name in _EXCLUSION_METHODS:
+        method = getattr(solver, name, None)
+        if method is not None:
+            setattr(solver, name, _timed_exclusion(method, state))
+
+    for name in _SEARCH_METHODS:
+        method = getattr(solver, name, None)
+        if method is not None:
+            setattr(solver, name, _timed_search(method, solver, name, state))
+
+    # `_timeout` jest wywoływane przy każdym odczycie zegara (co kilka węzłów, zob. cancellation)
+    timeout = getattr(solver, "_timeout", None)
+    if timeout is not None and callback is not None:
+        solver._timeout = _progress(timeout, solver, state)
+
+    for name in _SOLVE_METHODS:
+        method = getattr(solver, name, None)
+        if method is not None:
+            setattr(solver, name, _timed_solve(method, solver, state))
+    return solver
+
+
+def _timed_solve(method: Callable, solver: Any, state: _Instrumentation) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> SudokuGrid | None:
+        state.reset()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            stats = getattr(solver, "stats", None) or SolverStats()
+            stats.exclusion_checks = state.exclusion_checks
+            stats.time_exclusion = state.time_exclusion
+            stats.time_search = state.time_search
+            stats.elapsed = timer() - state.start
+            solver.stats = stats
+
+    return wrapper
+
+
+def _timed_exclusion(method: Callable, state: _Instrumentation) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args: Any) -> Any:
+        start = timer()
+        try:
+            return method(*args)
+        finally:
+            state.exclusion_checks += 1
+            state.time_exclusion += timer() - start
+
+    return wrapper
+
+
+def _timed_search(
+    method: Callable, solver: Any, name: str, state: _Instrumentation
+) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args: Any) -> Any:
+        # rekurencyjne wywołania (_dfs) omijają opakowanie - mierzymy tylko najwyższy poziom
+        setattr(solver, name, method)
+        start = timer()
+        try:
+            return method(*args)
+        finally:
+            state.time_search += timer() - start
+            setattr(solver, name, wrapper)
+
+    return wrapper
+
+
+def _progress(method: Callable, solver: Any, state: _Instrumentation) -> Callable:
+    @functools.wraps(method)
+    def wrapper() -> bool:
+        expired = method()
+        nodes = solver.token.nodes
+        if nodes >= state.next_report:
+            state.next_report = nodes - nodes % state.every + state.every
+            state.callback(
+                SolverStats(
+                    nodes=nodes,
+                    exclusion_checks=state.exclusion_checks,
+                    time_exclusion=state.time_exclusion,
+                    elapsed=timer() - state.start,
+                )
+            )
+        return expired
+
+    return wrapper
+
+
+def solve_with_stats(
+    solver: Any,
+    puzzle: SudokuGrid,
+    time_limit: float | None,
+    callback: ProgressCallback | None = None,
+    every: int = 10_000,
+) -> SolveResult:
+    """
+    Runs an instrumented solver and returns the outcome with its statistics.
+    Unlike `solve`, a timeout is reported as a result, not raised.
+
+    Parameters:
+    -----------
+    solver: Any
+        a solver instance
+    puzzle: SudokuGrid
+        a sudoku puzzle to be solved
+    time_limit: float | None
+        amount of time (in seconds) available to the solver, `None` if unlimited
+    callback: ProgressCallback | None
+        function called with live statistics every `every` nodes
+    every: int
+        number of nodes between callback calls
+
+    Returns:
+    --------
+    result: SolveResult
+        status, solution and statistics of the run
+    """
+    instrument(solver, callback, every)
+    try:
+        solution = solver.solve(puzzle, time_limit)
+        status = SOLVED if solution is not None else INFEASIBLE
+    except TimeoutError:
+        solution, status = None, TIMEOUT
+    return SolveResult(status, solution, solver.stats)
@@ -0,0 +1,294 @@
+"""
+Solving whole batches of puzzles of the same size at once.
+
+The puzzles of a (B, n, n) stack are turned into a candidate tensor of
+all the grids (grid axis last, see `propagate_batch`) which is propagated
+in lockstep, so the per-puzzle Python overhead is paid once per batch
+instead of once per puzzle. Only the puzzles which propagation neither
+solves nor refutes are branched on, in lockstep while their search stays
+narrow, and otherwise fall back to an individual `DlxSudokuSolver` search.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model.grid import SudokuGrid
+from src.model.validation import validate
+from src.solvers.cancellation import CancelEvent, CancellationToken
+from src.solvers.dlx_solver import DlxSudokuSolver
+from src.solvers.propagation import Candidates, cell_counts, propagate_batch
+from src.solvers.stats import SolverStats
+
+SOLVED = "SOLVED"
+INFEASIBLE = "INFEASIBLE"
+TIMEOUT = "TIMEOUT"
+
+
+@dataclass(frozen=True, slots=True)
+class BatchResult:
+    """
+    Outcome of solving a batch of puzzles.
+
+    Attributes:
+    -----------
+    solutions: npt.NDArray[np.uint]
+        (B, n, n) stack of the solutions, all zeros for the unsolved puzzles
+    status: npt.NDArray[np.str_]
+        (B,) array of `SOLVED`, `INFEASIBLE` or `TIMEOUT`
+    searched: int
+        number of puzzles which needed branching after the first propagation
+    stats: SolverStats
+        statistics of the search: branches of the lockstep search as nodes
+        plus the statistics of the individual DLX searches
+    """
+
+    solutions: npt.NDArray[np.uint]
+    status: npt.NDArray[np.str_]
+    searched: int
+    stats: SolverStats
+
+
+def candidates_from_stack(puzzles: npt.NDArray[np.uint]) -> Candidates:
+    """
+    Creates the (n, n, n, B) candidate tensor of a (B, n, n) stack of puzzles:
+    empty cells allow every value, filled cells allow only their own value.
+    The values must not exceed `n`.
+    """
+    values = np.asarray(puzzles, dtype=np.intp)
+    n = values.shape[1]
+    # wartość 0 (pusta komórka) dopuszcza wszystko, v dopuszcza tylko v
+    table = np.ones((n + 1, n), dtype=bool)
+    table[1:] = np.eye(n, dtype=bool)
+    return np.ascontiguousarray(table[values.transpose(1, 2, 0)].transpose(0, 1, 3, 2))
+
+
+def solve_batch(
+    puzzles: npt.ArrayLike,
+    time_limit: float | None = None,
+    cancel: CancelEvent | None = None,
+    intersections: bool = True,
+    max_frontier: int = 8,
+) -> BatchResult:
+    """
+    Solves a stack of puzzles of the same size.
+
+    Parameters:
+    -----------
+    puzzles: npt.ArrayLike
+        (B, n, n) stack of puzzles, `0` for an empty cell
+    time_limit: float | None
+        amount of time (in seconds) available to the whole batch, `None` if unlimited;
+        puzzles which are not solved in time get the `TIMEOUT` status
+    cancel: CancelEvent | None
+        an event which cancels the remaining searches when set by another thread or process
+    intersections: bool
+        whether propagation applies pointing pairs and box-line reduction
+    max_frontier: int
+        maximal number of open branches of a single puzzle; a puzzle whose
+        search would grow wider falls back to an individual DLX search
+
+    Returns:
+    --------
+    result: BatchResult
+        the solutions and the status of every puzzle
+
+    Raises:
+    -------
+    value_error: ValueError
+        when the array is not a stack of square grids split into blocks
+    """
+    values = np.asarray(puzzles)
+    consistent, _ = validate(values)
+    token = CancellationToken(time_limit, cancel)
+    count, n = values.shape[0], values.shape[1]
+    dtype = SudokuGrid.compact_dtype(n)
+    solutions = np.zeros((count, n, n), dtype=dtype)
+    status = np.full(count, INFEASIBLE, dtype=f"<U{len(INFEASIBLE)}")
+    stats = SolverStats()
+
+    # sprzeczne wskazówki odpadają przed propagacją
+    owners = np.flatnonzero(consistent)
+    candidates = candidates_from_stack(values[owners])
+    roots = np.zeros((0, n, n), dtype=dtype)
+    root_owners = owners[:0]
+    fallback = np.zeros(0, dtype=np.intp)
+    depth = 0
+    while len(owners):
+        if token.check():
+            status[np.unique(owners)] = TIMEOUT
+            owners = owners[:0]
+            break
+        try:
+            feasible = propagate_batch(candidates, intersections, token)
+        except TimeoutError:
+            status[np.unique(owners)] = TIMEOUT
+            owners = owners[:0]
+            break
+        owners, candidates = owners[feasible], candidates[..., feasible]
+
+        # (n, n, B) - liczby kandydatów komórek
+        sizes = cell_counts(candidates, np.uint16)
+        solved = (sizes == 1).all(axis=(0, 1))
+        # pierwsze rozwiązanie łamigłówki kończy przeszukiwanie jej pozostałych gałęzi
+        winners, first = np.unique(owners[solved], return_index=True)
+        nodes = np.flatnonzero(solved)[first]
+        solutions[winners] = (candidates[..., nodes].argmax(axis=2) + 1).transpose(
+            2, 0, 1
+        )
+        status[winners] = SOLVED
+        open_nodes = ~np.isin(owners, winners)
+        owners, candidates, sizes = (
+            owners[open_nodes],
+            candidates[..., open_nodes],
+            sizes[..., open_nodes],
+        )
+        if depth == 0:
+            # stan po pierwszej propagacji jest punktem startu przeszukiwania DLX
+            roots = _decided(candidates, sizes, dtype)
+            root_owners = owners
+        if not len(owners):
+            break
+
+        # łamigłówki o zbyt szerokim froncie przechodzą do przeszukiwania DLX
+        wide = np.flatnonzero(np.bincount(owners, minlength=count) > max_frontier // 2)
+        if len(wide):
+            fallback = np.concatenate((fallback, wide))
+            narrow = ~np.isin(owners, wide)
+            owners, candidates, sizes = (
+                owners[narrow],
+                candidates[..., narrow],
+                sizes[..., narrow],
+            )
+        candidates = _branch(candidates, sizes)
+        owners = np.concatenate((owners, owners))
+        depth += 1
+        stats.nodes += len(owners)
+        stats.max_depth = depth
+
+    for i in np.unique(fallback).tolist():
+        # przeszukiwanie DLX dostaje tylko czas pozostały z limitu całej partii
+        if token.check():
+            status[i] = TIMEOUT
+            continue
+        root = roots[np.flatnonzero(root_owners == i)[0]]
+        solver = DlxSudokuSolver()
+        try:
+            solution = solver.solve(SudokuGrid(root), token.remaining(), cancel)
+        except TimeoutError:
+            status[i] = TIMEOUT
+            continue
+        finally:
+            stats.nodes += solver.stats.nodes
+            stats.backtracks += solver.stats.backtracks
+            stats.max_depth = max(stats.max_depth, solver.stats.max_depth)
+        if solution is not None:
+            solutions[i] = solution._array
+            status[i] = SOLVED
+    return BatchResult(solutions, status, len(root_owners), stats)
+
+
+def _decided(
+    candidates: Candidates, sizes: npt.NDArray[np.uint16], dtype: np.dtype
+) -> npt.NDArray[np.uint]:
+    """
+    Returns the (B, n, n) stack of grids with the decided cells filled in.
+    """
+    values = np.where(sizes == 1, candidates.argmax(axis=2) + 1, 0)
+    return values.transpose(2, 0, 1).astype(dtype)
+
+
+def _branch(candidates: Candidates, sizes: npt.NDArray[np.uint16]) -> Candidates:
+    """
+    Splits every grid on its most constrained undecided cell and its first
+    candidate `v`: the first half of the result puts `v` in the cell,
+    the second half removes `v` from its candidates.
+    """
+    n, count = candidates.shape[0], candidates.shape[3]
+    # komórki rozstrzygnięte nie biorą udziału w wyborze
+    masked = np.where(sizes > 1, sizes, np.iinfo(sizes.dtype).max).reshape(n * n, count)
+    rows, cols = np.divmod(masked.argmin(axis=0), n)
+    grids = np.arange(count)
+    values = candidates[rows, cols, :, grids].argmax(axis=1)
+
+    chosen = candidates.copy()
+    chosen[rows, cols, :, grids] = False
+    chosen[rows, cols, values, grids] = True
+    candidates[rows, cols, values, grids] = False
+    return np.concatenate((chosen, candidates), axis=3)
+
+
+class TensorSudokuSolver:
+    """
+    A sudoku solver using the batched solving of `solve_batch`
+    for a single puzzle, i.e. constraint propagation on the candidate
+    tensor with a DLX search if propagation is not enough.
+
+    Meant mostly for batches (call `solve_batch` directly); for a single
+    puzzle it behaves like `PropagatingSudokuSolver` with a DLX fallback.
+
+    Attributes:
+    -----------
+    puzzle: SudokuGrid | None
+        a currently solved puzzle, has value set only when called the `solve` method
+    solution: SudokuGrid | None
+        a current solution, has value set only after called the `solve` method
+    stats: SolverStats
+        statistics of the DLX search of the last `solve` call, empty if propagation was enough
+
+    Methods:
+    --------
+    solve(puzzle: SudokuGrid, time_limit: float | None, cancel: CancelEvent | None = None)
+        -> SudokuGrid | None:
+        solves the given sudoku puzzle within a specified time limit
+    """
+
+    puzzle: SudokuGrid | None
+    solution: SudokuGrid | None
+    stats: SolverStats
+
+    def __init__(self) -> None:
+        self.stats = SolverStats()
+
+    def solve(
+        self,
+        puzzle: SudokuGrid,
+        time_limit: float | None,
+        cancel: CancelEvent | None = None,
+    ) -> SudokuGrid | None:
+        """
+        Solves the given sudoku puzzle within a specified time limit.
+
+        Parameters:
+        -----------
+        puzzle: SudokuGrid
+            a sudoku puzzle to be solved
+        time_limit: float | None
+            amount of time (in seconds) available to the solver, `None` if unlimited
+        cancel: CancelEvent | None
+            an event which cancels the search when set by another thread or process
+
+        Returns:
+        --------
+        solution: SudokuGrid | None:
+            - a sudoku solution if it has been found
+            - `None` if the solution has not been found
+
+        Raises:
+        -------
+        timeout_error: TimeoutError
+            when the available time runs out or the search is cancelled
+        """
+        self.stats = SolverStats()
+        self.puzzle = puzzle
+        self.solution = None
+        result = solve_batch(np.asarray(puzzle._array)[None], time_limit, cancel)
+        self.stats = result.stats
+        if result.status[0] == TIMEOUT:
+            raise TimeoutError("Solver time limit exceeded")
+        if result.status[0] == SOLVED:
+            self.solution = SudokuGrid(result.solutions[0])
+        return self.solution